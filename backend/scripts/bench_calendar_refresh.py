@@ -0,0 +1,117 @@
+"""Benchmark: upstream refresh cycles per week with exchange-calendar pacing.
+
+Replays the market refresher's scheduling decisions over simulated weeks
+(no network, no sleeping): each step asks MarketDataRefresher.interval_for
+what the next delay would be at that instant and advances the clock.
+Every refresh costs one shard of upstream quote calls, so the cycle count
+is proportional to upstream call volume.
+
+Also checks a few known session states (regular hours, early close,
+holidays, weekends) for NYSE and NSE.
+
+Exit code is 0 when every session check passes and an average week needs
+less than half the cycles of fixed-interval polling, else 3.
+
+Usage:
+  (from project root)
+  python backend/scripts/bench_calendar_refresh.py [--week 2026-10-12]
+"""
+
+import argparse
+import os
+import sys
+from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from config import settings  # noqa: E402
+from services.exchange_calendar import CALENDARS  # noqa: E402
+from services.market_data import MarketDataRefresher  # noqa: E402
+
+NEW_YORK = ZoneInfo("America/New_York")
+KOLKATA = ZoneInfo("Asia/Kolkata")
+
+# (exchange, local time, expected phase)
+SESSION_CASES = [
+    ("NYSE", datetime(2026, 10, 16, 10, 0, tzinfo=NEW_YORK), "open"),
+    ("NYSE", datetime(2026, 10, 16, 8, 0, tzinfo=NEW_YORK), "pre"),
+    ("NYSE", datetime(2026, 10, 16, 17, 30, tzinfo=NEW_YORK), "post"),
+    ("NYSE", datetime(2026, 10, 17, 11, 0, tzinfo=NEW_YORK), "closed"),   # Saturday
+    ("NYSE", datetime(2026, 11, 26, 11, 0, tzinfo=NEW_YORK), "closed"),   # Thanksgiving
+    ("NYSE", datetime(2026, 11, 27, 13, 30, tzinfo=NEW_YORK), "post"),    # early close at 13:00
+    ("NYSE", datetime(2026, 7, 3, 11, 0, tzinfo=NEW_YORK), "closed"),     # Independence Day observed
+    ("NYSE", datetime(2026, 4, 3, 11, 0, tzinfo=NEW_YORK), "closed"),     # Good Friday
+    ("NSE", datetime(2026, 10, 16, 10, 0, tzinfo=KOLKATA), "open"),
+    ("NSE", datetime(2026, 10, 16, 9, 5, tzinfo=KOLKATA), "pre"),
+    ("NSE", datetime(2026, 10, 16, 15, 45, tzinfo=KOLKATA), "post"),
+    ("NSE", datetime(2026, 10, 20, 11, 0, tzinfo=KOLKATA), "closed"),     # Dussehra
+    ("NSE", datetime(2026, 1, 26, 11, 0, tzinfo=KOLKATA), "closed"),      # Republic Day
+]
+
+
+def simulate(exchanges, start: datetime, days: int = 7, pacing: bool = True) -> int:
+    refresher = MarketDataRefresher(
+        settings.MARKET_REFRESH_INTERVAL_SECONDS,
+        settings.MARKET_REFRESH_EXTENDED_INTERVAL_SECONDS,
+        settings.MARKET_REFRESH_CLOSED_INTERVAL_SECONDS,
+        calendar_pacing=pacing,
+    )
+
+    async def loader():
+        return {}
+
+    refresher.register("stocks", loader, exchanges=exchanges)
+    now, end, cycles = start, start + timedelta(days=days), 0
+    while now < end:
+        cycles += 1
+        now += timedelta(seconds=refresher.interval_for("stocks", now))
+    return cycles
+
+
+def report(ok: bool, message: str) -> bool:
+    print(f"   {'✓' if ok else '❌'} {message}")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--week", default="2026-10-12", help="Monday the simulated week starts on")
+    args = parser.parse_args()
+    monday = datetime.fromisoformat(args.week).replace(tzinfo=timezone.utc)
+
+    ok = True
+    print("Session states")
+    for exchange, at, expected in SESSION_CASES:
+        phase = CALENDARS[exchange].phase(at)
+        ok &= report(phase == expected, f"{exchange} {at:%a %Y-%m-%d %H:%M} -> {phase}")
+
+    print(f"\nRefresh cycles per week (session {settings.MARKET_REFRESH_INTERVAL_SECONDS:g}s, "
+          f"extended {settings.MARKET_REFRESH_EXTENDED_INTERVAL_SECONDS:g}s, "
+          f"closed {settings.MARKET_REFRESH_CLOSED_INTERVAL_SECONDS:g}s)")
+    fixed = simulate(("NYSE",), monday, pacing=False)
+    weeks = [
+        ("US universe", ("NYSE",), monday),
+        ("NSE universe", ("NSE",), monday),
+        ("US + NSE universe", ("NSE", "NYSE"), monday),
+        ("US, Thanksgiving week", ("NYSE",), datetime(2026, 11, 23, tzinfo=timezone.utc)),
+    ]
+    average = None
+    for label, exchanges, start in weeks:
+        cycles = simulate(exchanges, start)
+        saved = 1 - cycles / fixed
+        print(f"  {label:<24} {cycles:>7,} cycles vs {fixed:,} fixed ({saved:.1%} fewer)")
+        if average is None:
+            average = saved
+    ok &= report(average > 0.5, f"average US week cuts upstream cycles by {average:.1%}")
+
+    print("\nSummary:")
+    if ok:
+        print("  ✅ Calendar pacing cuts upstream refreshes by well over half")
+        sys.exit(0)
+    print("  ❌ One or more checks failed")
+    sys.exit(3)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""Microbenchmark: DataFrame.iterrows candle building vs the column-wise path.
+
+Builds synthetic yfinance-shaped frames (tz-aware index, Open/High/Low/Close/
+Volume) of 1k, 10k and 100k bars and times:
+  1) the old `for idx, row in hist.iterrows()` list comprehension
+  2) utils.candles.history_to_candles (same JSON shape)
+  3) utils.candles.history_to_columns (columnar shape)
+
+Row output of (1) and (2) is compared for equality on every size. Exit code
+is 0 when outputs match and the row path is at least --min-speedup faster at
+the largest size, else 3.
+
+Usage:
+  (from project root)
+  python backend/scripts/bench_candle_serialization.py [--sizes 1000,10000,100000] [--min-speedup 5]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+from utils.candles import history_to_candles, history_to_columns  # noqa: E402
+
+
+def iterrows_candles(hist: pd.DataFrame):
+    """The original finance_quote implementation"""
+    return [
+        {
+            "ts": idx.isoformat(),
+            "open": float(row["Open"]),
+            "high": float(row["High"]),
+            "low": float(row["Low"]),
+            "close": float(row["Close"]),
+            "volume": int(row["Volume"]),
+        }
+        for idx, row in hist.iterrows()
+    ]
+
+
+def make_frame(n: int) -> pd.DataFrame:
+    rng = np.random.default_rng(42)
+    index = pd.date_range("2015-01-02 09:30", periods=n, freq="1min", tz="America/New_York")
+    close = 100 + np.cumsum(rng.normal(0, 0.1, n))
+    return pd.DataFrame({
+        "Open": close + rng.normal(0, 0.05, n),
+        "High": close + 0.2,
+        "Low": close - 0.2,
+        "Close": close,
+        "Volume": rng.integers(100, 100_000, n),
+    }, index=index)
+
+
+def best_of(fn, arg, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn(arg)
+        best = min(best, time.perf_counter() - t0)
+    return best * 1000.0
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", default="1000,10000,100000")
+    parser.add_argument("--min-speedup", type=float, default=5.0)
+    args = parser.parse_args()
+    sizes = [int(s) for s in args.sizes.split(",")]
+
+    ok = True
+    speedup = 0.0
+    print(f"{'bars':>8} {'iterrows':>12} {'rows':>12} {'columns':>12} {'speedup':>9}")
+    for n in sizes:
+        hist = make_frame(n)
+        if iterrows_candles(hist) != history_to_candles(hist):
+            print(f"  ❌ row output differs at {n} bars")
+            ok = False
+        repeat = 3 if n >= 100_000 else 5
+        old_ms = best_of(iterrows_candles, hist, repeat)
+        rows_ms = best_of(history_to_candles, hist, repeat)
+        cols_ms = best_of(history_to_columns, hist, repeat)
+        speedup = old_ms / rows_ms
+        print(f"{n:>8} {old_ms:>10.1f}ms {rows_ms:>10.1f}ms {cols_ms:>10.1f}ms {speedup:>8.1f}x")
+
+    print("\nSummary:")
+    if ok and speedup >= args.min_speedup:
+        print(f"  ✅ Outputs match; row path is {speedup:.1f}x faster at {sizes[-1]} bars")
+        sys.exit(0)
+    if ok:
+        print(f"  ❌ Speedup {speedup:.1f}x below required {args.min_speedup}x")
+    else:
+        print("  ❌ Outputs differ")
+    sys.exit(3)
+
+
+if __name__ == "__main__":
+    main()
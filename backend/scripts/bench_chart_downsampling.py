@@ -0,0 +1,129 @@
+"""Benchmark + correctness check: max_points downsampling for candle payloads.
+
+  1) LTTB picks the same bars as a plain per-bucket Python reference
+  2) OHLC buckets keep the range's first open, last close, extremes and volume
+  3) Payload size and encode time for long ranges, full vs max_points
+
+Exit code is 0 when every check passes, else 3.
+
+Usage:
+  (from project root)
+  python backend/scripts/bench_chart_downsampling.py [--max-points 500] [--sizes 10000,50000,200000]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from utils.candles import history_to_payload  # noqa: E402
+from utils.downsample import downsample_history, lttb_indices  # noqa: E402
+
+
+def frame(n: int, seed: int = 5) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.002, n)))
+    open_ = close * (1 + rng.normal(0, 0.001, n))
+    spread = np.abs(rng.normal(0, 0.002, n)) * close
+    index = pd.date_range("2020-01-01 09:30", periods=n, freq="min", tz="America/New_York", name="Date")
+    return pd.DataFrame({
+        "Open": open_,
+        "High": np.maximum(open_, close) + spread,
+        "Low": np.minimum(open_, close) - spread,
+        "Close": close,
+        "Volume": rng.integers(100, 10_000, n).astype("f8"),
+    }, index=index)
+
+
+def ref_lttb(y, threshold):
+    """Textbook LTTB over (position, value) pairs"""
+    n, buckets = len(y), threshold - 2
+    edge = lambda i: i * (n - 2) // buckets + 1  # noqa: E731
+    picked, a = [0], 0
+    for i in range(buckets):
+        start, end = edge(i), edge(i + 1)
+        nxt_start, nxt_end = (end, edge(i + 2)) if i < buckets - 1 else (n - 1, n)
+        cx = sum(range(nxt_start, nxt_end)) / (nxt_end - nxt_start)
+        cy = sum(y[nxt_start:nxt_end]) / (nxt_end - nxt_start)
+        best, best_area = start, -1.0
+        for j in range(start, end):
+            area = abs((a - cx) * (y[j] - y[a]) - (a - j) * (cy - y[a]))
+            if area > best_area:
+                best, best_area = j, area
+        picked.append(best)
+        a = best
+    picked.append(n - 1)
+    return picked
+
+
+def report(ok: bool, message: str) -> bool:
+    print(f"   {'✓' if ok else '❌'} {message}")
+    return ok
+
+
+def check_lttb() -> bool:
+    print("1) LTTB matches the reference implementation")
+    ok = True
+    for n, points in ((1000, 50), (5003, 300), (20000, 997)):
+        y = frame(n)["Close"].tolist()
+        got = lttb_indices(np.array(y), points).tolist()
+        ok &= report(got == ref_lttb(y, points), f"{n:,} -> {points} points")
+    return ok
+
+
+def check_ohlc() -> bool:
+    print("\n2) OHLC buckets preserve the range")
+    hist = frame(50_000)
+    out = downsample_history(hist, 500, "ohlc")
+    ok = report(len(out) == 500, f"{len(hist):,} bars -> {len(out)} candles")
+    ok &= report(out["Open"].iloc[0] == hist["Open"].iloc[0]
+                 and out["Close"].iloc[-1] == hist["Close"].iloc[-1], "first open and last close kept")
+    ok &= report(out["High"].max() == hist["High"].max()
+                 and out["Low"].min() == hist["Low"].min(), "range high and low kept")
+    ok &= report(out["Volume"].sum() == hist["Volume"].sum(), "volume summed")
+    ok &= report(bool((out["High"] >= out[["Open", "Close"]].max(axis=1)).all()
+                      and (out["Low"] <= out[["Open", "Close"]].min(axis=1)).all()), "every candle is well formed")
+    return ok
+
+
+def bench(sizes, max_points: int):
+    print(f"\n3) Payload for max_points={max_points} (rows shape, JSON)")
+    print(f"   {'bars':>8}  {'method':>6}  {'body':>10}  {'downsample':>10}  {'encode':>9}")
+    for n in sizes:
+        hist = frame(n)
+        for method in (None, "ohlc", "lttb"):
+            t0 = time.perf_counter()
+            out = hist if method is None else downsample_history(hist, max_points, method)
+            reduce_ms = (time.perf_counter() - t0) * 1000
+            t0 = time.perf_counter()
+            body = json.dumps(history_to_payload(out, "rows"))
+            encode_ms = (time.perf_counter() - t0) * 1000
+            print(f"   {n:>8,}  {method or 'full':>6}  {len(body) / 1024:>8.0f}KB  "
+                  f"{reduce_ms:>8.2f}ms  {encode_ms:>7.1f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--max-points", type=int, default=500)
+    parser.add_argument("--sizes", default="10000,50000,200000")
+    args = parser.parse_args()
+
+    ok = check_lttb()
+    ok &= check_ohlc()
+    bench([int(s) for s in args.sizes.split(",")], args.max_points)
+    print("\nSummary:")
+    if ok:
+        print("  ✅ Downsampled candles match the reference and keep the range's extremes")
+        sys.exit(0)
+    print("  ❌ One or more checks failed")
+    sys.exit(3)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+"""Benchmark + correctness check: single-pass .xlsx reader for broker exports.
+
+  1) The streaming reader returns the same holdings frame (columns, values,
+     dtypes) as the two-pass pandas reader for Groww, Zerodha and mutual
+     fund statement layouts
+  2) Parse time on 10k-100k row exports: single pass vs two passes
+  3) A sheet without a recognisable header still parses (default header)
+
+Exit code is 0 when every check passes, else 3.
+
+Usage:
+  (from project root)
+  python backend/scripts/bench_excel_reader.py [--rows 10000,50000,100000] [--runs 2]
+"""
+
+import argparse
+import io
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+from openpyxl import Workbook
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from services.portfolio_service import PortfolioService  # noqa: E402
+
+LAYOUTS = {
+    "groww": (
+        [["Holdings statement as on 15-10-2026"], ["Client code", "ABC123"], [], ["Summary"],
+         ["Invested value", 125000.5], ["Closing value", 150000.25], []],
+        ["Stock Name", "ISIN", "Quantity", "Average buy price", "Buy value", "Closing price", "Closing value"],
+    ),
+    "zerodha": (
+        [["Equity holdings"], ["Client ID", "ZX1234"], [], ["Statement as of", "2026-10-15"], []],
+        ["Tradingsymbol", "Instrument", "Quantity", "Average price", "LTP", "Cur. val", "P&L", "Net chg."],
+    ),
+    "funds": (
+        [["Mutual fund holdings"], ["PAN", "ABCDE1234F"], []],
+        ["Scheme Name", "AMC", "Category", "Units", "Invested Value", "Current Value", "Returns"],
+    ),
+}
+
+
+def report(ok: bool, message: str) -> bool:
+    print(f"   {'✓' if ok else '❌'} {message}")
+    return ok
+
+
+def workbook_bytes(layout: str, rows: int, seed: int = 5) -> bytes:
+    preamble, header = LAYOUTS[layout]
+    rng = np.random.default_rng(seed)
+    qty = rng.integers(1, 1000, rows)
+    price = rng.uniform(10, 5000, rows).round(2)
+    last = (price * rng.uniform(0.5, 2.0, rows)).round(2)
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet()
+    for line in preamble:
+        ws.append(line)
+    ws.append(header)
+    for i in range(rows):
+        q, p, c = int(qty[i]), float(price[i]), float(last[i])
+        if layout == "groww":
+            ws.append([f"Company {i} Ltd", f"INE{i:06d}01", q, p, round(q * p, 2), c, round(q * c, 2)])
+        elif layout == "zerodha":
+            ws.append([f"SYM{i}", "NSE", q, p, c, round(q * c, 2), round(q * (c - p), 2), round(c / p - 1, 4)])
+        else:
+            units = round(q * 1.137, 3)
+            ws.append([f"Fund {i} Direct Growth", "AMC", "Equity", units, round(units * p, 2),
+                       round(units * c, 2), round(c / p - 1, 4)])
+    # Footer rows after the table, as brokers add them
+    ws.append([])
+    ws.append([None, "Total", None, None, None, None])
+    out = io.BytesIO()
+    wb.save(out)
+    return out.getvalue()
+
+
+def timed(fn, body: bytes, runs: int):
+    best, result = float("inf"), None
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = fn(io.BytesIO(body))
+        best = min(best, time.perf_counter() - start)
+    return best * 1000, result
+
+
+def same(a: pd.DataFrame, b: pd.DataFrame) -> bool:
+    try:
+        pd.testing.assert_frame_equal(a.reset_index(drop=True), b.reset_index(drop=True))
+        return True
+    except AssertionError as e:
+        print(f"      {str(e).splitlines()[0]}")
+        return False
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", default="10000,50000,100000")
+    parser.add_argument("--runs", type=int, default=2)
+    args = parser.parse_args()
+    sizes = [int(n) for n in args.rows.split(",")]
+
+    service = PortfolioService()
+    ok = True
+
+    print("1) Same frame as the two-pass reader")
+    for layout in LAYOUTS:
+        body = workbook_bytes(layout, 500)
+        legacy = service._read_legacy_excel(io.BytesIO(body))
+        single = service._read_excel_with_auto_header(io.BytesIO(body))
+        ok &= report(len(single) == 500 and same(legacy, single), f"{layout}: {len(single)} rows, identical")
+        normalized = service._normalize_columns(single)
+        ok &= report({"symbol", "quantity", "purchase_price"} <= set(normalized.columns),
+                     f"{layout}: normalizes to symbol/quantity/purchase_price")
+
+    print("\n2) Parse time")
+    speedups = []
+    for rows in sizes:
+        body = workbook_bytes("groww", rows)
+        legacy_ms, legacy = timed(service._read_legacy_excel, body, args.runs)
+        single_ms, single = timed(service._read_excel_with_auto_header, body, args.runs)
+        speedups.append(legacy_ms / single_ms)
+        print(f"      {rows:>7} rows ({len(body) / 1e6:.1f} MB): two-pass {legacy_ms:,.0f}ms, "
+              f"single-pass {single_ms:,.0f}ms ({legacy_ms / single_ms:.2f}x)")
+        ok &= report(len(single) == rows and same(legacy, single), f"{rows} rows parsed identically")
+    ok &= report(min(speedups) >= 1.5, f"single pass at least 1.5x faster (worst {min(speedups):.2f}x)")
+
+    print("\n3) No recognisable header")
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet()
+    ws.append(["symbol", "qty", "price"])
+    ws.append(["RELIANCE", 10, 2350.5])
+    ws.append(["TCS", 5, 3200.0])
+    out = io.BytesIO()
+    wb.save(out)
+    plain = service._read_excel_with_auto_header(io.BytesIO(out.getvalue()))
+    ok &= report(list(plain.columns) == ["symbol", "qty", "price"] and len(plain) == 2,
+                 "falls back to the first row as header")
+
+    print("\nSummary:")
+    if ok:
+        print("  ✅ Single-pass reader matches the two-pass reader and is faster")
+        sys.exit(0)
+    print("  ❌ One or more checks failed")
+    sys.exit(3)
+
+
+if __name__ == "__main__":
+    main()
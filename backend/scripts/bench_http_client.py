@@ -0,0 +1,122 @@
+"""Benchmark: per-request httpx.AsyncClient vs the shared pooled client.
+
+Starts a local stub server that answers like Finnhub's /quote endpoint and
+issues the same sequence of requests two ways:
+  1) a fresh httpx.AsyncClient() per request (the old route behaviour)
+  2) the shared keep-alive client from utils.http_client
+
+Prints per-request latency percentiles for both so the handshake cost is
+visible. The stub is plain HTTP on localhost, so real TLS to finnhub.io
+widens the gap considerably.
+
+Usage:
+  (from project root)
+  python backend/scripts/bench_http_client.py [requests] [concurrency]
+"""
+
+import asyncio
+import json
+import logging
+import os
+import statistics
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+import httpx  # noqa: E402
+from utils.http_client import create_http_client  # noqa: E402
+
+logging.getLogger("httpx").setLevel(logging.WARNING)
+
+QUOTE_BODY = json.dumps({"c": 189.5, "pc": 187.2, "h": 190.1, "l": 186.9, "o": 187.5, "t": 1700000000}).encode()
+
+
+class StubQuoteHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(QUOTE_BODY)))
+        self.end_headers()
+        self.wfile.write(QUOTE_BODY)
+
+    def log_message(self, *args):
+        pass
+
+
+def start_stub_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubQuoteHandler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/api/v1/quote"
+
+
+async def run_fresh_clients(url: str, n: int, concurrency: int):
+    sem = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one():
+        async with sem:
+            t0 = time.perf_counter()
+            async with httpx.AsyncClient() as client:
+                r = await client.get(url, params={"symbol": "AAPL"})
+                r.json()
+            latencies.append((time.perf_counter() - t0) * 1000.0)
+
+    await asyncio.gather(*(one() for _ in range(n)))
+    return latencies
+
+
+async def run_shared_client(url: str, n: int, concurrency: int):
+    sem = asyncio.Semaphore(concurrency)
+    latencies = []
+    client = create_http_client()
+
+    async def one():
+        async with sem:
+            t0 = time.perf_counter()
+            r = await client.get(url, params={"symbol": "AAPL"})
+            r.json()
+            latencies.append((time.perf_counter() - t0) * 1000.0)
+
+    try:
+        await asyncio.gather(*(one() for _ in range(n)))
+    finally:
+        await client.aclose()
+    return latencies
+
+
+def summarize(label: str, latencies):
+    ordered = sorted(latencies)
+    p50 = statistics.median(ordered)
+    p95 = ordered[int(len(ordered) * 0.95) - 1]
+    print(f"  {label:<22} p50={p50:7.3f} ms  p95={p95:7.3f} ms  mean={statistics.mean(ordered):7.3f} ms")
+    return p50
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    concurrency = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+
+    server, url = start_stub_server()
+    print(f"Stub server: {url}  requests={n}  concurrency={concurrency}")
+    try:
+        fresh = asyncio.run(run_fresh_clients(url, n, concurrency))
+        shared = asyncio.run(run_shared_client(url, n, concurrency))
+    finally:
+        server.shutdown()
+
+    print("\nPer-request latency:")
+    fresh_p50 = summarize("new client per call", fresh)
+    shared_p50 = summarize("shared pooled client", shared)
+    if shared_p50 > 0:
+        print(f"\n  p50 speedup: {fresh_p50 / shared_p50:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
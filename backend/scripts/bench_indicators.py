@@ -0,0 +1,180 @@
+"""Benchmark + correctness check: NumPy indicator kernels and the memoised service.
+
+  1) Checks utils.indicators against straightforward per-bar Python loops
+     (SMA, SMA-seeded EMA, Wilder RSI, MACD, Bollinger Bands)
+  2) Times the full default indicator set over 1k/10k/100k-bar series
+  3) Times services.indicator_service for a cold and a repeated chart open
+     (candles come from a stand-in provider, no network)
+
+Exit code is 0 when every check passes, else 3.
+
+Usage:
+  (from project root)
+  python backend/scripts/bench_indicators.py [--sizes 1000,10000,100000]
+"""
+
+import argparse
+import asyncio
+import math
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from services import indicator_service as indicator_module  # noqa: E402
+from utils.indicators import DEFAULT_SET, compute, parse_set  # noqa: E402
+
+
+def random_walk(n: int, seed: int = 3) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    return 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+
+
+def ref_sma(x, n):
+    return [math.nan if i < n - 1 else sum(x[i - n + 1:i + 1]) / n for i in range(len(x))]
+
+
+def ref_smoothed(x, n, alpha):
+    out = [math.nan] * len(x)
+    valid = [i for i, v in enumerate(x) if not math.isnan(v)]
+    if not valid or len(x) - valid[0] < n:
+        return out
+    start = valid[0] + n - 1
+    prev = sum(x[valid[0]:start + 1]) / n
+    out[start] = prev
+    for i in range(start + 1, len(x)):
+        prev = alpha * x[i] + (1 - alpha) * prev
+        out[i] = prev
+    return out
+
+
+def ref_rsi(x, n):
+    deltas = [b - a for a, b in zip(x, x[1:])]
+    gains = ref_smoothed([max(d, 0) for d in deltas], n, 1 / n)
+    losses = ref_smoothed([max(-d, 0) for d in deltas], n, 1 / n)
+    out = [math.nan]
+    for g, lo in zip(gains, losses):
+        out.append(math.nan if math.isnan(g) else (100.0 if lo == 0 else 100 - 100 / (1 + g / lo)))
+    return out
+
+
+def ref_bbands(x, n, k):
+    upper, lower = [], []
+    for i in range(len(x)):
+        if i < n - 1:
+            upper.append(math.nan)
+            lower.append(math.nan)
+            continue
+        window = x[i - n + 1:i + 1]
+        mean = sum(window) / n
+        std = math.sqrt(sum((v - mean) ** 2 for v in window) / n)
+        upper.append(mean + k * std)
+        lower.append(mean - k * std)
+    return upper, lower
+
+
+def close_enough(got: np.ndarray, want) -> bool:
+    return np.allclose(got, np.array(want, dtype="f8"), rtol=1e-9, atol=1e-9, equal_nan=True)
+
+
+def report(ok: bool, message: str) -> bool:
+    print(f"   {'✓' if ok else '❌'} {message}")
+    return ok
+
+
+def check_kernels() -> bool:
+    print("1) Kernels match per-bar reference loops")
+    x = random_walk(600).tolist()
+    cols = compute(np.array(x), parse_set(DEFAULT_SET + ",ema:12"))
+    ok = report(close_enough(cols["sma_20"], ref_sma(x, 20)), "sma:20")
+    ok &= report(close_enough(cols["ema_50"], ref_smoothed(x, 50, 2 / 51)), "ema:50")
+    ok &= report(close_enough(cols["rsi_14"], ref_rsi(x, 14)), "rsi:14")
+    fast, slow = ref_smoothed(x, 12, 2 / 13), ref_smoothed(x, 26, 2 / 27)
+    line = [a - b for a, b in zip(fast, slow)]
+    signal = ref_smoothed(line, 9, 2 / 10)
+    ok &= report(close_enough(cols["macd_12_26_9"], line)
+                 and close_enough(cols["macd_signal_12_26_9"], signal), "macd:12:26:9")
+    ok &= report(cols["ema_12"] is not None and close_enough(cols["ema_12"], fast), "ema:12 shared with macd")
+    upper, lower = ref_bbands(x, 20, 2)
+    ok &= report(close_enough(cols["bbands_upper_20_2"], upper)
+                 and close_enough(cols["bbands_lower_20_2"], lower), "bbands:20:2")
+    return ok
+
+
+def bench_kernels(sizes):
+    print(f"\n2) Full default set ({DEFAULT_SET})")
+    specs = parse_set(DEFAULT_SET)
+    for n in sizes:
+        x = random_walk(n)
+        compute(x, specs)
+        runs = max(3, 200_000 // n)
+        t0 = time.perf_counter()
+        for _ in range(runs):
+            compute(x, specs)
+        ms = (time.perf_counter() - t0) / runs * 1000
+        print(f"   {n:>7,} bars: {ms:8.3f} ms")
+
+
+class StandInRouter:
+    """provider_router stand-in serving a fixed daily history"""
+
+    def __init__(self, bars: int):
+        index = pd.date_range(end="2026-10-15", periods=bars, freq="B", tz="UTC", name="Date")
+        close = random_walk(bars)
+        self.frame = pd.DataFrame({"Open": close, "High": close * 1.01, "Low": close * 0.99,
+                                   "Close": close, "Volume": 1e6}, index=index)
+        self.frame.attrs["provider"] = "stand-in"
+        self.calls = []
+
+    async def history(self, symbol, range_value, interval):
+        self.calls.append(range_value)
+        return self.frame
+
+
+async def bench_service() -> bool:
+    print("\n3) Memoised chart opens (symbol, range, interval, last bar)")
+    router = StandInRouter(2500)
+    indicator_module.provider_router = router
+    service = indicator_module.IndicatorService(max_entries=16)
+
+    t0 = time.perf_counter()
+    _, cold = await service.get("AAPL", "1mo", "1d", DEFAULT_SET)
+    cold_ms = (time.perf_counter() - t0) * 1000
+    runs = 200
+    t0 = time.perf_counter()
+    for _ in range(runs):
+        _, warm = await service.get("AAPL", "1mo", "1d", DEFAULT_SET)
+    warm_ms = (time.perf_counter() - t0) / runs * 1000
+    print(f"   cold {cold_ms:.2f} ms, repeated {warm_ms:.3f} ms "
+          f"(fetched range {router.calls[0]} for warm-up)")
+    ok = report(warm is cold and service.misses == 1, f"hits={service.hits} misses={service.misses}")
+    ok &= report(not np.isnan(cold.columns["ema_50"][0]), "ema:50 valid from the first bar of a 1mo range")
+
+    router.frame.iloc[-1, router.frame.columns.get_loc("Close")] += 1
+    _, moved = await service.get("AAPL", "1mo", "1d", DEFAULT_SET)
+    ok &= report(moved is not cold and service.misses == 2, "a moved forming bar recomputes")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", default="1000,10000,100000")
+    args = parser.parse_args()
+
+    ok = check_kernels()
+    bench_kernels([int(s) for s in args.sizes.split(",")])
+    ok &= asyncio.run(bench_service())
+    print("\nSummary:")
+    if ok:
+        print("  ✅ Indicators are correct and repeated opens are served from memory")
+        sys.exit(0)
+    print("  ❌ One or more checks failed")
+    sys.exit(3)
+
+
+if __name__ == "__main__":
+    main()
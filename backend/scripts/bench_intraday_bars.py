@@ -0,0 +1,154 @@
+"""Benchmark + correctness check: intraday ring-buffer bar aggregator.
+
+  1) Bars built tick by tick match a pandas resample of the same trades
+     (1m/5m/15m; open/high/low/close/volume over the retained window)
+  2) Ingest throughput for a synthetic multi-symbol trade feed
+  3) Memory stays flat: array bytes and traced Python allocations do not
+     grow after the rings have wrapped
+  4) Snapshot quotes: unchanged timestamps are skipped and cumulative
+     volume becomes per-bar volume
+
+Exit code is 0 when every check passes, else 3.
+
+Usage:
+  (from project root)
+  python backend/scripts/bench_intraday_bars.py [--symbols 200] [--ticks 300000]
+"""
+
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from services.intraday_bars import INTRADAY_INTERVALS, IntradayBars  # noqa: E402
+
+T0_MS = 1_760_000_000_000 - 1_760_000_000_000 % 86_400_000 + 13 * 3_600_000 + 30 * 60_000
+
+
+def feed(symbols: int, ticks: int, seed: int = 11):
+    """(symbol, price, volume, ts_ms) columns; timestamps increase per symbol"""
+    rng = np.random.default_rng(seed)
+    names = np.array([f"SYM{i}" for i in range(symbols)])
+    which = rng.integers(0, symbols, ticks)
+    ts = T0_MS + np.sort(rng.integers(0, 6 * 3_600_000, ticks))
+    price = 100 * np.exp(np.cumsum(rng.normal(0, 0.0005, ticks)))
+    volume = rng.integers(1, 500, ticks).astype("f8")
+    return names[which].tolist(), price.tolist(), volume.tolist(), ts.tolist()
+
+
+def report(ok: bool, message: str) -> bool:
+    print(f"   {'✓' if ok else '❌'} {message}")
+    return ok
+
+
+def check_against_resample(bars: int) -> bool:
+    print("1) Ring bars match a pandas resample")
+    names, price, volume, ts = feed(3, 40_000)
+    store = IntradayBars(bars=bars, max_symbols=8)
+    for s, p, v, t in zip(names, price, volume, ts):
+        store.apply(s, p, v, t, traded=True)
+
+    trades = pd.DataFrame({"symbol": names, "price": price, "volume": volume},
+                          index=pd.to_datetime(ts, unit="ms", utc=True))
+    ok = True
+    for interval, seconds in INTRADAY_INTERVALS.items():
+        for symbol in ("SYM0", "SYM2"):
+            got = store.frame(symbol, interval)
+            group = trades[trades["symbol"] == symbol]
+            want = group["price"].resample(f"{seconds}s").ohlc()
+            want["volume"] = group["volume"].resample(f"{seconds}s").sum()
+            want = want.dropna().tail(bars)
+            same = (len(got) == len(want)
+                    and (got.index == want.index).all()
+                    and np.allclose(got[["Open", "High", "Low", "Close", "Volume"]].to_numpy(),
+                                    want[["open", "high", "low", "close", "volume"]].to_numpy()))
+            ok &= report(same, f"{symbol} {interval}: {len(got)} bars")
+    return ok
+
+
+def bench_ingest(symbols: int, ticks: int, bars: int) -> bool:
+    print(f"\n2) Ingest {ticks:,} trades over {symbols} symbols")
+    names, price, volume, ts = feed(symbols, ticks)
+    store = IntradayBars(bars=bars, max_symbols=symbols)
+    third = ticks // 3
+    chunks = [slice(0, third), slice(third, 2 * third), slice(2 * third, ticks)]
+
+    def ingest(chunk):
+        for s, p, v, t in zip(names[chunk], price[chunk], volume[chunk], ts[chunk]):
+            store.apply(s, p, v, t, traded=True)
+
+    ingest(chunks[0])
+    bytes_before = store.stats()["bytes"]
+    t0 = time.perf_counter()
+    ingest(chunks[1])
+    elapsed = time.perf_counter() - t0
+
+    tracemalloc.start()
+    start = tracemalloc.take_snapshot()
+    ingest(chunks[2])
+    grown = sum(stat.size_diff for stat in tracemalloc.take_snapshot().compare_to(start, "filename")
+                if "intraday_bars" in stat.traceback[0].filename)
+    tracemalloc.stop()
+
+    stats = store.stats()
+    print(f"   {elapsed / third * 1e6:.2f} µs/trade, {third / elapsed:,.0f} trades/s, "
+          f"{stats['bytes'] / 1024:.0f} KB for {stats['symbols']} symbols x 3 intervals x {bars} bars")
+    print("\n3) Memory stays flat after the rings wrap")
+    ok = report(stats["bytes"] == bytes_before, f"array bytes unchanged ({stats['bytes']:,})")
+    # A few hundred bytes of interpreter caches may appear once; per-trade growth would be MBs
+    ok &= report(grown < 1024, f"{grown} bytes retained by the aggregator over {ticks - 2 * third:,} trades")
+    wrapped = int((store.count == bars).sum())
+    ok &= report(wrapped > 0, f"{wrapped} symbol/interval rings full at {bars} bars")
+    return ok
+
+
+def check_snapshots() -> bool:
+    print("\n4) Snapshot quotes")
+    store = IntradayBars(bars=16, max_symbols=4)
+
+    def snapshot(price, ts, volume):
+        item = {"symbol": "AAPL", "price": price, "timestamp": ts, "volume": volume}
+        return SimpleNamespace(name="stocks", payload={"stocks": [item]})
+
+    base = T0_MS // 1000
+    store.on_snapshot(snapshot(100.0, base, 1000.0))
+    store.on_snapshot(snapshot(100.0, base, 1000.0))
+    store.on_snapshot(snapshot(101.0, base + 20, 1500.0))
+    store.on_snapshot(snapshot(99.0, base + 70, 1800.0))
+    bars = store.frame("AAPL", "1m")
+    ok = report(store.ticks == 3, "repeated timestamp skipped")
+    ok &= report(bars["Volume"].tolist() == [1500.0, 300.0], f"volume deltas {bars['Volume'].tolist()}")
+    ok &= report(bars["High"].iloc[0] == 101.0 and bars["Close"].iloc[-1] == 99.0, "prices folded")
+    store.apply("AAPL", 98.0, 10, (base + 80) * 1000, traded=True)
+    store.on_snapshot(snapshot(120.0, base + 90, 2000.0))
+    ok &= report(store.frame("AAPL", "1m")["Close"].iloc[-1] == 98.0, "traded symbols ignore snapshots")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--symbols", type=int, default=200)
+    parser.add_argument("--ticks", type=int, default=300_000)
+    parser.add_argument("--bars", type=int, default=60)
+    args = parser.parse_args()
+
+    ok = check_against_resample(args.bars)
+    ok &= bench_ingest(args.symbols, args.ticks, args.bars)
+    ok &= check_snapshots()
+    print("\nSummary:")
+    if ok:
+        print("  ✅ Intraday bars are exact and memory is bounded")
+        sys.exit(0)
+    print("  ❌ One or more checks failed")
+    sys.exit(3)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""Benchmark: /stocks/live paging, sorting and filtering as the universe grows.
+
+Builds synthetic quote snapshots of increasing size and times
+services.universe.QuoteTable queries the way the route issues them:
+  - cold:  first query after a new snapshot (sort order / filter built once)
+  - warm:  every later poll for the same view within that snapshot
+
+Warm page latency should stay flat across universe sizes; the cold cost is
+paid once per refresh, not per request.
+
+Exit code is 0 when the warm p50 at the largest size is within --max-ratio
+of the smallest size, else 3.
+
+Usage:
+  (from project root)
+  python backend/scripts/bench_live_pagination.py [--sizes 100,500,2000,10000] [--limit 50]
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from services.universe import QuoteTable  # noqa: E402
+
+QUERIES = [
+    ("first page", dict(offset=0)),
+    ("sort -change", dict(sort="-change")),
+    ("sort name, page 3", dict(sort="name", offset=100)),
+    ("search 'ab'", dict(q="ab", sort="-price")),
+]
+
+
+def make_quotes(n: int, seed: int = 7):
+    rng = random.Random(seed)
+    letters = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+    quotes = []
+    for i in range(n):
+        symbol = "".join(rng.choice(letters) for _ in range(4)) + str(i)
+        price = round(rng.uniform(5, 3000), 2)
+        quotes.append({
+            "symbol": symbol,
+            "name": f"{symbol.title()} Industries Ltd",
+            "price": price,
+            "change": round(rng.uniform(-8, 8), 2),
+            "high": price * 1.01,
+            "low": price * 0.99,
+            "open": price,
+            "previousClose": price,
+            "isMarketOpen": True,
+            "timestamp": 1700000000 + i,
+        })
+    return quotes
+
+
+def time_us(fn, repeat: int):
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t0) * 1e6)
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", default="100,500,2000,10000")
+    parser.add_argument("--limit", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=2000)
+    parser.add_argument("--max-ratio", type=float, default=3.0)
+    args = parser.parse_args()
+    sizes = [int(s) for s in args.sizes.split(",")]
+
+    warm_p50 = {}
+    for size in sizes:
+        quotes = make_quotes(size)
+        print(f"\nUniverse of {size} symbols (limit={args.limit})")
+        worst = 0.0
+        for label, params in QUERIES:
+            table = QuoteTable(quotes)
+            cold = time_us(lambda: table.query(limit=args.limit, **params), 1)[0]
+            warm = time_us(lambda: table.query(limit=args.limit, **params), args.repeat)
+            p50 = statistics.median(warm)
+            p99 = sorted(warm)[int(len(warm) * 0.99) - 1]
+            worst = max(worst, p50)
+            print(f"  {label:<20} cold {cold:9.1f} µs   warm p50 {p50:6.1f} µs   p99 {p99:6.1f} µs")
+        warm_p50[size] = worst
+
+    ratio = warm_p50[sizes[-1]] / warm_p50[sizes[0]]
+    print("\nSummary:")
+    print(f"  worst warm p50: {warm_p50[sizes[0]]:.1f} µs at {sizes[0]} -> {warm_p50[sizes[-1]]:.1f} µs at {sizes[-1]} ({ratio:.2f}x)")
+    if ratio <= args.max_ratio:
+        print("  ✅ Page latency stays flat as the universe grows")
+        sys.exit(0)
+    print(f"  ❌ Page latency grew more than {args.max_ratio}x")
+    sys.exit(3)
+
+
+if __name__ == "__main__":
+    main()
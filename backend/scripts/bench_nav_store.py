@@ -0,0 +1,196 @@
+"""Benchmark + correctness check: mutual fund NAV store.
+
+  1) Bulk load of a NAVAll.txt snapshot plus a NAV history report into one
+     index (rows kept, load time)
+  2) Point-in-time lookups (nav and the vectorised navs_at) agree with a
+     pandas as-of reference, including dates before a scheme's first NAV
+  3) Lookup cost: binary search over the index vs scanning the loaded rows
+  4) Scheme names as written in broker statements resolve to the right
+     scheme code, and equity names do not resolve to a fund
+
+The files are synthetic and written to a temporary directory.
+
+Exit code is 0 when every check passes, else 3.
+
+Usage:
+  (from project root)
+  python backend/scripts/bench_nav_store.py [--schemes 10000] [--days 250] [--lookups 2000]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from services.nav_store import NavStore  # noqa: E402
+
+AMCS = ["Axis", "HDFC", "ICICI Prudential", "SBI", "Kotak", "Nippon India", "Mirae Asset", "UTI", "DSP", "Tata"]
+CATEGORIES = ["Bluechip", "Flexi Cap", "Midcap", "Small Cap", "Liquid", "Corporate Bond", "ELSS Tax Saver",
+              "Balanced Advantage", "Nifty 50 Index", "Gilt", "Focused", "Value", "Multi Asset", "Overnight"]
+PLANS = ["Direct Plan - Growth", "Regular Plan - Growth", "Direct Plan - IDCW", "Regular Plan - IDCW"]
+END = date(2026, 10, 15)
+
+
+def report(ok: bool, message: str) -> bool:
+    print(f"   {'✓' if ok else '❌'} {message}")
+    return ok
+
+
+def scheme_names(schemes: int):
+    """Unique, realistic scheme names; series numbers keep them distinct past the base combinations"""
+    names = []
+    for i in range(schemes):
+        amc = AMCS[i % len(AMCS)]
+        category = CATEGORIES[(i // len(AMCS)) % len(CATEGORIES)]
+        plan = PLANS[(i // (len(AMCS) * len(CATEGORIES))) % len(PLANS)]
+        series = i // (len(AMCS) * len(CATEGORIES) * len(PLANS))
+        fund = f"{amc} {category} Fund" + (f" Series {series}" if series else "")
+        names.append((fund, plan))
+    return names
+
+
+def write_files(directory: str, schemes: int, days: int, seed: int = 11):
+    rng = np.random.default_rng(seed)
+    codes = 100000 + np.arange(schemes) * 3
+    names = scheme_names(schemes)
+    # Each scheme starts somewhere in the window, so early dates have no NAV for some
+    first = rng.integers(0, days // 2, schemes)
+    dates = [END - timedelta(days=days - d) for d in range(days)]
+    history_lines = ["Scheme Code;Scheme Name;ISIN Div Payout/ISIN Growth;ISIN Div Reinvestment;"
+                     "Net Asset Value;Repurchase Price;Sale Price;Date", ""]
+    rows = []
+    for i, code in enumerate(codes.tolist()):
+        fund, plan = names[i]
+        navs = 10 * np.exp(np.cumsum(rng.normal(0.0003, 0.01, days)))
+        for d in range(int(first[i]), days):
+            history_lines.append(f"{code};{fund} - {plan};INF{code:09d};-;{navs[d]:.4f};;;{dates[d]:%d-%b-%Y}")
+            rows.append((code, dates[d], round(float(navs[d]), 4)))
+    # Today's snapshot, grouped by fund house like NAVAll.txt
+    latest = 10 * np.exp(rng.normal(0.1, 0.2, schemes))
+    all_lines = ["Scheme Code;ISIN Div Payout/ ISIN Growth;ISIN Div Reinvestment;Scheme Name;Net Asset Value;Date", ""]
+    for amc in AMCS:
+        all_lines += ["", f"{amc} Mutual Fund", ""]
+        for i in range(AMCS.index(amc), schemes, len(AMCS)):
+            fund, plan = names[i]
+            all_lines.append(f"{codes[i]};INF{codes[i]:09d};-;{fund} - {plan};{latest[i]:.4f};{END:%d-%b-%Y}")
+            rows.append((int(codes[i]), END, round(float(latest[i]), 4)))
+    with open(os.path.join(directory, "nav_history.txt"), "w") as f:
+        f.write("\n".join(history_lines))
+    # The snapshot is newer than the history report
+    time.sleep(0.01)
+    with open(os.path.join(directory, "NAVAll.txt"), "w") as f:
+        f.write("\n".join(all_lines))
+    reference = pd.DataFrame(rows, columns=["code", "date", "nav"])
+    reference["date"] = pd.to_datetime(reference["date"])
+    return codes, names, reference
+
+
+def reference_lookup(reference: pd.DataFrame, code: int, on: date):
+    rows = reference[(reference["code"] == code) & (reference["date"] <= pd.Timestamp(on))]
+    if rows.empty:
+        return None
+    last = rows.loc[rows["date"].idxmax()]
+    return last["date"].date(), float(last["nav"])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--schemes", type=int, default=10000)
+    parser.add_argument("--days", type=int, default=250)
+    parser.add_argument("--lookups", type=int, default=2000)
+    args = parser.parse_args()
+
+    ok = True
+    rng = np.random.default_rng(3)
+    with tempfile.TemporaryDirectory() as directory:
+        print(f"Writing {args.schemes} schemes x up to {args.days} days of NAVs...")
+        codes, names, reference = write_files(directory, args.schemes, args.days)
+        store = NavStore(directory, reload_seconds=300)
+
+        print("\n1) Bulk load")
+        start = time.perf_counter()
+        loaded = store.load()
+        load_ms = (time.perf_counter() - start) * 1000
+        index = store.index
+        expected = reference.drop_duplicates(["code", "date"]).shape[0]
+        ok &= report(loaded and len(index) == args.schemes,
+                     f"{len(index)} schemes, {index.rows} NAVs in {load_ms:.0f}ms "
+                     f"({index.rows / load_ms * 1000:,.0f} rows/s)")
+        ok &= report(index.rows == expected, f"one NAV per (scheme, date): {index.rows} == {expected}")
+        ok &= report(not store.load(), "unchanged files are not reloaded")
+
+    print("\n2) Point-in-time lookups vs pandas as-of reference")
+    sample_codes = rng.choice(codes, args.lookups // 10)
+    sample_days = [END - timedelta(days=int(d)) for d in rng.integers(0, args.days + 5, len(sample_codes))]
+    mismatches = 0
+    for code, on in zip(sample_codes.tolist(), sample_days):
+        got, want = index.nav(code, on), reference_lookup(reference, code, on)
+        if (got is None) != (want is None) or (got and (got[0] != want[0] or abs(got[1] - want[1]) > 1e-9)):
+            mismatches += 1
+    ok &= report(mismatches == 0, f"nav(): {len(sample_codes)} lookups, {mismatches} mismatches")
+    on = END - timedelta(days=args.days // 3)
+    dates, navs = index.navs_at(np.append(codes, [1, 999999999]), on)
+    singles = [index.nav(code, on) for code in codes.tolist()]
+    same = all(
+        (s is None and np.isnan(n) and np.isnat(d)) or (s is not None and s[1] == n and np.datetime64(s[0]) == d)
+        for s, d, n in zip(singles, dates[:-2], navs[:-2])
+    )
+    ok &= report(same, f"navs_at() matches nav() for all {len(codes)} schemes as of {on}")
+    ok &= report(np.isnan(navs[-2:]).all() and np.isnat(dates[-2:]).all(), "unknown schemes give NaT / NaN")
+    latest = index.nav(int(codes[0]))
+    ok &= report(latest is not None and latest[0] == END, "latest NAV comes from the NAVAll snapshot")
+
+    print("\n3) Lookup cost")
+    lookup_codes = rng.choice(codes, args.lookups).tolist()
+    start = time.perf_counter()
+    for code in lookup_codes:
+        index.nav(code, on)
+    indexed_us = (time.perf_counter() - start) / len(lookup_codes) * 1e6
+    frame_codes, frame_dates, frame_navs = (reference["code"].to_numpy(), reference["date"].to_numpy(),
+                                            reference["nav"].to_numpy())
+    on64 = np.datetime64(on)
+    scans = lookup_codes[:max(1, args.lookups // 20)]
+    start = time.perf_counter()
+    for code in scans:
+        mask = (frame_codes == code) & (frame_dates <= on64)
+        if mask.any():
+            frame_navs[mask][np.argmax(frame_dates[mask])]
+    scan_us = (time.perf_counter() - start) / len(scans) * 1e6
+    start = time.perf_counter()
+    index.navs_at(lookup_codes, on)
+    bulk_us = (time.perf_counter() - start) / len(lookup_codes) * 1e6
+    print(f"      index {indexed_us:.1f}µs, navs_at {bulk_us:.2f}µs, scan {scan_us:.0f}µs per lookup")
+    ok &= report(scan_us / indexed_us >= 10, f"binary search {scan_us / indexed_us:.0f}x faster than a scan")
+
+    print("\n4) Scheme name resolution")
+    picks = rng.choice(len(codes), min(500, len(codes)), replace=False).tolist()
+    hits = 0
+    for i in picks:
+        fund, plan = names[i]
+        # Statements drop the "Plan" word and the dashes
+        written = f"{fund} {plan.replace(' Plan - ', ' ')}"
+        hits += store.resolve(written) == int(codes[i])
+    accuracy = hits / len(picks)
+    ok &= report(accuracy >= 0.95, f"{hits}/{len(picks)} statement names resolve to their scheme ({accuracy:.1%})")
+    ok &= report(all(store.resolve(str(int(c))) == int(c) for c in codes[:50]), "scheme codes resolve directly")
+    equities = ["Reliance Industries", "HDFC Bank", "Infosys", "Tata Motors", "ICICI Bank", "Axis Bank"]
+    wrong = [e for e in equities if store.resolve(e) is not None]
+    ok &= report(not wrong, f"equity names stay unresolved{': ' + ', '.join(wrong) if wrong else ''}")
+
+    print("\nSummary:")
+    if ok:
+        print("  ✅ NAV store loads, looks up and resolves correctly")
+        sys.exit(0)
+    print("  ❌ One or more checks failed")
+    sys.exit(3)
+
+
+if __name__ == "__main__":
+    main()
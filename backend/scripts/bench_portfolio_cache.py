@@ -0,0 +1,197 @@
+"""Benchmark + correctness check: parsed-portfolio cache in PortfolioService.
+
+  1) Analysing the same upload again skips the download and the parse:
+     one conditional GET answered 304 (cost compared with a cold fetch
+     for information; timings do not decide the result)
+  2) A re-uploaded file (new ETag) is downloaded and parsed again
+  3) Concurrent analyses of one file share a single S3 fetch
+  4) The cache stays within its byte budget, evicting least recently used
+     files first
+  5) Callers get copies; analysing (which adds columns) cannot corrupt the
+     cached frame
+
+S3 is an in-process fake with the conditional-GET semantics of the real
+service and a fixed per-request latency; no AWS account is used.
+
+Exit code is 0 when every check passes, else 3.
+
+Usage:
+  (from project root)
+  python backend/scripts/bench_portfolio_cache.py [--holdings 500] [--latency-ms 40] [--repeats 20]
+"""
+
+import argparse
+import asyncio
+import hashlib
+import io
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+from botocore.exceptions import ClientError
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from services.portfolio_service import PortfolioService  # noqa: E402
+
+
+def report(ok: bool, message: str) -> bool:
+    print(f"   {'✓' if ok else '❌'} {message}")
+    return ok
+
+
+class FakeS3:
+    """get_object with ETags and IfNoneMatch, counting requests and bytes sent"""
+
+    def __init__(self, latency_s: float):
+        self.latency_s = latency_s
+        self.objects = {}
+        self.gets = 0
+        self.not_modified = 0
+        self.bytes_sent = 0
+        self._lock = threading.Lock()
+
+    def put(self, bucket: str, key: str, body: bytes):
+        self.objects[(bucket, key)] = (body, f'"{hashlib.md5(body).hexdigest()}"')
+
+    def get_object(self, Bucket, Key, IfNoneMatch=None):
+        time.sleep(self.latency_s)
+        with self._lock:
+            self.gets += 1
+        if (Bucket, Key) not in self.objects:
+            raise ClientError({"Error": {"Code": "NoSuchKey", "Message": "Not Found"},
+                               "ResponseMetadata": {"HTTPStatusCode": 404}}, "GetObject")
+        body, etag = self.objects[(Bucket, Key)]
+        if IfNoneMatch == etag:
+            with self._lock:
+                self.not_modified += 1
+            raise ClientError({"Error": {"Code": "304", "Message": "Not Modified"},
+                               "ResponseMetadata": {"HTTPStatusCode": 304}}, "GetObject")
+        with self._lock:
+            self.bytes_sent += len(body)
+        # Transfer time grows with the file
+        time.sleep(len(body) / 50e6)
+        return {"Body": io.BytesIO(body), "ETag": etag}
+
+
+def groww_workbook(holdings: int, seed: int) -> bytes:
+    """Holdings statement in the Groww layout: title and summary rows above the table"""
+    rng = np.random.default_rng(seed)
+    table = pd.DataFrame({
+        "Stock Name": [f"Company {i} Limited" for i in range(holdings)],
+        "ISIN": [f"INE{i:06d}01" for i in range(holdings)],
+        "Quantity": rng.integers(1, 500, holdings),
+        "Average buy price": rng.uniform(50, 5000, holdings).round(2),
+        "Buy value": 0.0,
+        "Closing price": rng.uniform(50, 5000, holdings).round(2),
+    })
+    table["Buy value"] = (table["Quantity"] * table["Average buy price"]).round(2)
+    out = io.BytesIO()
+    with pd.ExcelWriter(out, engine="openpyxl") as writer:
+        pd.DataFrame([["Holdings statement"], ["Client code: 1234"], [""], ["Summary"], [""]]).to_excel(
+            writer, index=False, header=False)
+        table.to_excel(writer, index=False, startrow=6)
+    return out.getvalue()
+
+
+def make_service(s3: FakeS3, max_bytes: int) -> PortfolioService:
+    service = PortfolioService()
+    service.s3_client = s3
+    service.bucket_name = "bench-bucket"
+    service.cache_max_bytes = max_bytes
+    return service
+
+
+async def run(args) -> bool:
+    ok = True
+    s3 = FakeS3(args.latency_ms / 1000)
+    service = make_service(s3, 64 * 1024 * 1024)
+    body = groww_workbook(args.holdings, 1)
+    s3.put("bench-bucket", "users/u1/holdings.xlsx", body)
+    print(f"Workbook: {args.holdings} holdings, {len(body) / 1024:.0f} KB")
+
+    print("\n1) Repeated analysis of one file")
+    start = time.perf_counter()
+    first = await service.fetch_portfolio_from_s3("u1", "holdings.xlsx")
+    cold_ms = (time.perf_counter() - start) * 1000
+    sent = s3.bytes_sent
+    start = time.perf_counter()
+    for _ in range(args.repeats):
+        again = await service.fetch_portfolio_from_s3("u1", "holdings.xlsx")
+    warm_ms = (time.perf_counter() - start) * 1000 / args.repeats
+    print(f"      cold {cold_ms:.1f}ms (parse {service.last_parse_ms:.1f}ms), cached {warm_ms:.1f}ms per analysis "
+          f"({cold_ms / warm_ms:.1f}x)")
+    ok &= report(len(first) == args.holdings and again.equals(first), "cached frame equals the parsed one")
+    ok &= report(s3.bytes_sent == sent and s3.not_modified == args.repeats,
+                 f"{args.repeats} repeats: {s3.not_modified} x 304, no bytes downloaded")
+    ok &= report(service.cache_hits == args.repeats and service.cache_misses == 1, "no re-parse on a hit")
+
+    print("\n2) Re-uploaded file")
+    s3.put("bench-bucket", "users/u1/holdings.xlsx", groww_workbook(args.holdings + 7, 2))
+    updated = await service.fetch_portfolio_from_s3("u1", "holdings.xlsx")
+    ok &= report(len(updated) == args.holdings + 7 and service.cache_misses == 2,
+                 "new ETag is downloaded and parsed again")
+    del s3.objects[("bench-bucket", "users/u1/holdings.xlsx")]
+    try:
+        await service.fetch_portfolio_from_s3("u1", "holdings.xlsx")
+        gone = False
+    except ClientError:
+        gone = service.stats()["entries"] == 0
+    ok &= report(gone, "deleted file raises and leaves the cache")
+
+    print("\n3) Concurrent analyses")
+    s3.put("bench-bucket", "users/u2/holdings.xlsx", body)
+    gets = s3.gets
+    frames = await asyncio.gather(*(service.fetch_portfolio_from_s3("u2", "holdings.xlsx") for _ in range(20)))
+    ok &= report(s3.gets - gets == 1 and service.coalesced == 19,
+                 f"20 concurrent requests -> {s3.gets - gets} S3 GET ({service.coalesced} coalesced)")
+    ok &= report(len({id(f) for f in frames}) == 20, "each caller gets its own frame")
+
+    print("\n4) Byte budget")
+    size = service.stats()["bytes"]
+    budget = int(size * 3.5)
+    small = make_service(s3, budget)
+    for n in range(6):
+        s3.put("bench-bucket", f"users/u{n}/p.xlsx", body)
+    for n in range(3):
+        await small.fetch_portfolio_from_s3(f"u{n}", "p.xlsx")
+    await small.fetch_portfolio_from_s3("u0", "p.xlsx")  # hit: u0 becomes most recently used
+    for n in (3, 4):
+        await small.fetch_portfolio_from_s3(f"u{n}", "p.xlsx")
+    cached = {key[1].split("/")[1] for key in small._cache}
+    stats = small.stats()
+    ok &= report(stats["bytes"] <= budget, f"{stats['bytes']} bytes cached, budget {budget}")
+    ok &= report(cached == {"u0", "u3", "u4"} and stats["evictions"] == 2 and stats["hits"] == 1,
+                 f"least recently used evicted first (kept {sorted(cached)})")
+
+    print("\n5) Copies")
+    df = await service.fetch_portfolio_from_s3("u2", "holdings.xlsx")
+    await service.analyze_portfolio(df)
+    clean = await service.fetch_portfolio_from_s3("u2", "holdings.xlsx")
+    ok &= report("allocation_pct" in df.columns and "allocation_pct" not in clean.columns,
+                 "analysis columns do not leak into the cache")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--holdings", type=int, default=500)
+    parser.add_argument("--latency-ms", type=float, default=40)
+    parser.add_argument("--repeats", type=int, default=20)
+    args = parser.parse_args()
+
+    ok = asyncio.run(run(args))
+
+    print("\nSummary:")
+    if ok:
+        print("  ✅ Portfolio cache skips download and parsing for unchanged files")
+        sys.exit(0)
+    print("  ❌ One or more checks failed")
+    sys.exit(3)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+"""Benchmark: payload size and encode time per response format.
+
+Encodes three synthetic payloads shaped like the real routes:
+  - /api/finance/quote   (N daily candles, row and Arrow-column forms)
+  - /api/stocks/live     (S live quotes)
+  - /api/portfolio/analyze (H holdings plus summary)
+
+with FastAPI's default path (jsonable_encoder + json.dumps, what the routes
+did before) and with utils.encoding's JSON, MessagePack and Arrow IPC
+encoders, then reports raw, gzip and brotli (if installed) sizes. Every
+encoded body is decoded again and compared with the source payload.
+
+Exit code is 0 when all round trips match, else 3.
+
+Usage:
+  (from project root)
+  python backend/scripts/bench_response_encodings.py [--bars 10000] [--stocks 500] [--holdings 200]
+"""
+
+import argparse
+import gzip
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+from utils import encoding  # noqa: E402
+from utils.candles import history_to_arrays, history_to_candles  # noqa: E402
+
+
+def make_history(n: int) -> pd.DataFrame:
+    rng = np.random.default_rng(7)
+    index = pd.date_range("1990-01-02", periods=n, freq="B", tz="America/New_York")
+    close = 100 + np.cumsum(rng.normal(0, 1, n))
+    return pd.DataFrame({
+        "Open": close + rng.normal(0, 0.5, n),
+        "High": close + 1.0,
+        "Low": close - 1.0,
+        "Close": close,
+        "Volume": rng.integers(1_000, 10_000_000, n).astype("f8"),
+    }, index=index)
+
+
+def make_live(n: int) -> dict:
+    rng = np.random.default_rng(11)
+    stocks = []
+    for i in range(n):
+        price = float(rng.uniform(5, 900))
+        stocks.append({
+            "symbol": f"SYM{i}",
+            "name": f"Company {i} Inc.",
+            "price": round(price, 2),
+            "change": round(float(rng.normal(0, 3)), 2),
+            "changePercent": round(float(rng.normal(0, 1.5)), 2),
+            "high": round(price * 1.02, 2),
+            "low": round(price * 0.98, 2),
+            "open": round(price * 1.001, 2),
+            "previousClose": round(price * 0.995, 2),
+            "timestamp": 1_760_000_000 + i,
+            "isMarketOpen": True,
+        })
+    return {"stocks": stocks, "marketStatus": "open", "lastUpdated": "2025-10-16T10:00:00",
+            "snapshotAge": 0.4, "snapshotVersion": 42, "stale": False}
+
+
+def make_portfolio(n: int) -> dict:
+    rng = np.random.default_rng(3)
+    holdings = []
+    for i in range(n):
+        qty = int(rng.integers(1, 500))
+        buy = float(rng.uniform(10, 3000))
+        cur = buy * float(rng.uniform(0.6, 1.8))
+        holdings.append({
+            "symbol": f"HOLD{i}.NS", "quantity": qty, "purchase_price": buy,
+            "invested_value": qty * buy, "allocation_pct": 100.0 / n,
+            "current_price": cur, "current_value": qty * cur,
+            "profit_loss": qty * (cur - buy), "profit_loss_pct": (cur / buy - 1) * 100,
+        })
+    pie = [{"symbol": h["symbol"], "value": h["invested_value"], "percentage": h["allocation_pct"],
+            "quantity": h["quantity"]} for h in holdings]
+    summary = {"total_invested": sum(h["invested_value"] for h in holdings), "total_stocks": n,
+               "total_current_value": None, "total_profit_loss": None, "total_return_pct": None,
+               "winners": None, "losers": None, "pie_chart_data": pie}
+    return {"summary": summary, "holdings": holdings, "ai_insights": "Diversified across sectors."}
+
+
+def fastapi_default(payload) -> bytes:
+    """What a route returning a dict costs with FastAPI's default JSONResponse"""
+    return json.dumps(jsonable_encoder(payload), ensure_ascii=False, allow_nan=False,
+                      indent=None, separators=(",", ":")).encode("utf-8")
+
+
+def best_of(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best * 1000.0
+
+
+def sizes(body: bytes) -> str:
+    gz = len(gzip.compress(body, compresslevel=5))
+    br = len(encoding.brotli.compress(body, quality=4)) if encoding.brotli else None
+    br_text = f"{br:>10,}" if br is not None else f"{'n/a':>10}"
+    return f"{len(body):>11,} {gz:>10,} {br_text}"
+
+
+def roundtrip_ok(media: str, body: bytes, payload: dict, table_key: str, rows: int) -> bool:
+    if media == encoding.JSON:
+        return json.loads(body) == jsonable_encoder(payload)
+    if media == encoding.MSGPACK:
+        return encoding.msgpack.unpackb(body, raw=False) == jsonable_encoder(payload)
+    table = encoding.pa.ipc.open_stream(body).read_all()
+    meta = json.loads(table.schema.metadata[encoding.ARROW_PAYLOAD_KEY])
+    rest = {k: v for k, v in jsonable_encoder(payload).items() if k != table_key}
+    return table.num_rows == rows and meta == rest
+
+
+def bench_case(title: str, payload: dict, table_key: str, rows: int, columns=None, arrow_payload=None) -> bool:
+    print(f"\n{title}")
+    print(f"  {'encoder':<22} {'encode':>9} {'raw bytes':>11} {'gzip':>10} {'brotli':>10}")
+    repeat = 5
+    ok = True
+
+    body = fastapi_default(payload)
+    ms = best_of(lambda: fastapi_default(payload), repeat)
+    print(f"  {'fastapi default json':<22} {ms:>7.2f}ms {sizes(body)}")
+    baseline = ms
+
+    for media in encoding.available_media_types():
+        src = payload
+        cols = None
+        if media == encoding.ARROW_STREAM and arrow_payload is not None:
+            src, cols = arrow_payload, columns
+        body = encoding.encode(src, media, table_key, cols)
+        ms = best_of(lambda: encoding.encode(src, media, table_key, cols), repeat)
+        label = {encoding.JSON: "orjson" if encoding.orjson else "json (stdlib)",
+                 encoding.MSGPACK: "msgpack",
+                 encoding.ARROW_STREAM: "arrow ipc"}[media]
+        check = roundtrip_ok(media, body, payload, table_key, rows)
+        ok = ok and check
+        mark = "" if check else "  ❌ round trip mismatch"
+        print(f"  {label:<22} {ms:>7.2f}ms {sizes(body)}   {baseline / ms:5.1f}x{mark}")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--bars", type=int, default=10000)
+    parser.add_argument("--stocks", type=int, default=500)
+    parser.add_argument("--holdings", type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"Encoders available: {', '.join(encoding.available_media_types())}"
+          f"{' + brotli' if encoding.brotli else ' (brotli not installed)'}")
+
+    hist = make_history(args.bars)
+    quote = {"symbol": "AAPL", "range": "max", "price": float(hist["Close"].iloc[-1]),
+             "candles": history_to_candles(hist)}
+    quote_meta = {k: v for k, v in quote.items() if k != "candles"}
+
+    ok = bench_case(f"/api/finance/quote ({args.bars:,} candles)", quote, "candles", args.bars,
+                    columns=history_to_arrays(hist), arrow_payload=quote_meta)
+    ok &= bench_case(f"/api/stocks/live ({args.stocks:,} quotes)", make_live(args.stocks),
+                     "stocks", args.stocks)
+    ok &= bench_case(f"/api/portfolio/analyze ({args.holdings:,} holdings)",
+                     make_portfolio(args.holdings), "holdings", args.holdings)
+
+    print("\nSummary:")
+    if ok:
+        print("  ✅ All encoders round-trip their payloads")
+        sys.exit(0)
+    print("  ❌ One or more encoders changed the payload")
+    sys.exit(3)
+
+
+if __name__ == "__main__":
+    main()
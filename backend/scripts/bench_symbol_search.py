@@ -0,0 +1,154 @@
+"""Benchmark + checks for the local symbol master used by /api/finance/search.
+
+Writes synthetic listing files in the real exchange formats (NSE EQUITY_L.csv,
+BSE scrip master, nasdaqlisted.txt, otherlisted.txt) to a temp directory,
+loads them through services.symbol_master and checks:
+  1) exact tickers rank first (RELIANCE -> RELIANCE.NS)
+  2) company-name prefixes match ("tata mot" -> TATAMOTORS.NS)
+  3) typos still match through the trigram index ("relaince")
+  4) hot reload picks up a new listing file without a restart
+
+then times a mix of 1-8 character queries and reports p50/p99 latency.
+Exit code is 0 when every check passes and p99 is under --max-p99-us, else 3.
+
+Usage:
+  (from project root)
+  python backend/scripts/bench_symbol_search.py [--symbols 20000] [--queries 5000] [--max-p99-us 2000]
+"""
+
+import argparse
+import os
+import random
+import string
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from services.symbol_master import SymbolMaster  # noqa: E402
+
+REAL_NSE = [
+    ("RELIANCE", "Reliance Industries Limited"),
+    ("TCS", "Tata Consultancy Services Limited"),
+    ("TATAMOTORS", "Tata Motors Limited"),
+    ("TATASTEEL", "Tata Steel Limited"),
+    ("INFY", "Infosys Limited"),
+    ("HDFCBANK", "HDFC Bank Limited"),
+]
+WORDS = ["Global", "Power", "Finance", "Pharma", "Steel", "Textiles", "Energy", "Systems",
+         "Capital", "Infra", "Foods", "Motors", "Chemicals", "Bank", "Holdings", "Digital"]
+
+
+def random_company(rng: random.Random):
+    stem = "".join(rng.choice(string.ascii_uppercase) for _ in range(rng.randint(3, 7)))
+    name = f"{stem.title()} {rng.choice(WORDS)} {rng.choice(['Limited', 'Ltd', 'Inc.', 'Corp'])}"
+    return stem, name
+
+
+def write_listings(directory: str, n: int):
+    rng = random.Random(5)
+    per_file = n // 4
+    with open(os.path.join(directory, "EQUITY_L.csv"), "w") as f:
+        f.write("SYMBOL,NAME OF COMPANY, SERIES, DATE OF LISTING, PAID UP VALUE, MARKET LOT, ISIN NUMBER, FACE VALUE\n")
+        for symbol, name in REAL_NSE:
+            f.write(f"{symbol},{name},EQ,01-JAN-2000,10,1,INE000000000,10\n")
+        for _ in range(per_file):
+            symbol, name = random_company(rng)
+            f.write(f"{symbol},{name},EQ,01-JAN-2000,10,1,INE000000000,10\n")
+    with open(os.path.join(directory, "bse_scrips.csv"), "w") as f:
+        f.write("Security Code,Issuer Name,Security Id,Security Name,Status,Group,Face Value,ISIN No,Instrument\n")
+        f.write("500325,Reliance Industries Ltd,RELIANCE,RELIANCE INDUSTRIES LTD.,Active,A,10,INE002A01018,Equity\n")
+        for i in range(per_file):
+            symbol, name = random_company(rng)
+            f.write(f"{500000 + i},{name},{symbol},{name.upper()},Active,B,10,INE000000000,Equity\n")
+    with open(os.path.join(directory, "nasdaqlisted.txt"), "w") as f:
+        f.write("Symbol|Security Name|Market Category|Test Issue|Financial Status|Round Lot Size|ETF|NextShares\n")
+        f.write("AAPL|Apple Inc. - Common Stock|Q|N|N|100|N|N\n")
+        f.write("ZXZZT|NASDAQ TEST STOCK|G|Y|N|100|N|N\n")
+        for _ in range(per_file):
+            symbol, name = random_company(rng)
+            f.write(f"{symbol}|{name} - Common Stock|Q|N|N|100|N|N\n")
+        f.write("File Creation Time: 1016202519:00|||||||\n")
+    with open(os.path.join(directory, "otherlisted.txt"), "w") as f:
+        f.write("ACT Symbol|Security Name|Exchange|CQS Symbol|ETF|Round Lot Size|Test Issue|NASDAQ Symbol\n")
+        f.write("JPM|JPMorgan Chase & Co. Common Stock|N|JPM|N|100|N|JPM\n")
+        f.write("SPY|SPDR S&P 500 ETF Trust|P|SPY|Y|100|N|SPY\n")
+        for _ in range(per_file):
+            symbol, name = random_company(rng)
+            f.write(f"{symbol}|{name}|N|{symbol}|N|100|N|{symbol}\n")
+
+
+def check(label: str, results, expected: str, position: int = 0) -> bool:
+    got = [r["symbol"] for r in results]
+    ok = len(got) > position and got[position] == expected
+    print(f"  {'✓' if ok else '❌'} {label:<38} -> {got[:4]}")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--symbols", type=int, default=20000)
+    parser.add_argument("--queries", type=int, default=5000)
+    parser.add_argument("--max-p99-us", type=float, default=2000.0)
+    args = parser.parse_args()
+
+    ok = True
+    with tempfile.TemporaryDirectory() as directory:
+        write_listings(directory, args.symbols)
+        master = SymbolMaster(directory, reload_seconds=30, exchange_priority=["NSE", "BSE", "NASDAQ", "NYSE"])
+        master.load()
+        print(f"Loaded {len(master):,} symbols in {master.last_load_ms:.0f} ms\n")
+
+        print("Checks:")
+        ok &= check("exact ticker ranks first", master.search("reliance", 5), "RELIANCE.NS")
+        ok &= check("same ticker on BSE ranks second", master.search("reliance", 5), "RELIANCE.BO", 1)
+        ok &= check("company name words", master.search("tata mot", 5), "TATAMOTORS.NS")
+        ok &= check("typo via trigrams", master.search("relaince", 5), "RELIANCE.NS")
+        ok &= check("US listing", master.search("AAPL", 5), "AAPL")
+        ok &= check("otherlisted ETF", master.search("SPY", 5), "SPY")
+        etf = master.get("SPY")
+        if etf is None or etf.type != "ETF" or etf.exchange != "NYSE Arca":
+            print(f"  ❌ SPY parsed as {etf}")
+            ok = False
+        if master.get("ZXZZT") is not None:
+            print("  ❌ test issue was not skipped")
+            ok = False
+
+        with open(os.path.join(directory, "custom.csv"), "w") as f:
+            f.write("symbol,name,exchange,currency\nNEWCO.NS,Newly Listed Co,NSE,INR\n")
+        reloaded = master.load()
+        ok &= reloaded and check("hot reload picks up a new file", master.search("newly", 3), "NEWCO.NS")
+        if master.load():
+            print("  ❌ reload without file changes rebuilt the index")
+            ok = False
+
+        rng = random.Random(9)
+        keys = [e.symbol.split(".")[0] for e in master._index.entries]
+        queries = []
+        for _ in range(args.queries):
+            key = rng.choice(keys)
+            queries.append(key[:rng.randint(1, min(8, len(key)))].lower())
+        timings = []
+        for query in queries:
+            t0 = time.perf_counter()
+            master.search(query, 10)
+            timings.append((time.perf_counter() - t0) * 1e6)
+        timings.sort()
+        p50 = timings[len(timings) // 2]
+        p99 = timings[int(len(timings) * 0.99)]
+        print(f"\nSearch latency over {len(queries):,} queries: p50 {p50:.0f} µs, p99 {p99:.0f} µs")
+
+    print("\nSummary:")
+    if ok and p99 <= args.max_p99_us:
+        print("  ✅ Symbol master checks pass")
+        sys.exit(0)
+    if ok:
+        print(f"  ❌ p99 {p99:.0f} µs above {args.max_p99_us:.0f} µs")
+    else:
+        print("  ❌ One or more checks failed")
+    sys.exit(3)
+
+
+if __name__ == "__main__":
+    main()
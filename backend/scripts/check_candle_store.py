@@ -0,0 +1,133 @@
+"""Correctness check: candle store coverage and short ranges.
+
+  1) A cold read whose upstream fetch fails saves nothing; the next read
+     fetches again
+  2) A failed fetch of older history leaves that window uncovered, so a
+     later read for it still fetches the missing bars
+  3) A failed tail refresh does not count as refreshed
+  4) '1d' and '5d' return the newest 1 and 5 trading bars (plus the
+     previous close) even when the last bar is days old (weekend, holiday)
+
+The upstream is an in-process fake serving weekday bars; failures are
+simulated by returning an empty frame or None, as yfinance does.
+
+Exit code is 0 when every check passes, else 3.
+
+Usage:
+  (from project root)
+  python backend/scripts/check_candle_store.py
+"""
+
+import json
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from services.candle_store import CandleStore, range_bars, range_start  # noqa: E402
+
+DAY = 86400
+
+
+def report(ok: bool, message: str) -> bool:
+    print(f"   {'✓' if ok else '❌'} {message}")
+    return ok
+
+
+class FakeUpstream:
+    """Daily bars on weekdays up to `last_day`; `failing` makes every call come back empty"""
+
+    def __init__(self, last_day: int):
+        days = np.arange(last_day - 400 * DAY, last_day + DAY, DAY)
+        weekdays = days[((days // DAY) + 3) % 7 < 5]  # 1970-01-01 was a Thursday
+        self.ts = weekdays
+        self.failing = False
+        self.calls = []
+
+    def __call__(self, symbol, interval, start, end):
+        self.calls.append((start, end))
+        if self.failing:
+            return None if len(self.calls) % 2 else pd.DataFrame()
+        lo = 0 if start is None else np.searchsorted(self.ts, start)
+        hi = len(self.ts) if end is None else np.searchsorted(self.ts, end)
+        ts = self.ts[lo:hi]
+        close = 100 + (ts // DAY % 50).astype("f8")
+        index = pd.DatetimeIndex(pd.to_datetime(ts, unit="s", utc=True), name="Date")
+        return pd.DataFrame({"Open": close, "High": close + 1, "Low": close - 1, "Close": close, "Volume": 1.0},
+                            index=index)
+
+
+def main():
+    ok = True
+    # Monday 00:00 UTC: the newest bar is Friday's when the week has not traded yet
+    now = time.time()
+    monday = int(now // DAY * DAY)
+    while ((monday // DAY) + 3) % 7 != 0:
+        monday -= DAY
+    friday = monday - 3 * DAY
+
+    with tempfile.TemporaryDirectory() as root:
+        store = CandleStore(root, tail_refresh_seconds=3600)
+        upstream = FakeUpstream(friday)
+
+        print("1) Cold read with a failing upstream")
+        upstream.failing = True
+        frame = store.read("AAA", "1d", range_start("1mo"), upstream)
+        ok &= report(frame.empty and not os.listdir(root), "nothing saved after a failed cold fetch")
+        upstream.failing = False
+        frame = store.read("AAA", "1d", range_start("1mo"), upstream)
+        ok &= report(len(frame) >= 15, f"next read fetches again ({len(frame)} bars)")
+
+        print("\n2) Failed fetch of older history")
+        store = CandleStore(os.path.join(root, "b"), tail_refresh_seconds=3600)
+        store.read("BBB", "1d", range_start("1d"), upstream)
+        upstream.failing = True
+        short = store.read("BBB", "1d", range_start("1mo"), upstream)
+        upstream.failing = False
+        calls = len(upstream.calls)
+        month = store.read("BBB", "1d", range_start("1mo"), upstream)
+        ok &= report(len(upstream.calls) > calls and len(month) > len(short),
+                     f"window retried after the failure ({len(short)} -> {len(month)} bars)")
+        calls = len(upstream.calls)
+        store.read("BBB", "1d", range_start("1mo"), upstream)
+        ok &= report(len(upstream.calls) == calls, "covered once a fetch succeeded")
+
+        print("\n3) Failed tail refresh")
+        meta_path = store._paths("BBB", "1d")[1]
+        with open(meta_path) as f:
+            before = json.load(f)["last_fetch"]
+        store.tail_refresh_seconds = 0
+        upstream.failing = True
+        calls = len(upstream.calls)
+        store.read("BBB", "1d", range_start("1mo"), upstream)
+        upstream.failing = False
+        with open(meta_path) as f:
+            after = json.load(f)["last_fetch"]
+        ok &= report(len(upstream.calls) == calls + 1 and after == before,
+                     "failed tail fetch leaves last_fetch unchanged")
+
+        print("\n4) Short ranges over a weekend")
+        store = CandleStore(os.path.join(root, "c"), tail_refresh_seconds=3600)
+        for range_value, bars in (("1d", 1), ("5d", 5)):
+            frame = store.read("CCC", "1d", range_start(range_value), upstream, last=range_bars(range_value))
+            newest = int(frame.index[-1].timestamp()) if len(frame) else None
+            ok &= report(len(frame) == bars + 1 and newest == friday,
+                         f"{range_value}: {len(frame)} bars ending on the last trading day")
+        cached = store.read_cached("CCC", "1d", range_start("1d"), last=range_bars("1d"))
+        ok &= report(len(cached) == 2, "read_cached applies the same window")
+
+    print("\nSummary:")
+    if ok:
+        print("  ✅ Coverage is only recorded for fetched bars; short ranges count trading bars")
+        sys.exit(0)
+    print("  ❌ One or more checks failed")
+    sys.exit(3)
+
+
+if __name__ == "__main__":
+    main()
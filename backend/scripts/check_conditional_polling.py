@@ -0,0 +1,161 @@
+"""Regression check: ETag / 304 savings over a simulated polling session.
+
+Mounts the stocks and portfolio routers on a bare FastAPI app (no network:
+the stocks snapshot is fed by a stand-in loader, the S3 listing by a
+stand-in coroutine) and replays a session of browser-like polls:
+
+  - --clients tabs poll /api/stocks/live, /api/stocks/indices and
+    /api/portfolios/{user_id} once per refresher cycle
+  - during the "open" phase a few quotes move on --change-rate of cycles,
+    during the "closed" phase nothing moves
+  - each tab sends If-None-Match with the last ETag it saw
+
+Bytes on the wire (status line, headers and body) are compared with the
+same session without conditional requests.
+
+Exit code is 0 when the closed-market session saves at least 90% and the
+whole session at least 50%, else 3.
+
+Usage:
+  (from project root)
+  python backend/scripts/check_conditional_polling.py [--clients 20] [--cycles 60] [--symbols 500]
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+os.environ.setdefault("FINANCEHUB_API_KEY", "stand-in")
+
+import httpx  # noqa: E402
+from fastapi import FastAPI  # noqa: E402
+from routes import stocks  # noqa: E402
+from routes.portfolio import router as portfolio_router  # noqa: E402
+from services.market_data import market_refresher  # noqa: E402
+from services.portfolio_service import portfolio_service  # noqa: E402
+
+ENDPOINTS = ["/api/stocks/live", "/api/stocks/indices", "/api/portfolios/user-1"]
+
+
+class StandInMarket:
+    """Quote universe whose prices move only when told to"""
+
+    def __init__(self, symbols: int, seed: int = 11):
+        self.rng = random.Random(seed)
+        self.quotes = [
+            {"symbol": f"SYM{i}", "name": f"Company {i}", "price": 100.0 + i, "change": 0.0,
+             "high": 101.0 + i, "low": 99.0 + i, "open": 100.0 + i, "previousClose": 100.0 + i,
+             "isMarketOpen": True, "timestamp": 1700000000, "provider": "stand-in"}
+            for i in range(symbols)
+        ]
+        self.indices = [{"symbol": "^GSPC", "name": "S&P 500", "price": 5000.0, "change": 0.0}]
+
+    def move(self, count: int):
+        for quote in self.rng.sample(self.quotes, count):
+            quote["price"] = round(quote["price"] * (1 + self.rng.uniform(-0.01, 0.01)), 2)
+            quote["timestamp"] += 5
+        self.indices[0]["price"] = round(self.indices[0]["price"] + self.rng.uniform(-5, 5), 2)
+
+    async def load_stocks(self):
+        stocks_data = [dict(q) for q in self.quotes]
+        return {"stocks": stocks_data, "count": len(stocks_data), "universe": len(stocks_data),
+                "marketOpen": True, "timestamp": f"cycle-{self.rng.random()}"}
+
+    async def load_indices(self):
+        return {"indices": [dict(i) for i in self.indices], "count": len(self.indices)}
+
+
+async def list_portfolios(user_id: str):
+    return [{"filename": f"holdings-{i}.xlsx", "size": 18000 + i, "last_modified": "2024-01-01T00:00:00",
+             "s3_key": f"users/{user_id}/holdings-{i}.xlsx"} for i in range(12)]
+
+
+def wire_bytes(response: httpx.Response) -> int:
+    head = len(f"HTTP/1.1 {response.status_code} {response.reason_phrase}\r\n")
+    head += sum(len(k) + len(v) + 4 for k, v in response.headers.items()) + 2
+    return head + len(response.content)
+
+
+async def run_session(market: StandInMarket, clients: int, cycles: int, change_rate: float,
+                      conditional: bool, open_phase: bool):
+    app = FastAPI()
+    app.include_router(stocks.router, prefix="/api")
+    app.include_router(portfolio_router, prefix="/api")
+    transport = httpx.ASGITransport(app=app)
+    etags = [{} for _ in range(clients)]
+    total = not_modified = 0
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        for _ in range(cycles):
+            if open_phase and market.rng.random() < change_rate:
+                market.move(5)
+            await market_refresher.refresh("stocks")
+            await market_refresher.refresh("indices")
+            for tab in etags:
+                for path in ENDPOINTS:
+                    headers = {"Accept-Encoding": "gzip"}
+                    if conditional and path in tab:
+                        headers["If-None-Match"] = tab[path]
+                    response = await client.get(path, headers=headers)
+                    assert response.status_code in (200, 304), (path, response.status_code, response.text)
+                    if response.status_code == 304:
+                        not_modified += 1
+                    tab[path] = response.headers.get("etag", "")
+                    total += wire_bytes(response)
+    return total, not_modified
+
+
+def report(ok: bool, message: str) -> bool:
+    print(f"   {'✓' if ok else '❌'} {message}")
+    return ok
+
+
+async def run_checks(clients: int, cycles: int, symbols: int, change_rate: float) -> bool:
+    market = StandInMarket(symbols)
+    market_refresher.register("stocks", market.load_stocks, volatile=("timestamp",))
+    market_refresher.register("indices", market.load_indices)
+    portfolio_service.list_user_portfolios = list_portfolios
+
+    ok = True
+    grand = {True: 0, False: 0}
+    polls = clients * cycles * len(ENDPOINTS)
+    for phase, open_phase in (("market open", True), ("market closed", False)):
+        seed_state = market.rng.getstate()
+        full, _ = await run_session(market, clients, cycles, change_rate, False, open_phase)
+        market.rng.setstate(seed_state)
+        cond, hits = await run_session(market, clients, cycles, change_rate, True, open_phase)
+        grand[False] += full
+        grand[True] += cond
+        saved = 1 - cond / full
+        print(f"{phase}: {polls} polls, {hits} answered 304")
+        print(f"   unconditional {full / 1024:,.0f} KiB, conditional {cond / 1024:,.0f} KiB ({saved:.1%} saved)")
+        if not open_phase:
+            ok &= report(saved >= 0.9, "closed-market session saves at least 90%")
+
+    saved = 1 - grand[True] / grand[False]
+    print(f"whole session: {saved:.1%} fewer bytes on the wire")
+    ok &= report(saved >= 0.5, "whole session saves at least 50%")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--clients", type=int, default=20)
+    parser.add_argument("--cycles", type=int, default=60)
+    parser.add_argument("--symbols", type=int, default=500)
+    parser.add_argument("--change-rate", type=float, default=0.3, help="share of open-market cycles with moves")
+    args = parser.parse_args()
+
+    ok = asyncio.run(run_checks(args.clients, args.cycles, args.symbols, args.change_rate))
+    print("\nSummary:")
+    if ok:
+        print("  ✅ Conditional polling cuts bytes on the wire as expected")
+        sys.exit(0)
+    print("  ❌ One or more checks failed")
+    sys.exit(3)
+
+
+if __name__ == "__main__":
+    main()
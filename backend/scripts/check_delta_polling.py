@@ -0,0 +1,150 @@
+"""Regression check: `since=` delta polling on /api/stocks/live.
+
+Feeds the market refresher from a stand-in universe (no network), moves a
+few quotes per version and checks that:
+  1) `since=<current>` returns an empty delta
+  2) `since=<previous>` returns exactly the symbols that moved
+  3) a delta spanning several versions returns the union of their moves
+  4) a version older than the diff ring, from the future, or from another
+     epoch (a token issued before a restart) gets the full snapshot with
+     "delta": false; a malformed token is a 400
+  5) filters still apply to deltas
+  6) delta bodies are a small fraction of the full snapshot
+
+Exit code is 0 when every check passes, else 3.
+
+Usage:
+  (from project root)
+  python backend/scripts/check_delta_polling.py [--symbols 2000]
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+os.environ.setdefault("FINANCEHUB_API_KEY", "stand-in")
+
+import httpx  # noqa: E402
+from fastapi import FastAPI  # noqa: E402
+from config import settings  # noqa: E402
+from routes import stocks  # noqa: E402
+from services.market_data import market_refresher  # noqa: E402
+
+
+class StandInMarket:
+    """Quote universe that moves only the symbols it is told to"""
+
+    def __init__(self, symbols: int, seed: int = 5):
+        self.rng = random.Random(seed)
+        self.quotes = {
+            f"SYM{i}": {"symbol": f"SYM{i}", "name": f"Company {i}", "price": 100.0 + i, "change": 0.0,
+                        "high": 101.0 + i, "low": 99.0 + i, "open": 100.0 + i, "previousClose": 100.0 + i,
+                        "isMarketOpen": True, "timestamp": 1700000000, "provider": "stand-in"}
+            for i in range(symbols)
+        }
+
+    def move(self, count: int):
+        moved = self.rng.sample(sorted(self.quotes), count)
+        for symbol in moved:
+            quote = self.quotes[symbol]
+            quote["price"] = round(quote["price"] + 0.5, 2)
+            quote["change"] = round((quote["price"] / quote["previousClose"] - 1) * 100, 2)
+        return set(moved)
+
+    async def load(self):
+        items = [dict(q) for q in self.quotes.values()]
+        return {"stocks": items, "count": len(items), "marketOpen": True, "timestamp": str(self.rng.random())}
+
+
+def report(ok: bool, message: str) -> bool:
+    print(f"   {'✓' if ok else '❌'} {message}")
+    return ok
+
+
+async def run_checks(symbols: int) -> bool:
+    market = StandInMarket(symbols)
+    market_refresher.register("stocks", market.load, volatile=("timestamp",))
+    app = FastAPI()
+    app.include_router(stocks.router, prefix="/api")
+    transport = httpx.ASGITransport(app=app)
+    ok = True
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        async def poll(**params):
+            response = await client.get("/api/stocks/live", params=params)
+            assert response.status_code == 200, response.text
+            return response.json(), len(response.content)
+
+        await market_refresher.refresh("stocks")
+        full, full_bytes = await poll()
+        base = full["snapshotToken"]
+        epoch = base.split(":")[0]
+
+        print("1) Nothing moved since the current version")
+        data, _ = await poll(since=base)
+        ok &= report(data["delta"] and data["stocks"] == [], f"delta={data['delta']} items={len(data['stocks'])}")
+
+        print("\n2) One version later")
+        moved = market.move(7)
+        await market_refresher.refresh("stocks")
+        data, delta_bytes = await poll(since=base)
+        got = {q["symbol"] for q in data["stocks"]}
+        ok &= report(data["delta"] and got == moved, f"{len(got)} symbols returned, {len(moved)} moved")
+        ok &= report(data["snapshotToken"] == f"{epoch}:{full['snapshotVersion'] + 1}",
+                     f"snapshotToken {data['snapshotToken']}")
+
+        print("\n3) Several versions later")
+        for _ in range(3):
+            moved |= market.move(4)
+            await market_refresher.refresh("stocks")
+        data, _ = await poll(since=base)
+        got = {q["symbol"] for q in data["stocks"]}
+        ok &= report(got == moved, f"union of {len(moved)} moved symbols returned")
+
+        print("\n4) Versions the ring cannot answer")
+        for _ in range(settings.SNAPSHOT_DIFF_HISTORY + 1):
+            market.move(1)
+            await market_refresher.refresh("stocks")
+        data, _ = await poll(since=base)
+        ok &= report(not data["delta"] and len(data["stocks"]) == symbols, "too-old version -> full resync")
+        current = data["snapshotToken"]
+        data, _ = await poll(since=f"{epoch}:{data['snapshotVersion'] + 50}")
+        ok &= report(not data["delta"] and len(data["stocks"]) == symbols, "future version -> full resync")
+        data, _ = await poll(since=f"0000beef:{data['snapshotVersion']}")
+        ok &= report(not data["delta"] and len(data["stocks"]) == symbols, "other epoch -> full resync")
+        response = await client.get("/api/stocks/live", params={"since": "12"})
+        ok &= report(response.status_code == 400, f"malformed token -> {response.status_code}")
+
+        print("\n5) Filters apply to deltas")
+        moved = market.move(20)
+        await market_refresher.refresh("stocks")
+        pick = sorted(moved)[:3]
+        data, _ = await poll(since=current, symbols=",".join(pick))
+        ok &= report({q["symbol"] for q in data["stocks"]} == set(pick), f"symbols filter -> {len(data['stocks'])} items")
+
+        print("\n6) Payload size")
+        print(f"   full snapshot {full_bytes:,} bytes, 7-symbol delta {delta_bytes:,} bytes")
+        ok &= report(delta_bytes * 20 < full_bytes, "delta is under 5% of the full body")
+
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--symbols", type=int, default=2000)
+    args = parser.parse_args()
+
+    ok = asyncio.run(run_checks(args.symbols))
+    print("\nSummary:")
+    if ok:
+        print("  ✅ Delta polling returns only what moved")
+        sys.exit(0)
+    print("  ❌ One or more checks failed")
+    sys.exit(3)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""Regression check: a slow yfinance call must not stall the event loop.
+
+Runs a stand-in for yf.Ticker(...).history() that blocks for --delay seconds
+while a heartbeat coroutine measures how late the loop wakes it up. The call
+is made twice:
+  1) directly inside the coroutine (the old handler behaviour) - expected to stall
+  2) through utils.yf_executor - the loop must stay responsive
+
+Also checks that per-call timeouts fire and that the executor rejects work
+once its queue is full. Exit code is 0 when every check passes, else 3.
+
+Usage:
+  (from project root)
+  python backend/scripts/check_event_loop_responsiveness.py [--delay 1.0] [--max-lag-ms 50]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from utils.yf_executor import BoundedExecutor, ExecutorSaturated  # noqa: E402
+
+
+def slow_history(delay: float):
+    """Stand-in for a blocking yfinance network call"""
+    time.sleep(delay)
+    return {"Close": [1.0, 2.0]}
+
+
+async def heartbeat(stop: asyncio.Event, interval: float = 0.01):
+    """Return the worst observed wake-up lag in ms"""
+    worst = 0.0
+    while not stop.is_set():
+        t0 = time.perf_counter()
+        await asyncio.sleep(interval)
+        worst = max(worst, (time.perf_counter() - t0 - interval) * 1000.0)
+    return worst
+
+
+async def measure(call):
+    stop = asyncio.Event()
+    beat = asyncio.create_task(heartbeat(stop))
+    await asyncio.sleep(0.05)
+    await call()
+    stop.set()
+    return await beat
+
+
+async def run_checks(delay: float, max_lag_ms: float) -> bool:
+    ok = True
+    executor = BoundedExecutor("yf-check", max_workers=2, max_queue=1, default_timeout=delay * 4)
+
+    async def direct():
+        slow_history(delay)
+
+    async def offloaded():
+        await executor.run(slow_history, delay)
+
+    blocked_lag = await measure(direct)
+    offloaded_lag = await measure(offloaded)
+    print(f"1) Blocking call on the loop:    worst heartbeat lag {blocked_lag:8.1f} ms")
+    print(f"2) Call through yf_executor:     worst heartbeat lag {offloaded_lag:8.1f} ms")
+    if offloaded_lag > max_lag_ms:
+        print(f"   ❌ loop stalled for more than {max_lag_ms} ms while yfinance was in flight")
+        ok = False
+    else:
+        print("   ✓ loop stayed responsive")
+
+    print("\n3) Per-call timeout")
+    try:
+        await executor.run(slow_history, delay, timeout=delay / 4)
+        print("   ❌ expected asyncio.TimeoutError")
+        ok = False
+    except asyncio.TimeoutError:
+        print("   ✓ timed out as expected")
+    # Let the abandoned thread finish so it does not count against the next check
+    await asyncio.sleep(delay)
+
+    print("\n4) Admission control (2 workers + 1 queued)")
+    tasks = [asyncio.create_task(executor.run(slow_history, delay / 2)) for _ in range(4)]
+    results = await asyncio.gather(*tasks, return_exceptions=True)
+    rejected = sum(isinstance(r, ExecutorSaturated) for r in results)
+    if rejected == 1:
+        print("   ✓ fourth call rejected with ExecutorSaturated")
+    else:
+        print(f"   ❌ expected 1 rejection, got {rejected}")
+        ok = False
+
+    print(f"\nExecutor stats: {executor.stats()}")
+    executor.shutdown()
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--delay", type=float, default=1.0, help="seconds the stand-in blocks")
+    parser.add_argument("--max-lag-ms", type=float, default=50.0)
+    args = parser.parse_args()
+
+    ok = asyncio.run(run_checks(args.delay, args.max_lag_ms))
+    print("\nSummary:")
+    if ok:
+        print("  ✅ Event loop stays responsive during yfinance calls")
+        sys.exit(0)
+    print("  ❌ One or more checks failed")
+    sys.exit(3)
+
+
+if __name__ == "__main__":
+    main()
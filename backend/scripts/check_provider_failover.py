@@ -0,0 +1,142 @@
+"""Regression check: provider hedging, failover and circuit breakers.
+
+Drives services.market_providers.MarketDataRouter with stand-in providers
+(no network) through these scenarios:
+  1) a primary stalled for --stall seconds: the hedge to the secondary must
+     answer after roughly the primary's p95, not after the stall
+  2) a failing primary: its breaker opens after PROVIDER_BREAKER_FAILURES
+     errors and later calls skip it without waiting
+  3) after the reset period a single half-open probe goes to the primary,
+     and success closes the breaker again
+  4) "no data" answers fail over without counting as failures
+  5) every provider failing raises ProvidersExhausted
+
+Exit code is 0 when every check passes, else 3.
+
+Usage:
+  (from project root)
+  python backend/scripts/check_provider_failover.py [--stall 3.0]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from config import settings  # noqa: E402
+from services.market_providers import (  # noqa: E402
+    MarketDataProvider, MarketDataRouter, NoData, ProviderError, ProvidersExhausted,
+)
+from utils.circuit_breaker import CLOSED, OPEN  # noqa: E402
+
+
+class FakeProvider(MarketDataProvider):
+    """Quote provider with scripted latency and outcome"""
+
+    def __init__(self, name: str, latency: float = 0.01, mode: str = "ok"):
+        self.name = name
+        super().__init__()
+        self.delay = latency
+        self.mode = mode
+        self.started = 0
+
+    async def quote(self, symbol: str):
+        self.started += 1
+        await asyncio.sleep(self.delay)
+        if self.mode == "fail":
+            raise ProviderError(f"{self.name} is down")
+        if self.mode == "nodata":
+            raise NoData(f"{self.name} has nothing for {symbol}")
+        return {"price": 1.0, "previousClose": 1.0, "open": 1.0, "high": 1.0, "low": 1.0,
+                "timestamp": 0, "isMarketOpen": True}
+
+
+def make_router(*providers) -> MarketDataRouter:
+    names = [p.name for p in providers]
+    return MarketDataRouter(providers, quote_order=names, history_order=names,
+                            timeout_seconds=30, hedge_enabled=True)
+
+
+def report(ok: bool, message: str) -> bool:
+    print(f"   {'✓' if ok else '❌'} {message}")
+    return ok
+
+
+async def run_checks(stall: float) -> bool:
+    ok = True
+
+    print("1) Stalled primary is hedged after its p95")
+    primary = FakeProvider("primary", latency=0.05)
+    secondary = FakeProvider("secondary", latency=0.02)
+    router = make_router(primary, secondary)
+    for _ in range(settings.PROVIDER_HEDGE_MIN_SAMPLES):
+        await router.quote("AAPL")
+    p95_ms = primary.latency.percentile(95)
+    primary.delay = stall
+    t0 = time.perf_counter()
+    quote = await router.quote("AAPL")
+    elapsed = time.perf_counter() - t0
+    print(f"   primary p95 {p95_ms:.0f} ms, stalled call answered in {elapsed * 1000:.0f} ms by {quote['provider']}")
+    ok &= report(quote["provider"] == "secondary" and elapsed < stall / 2, "secondary won the hedge race")
+    ok &= report(router.hedges == 1 and router.hedge_wins == 1, f"hedges={router.hedges} wins={router.hedge_wins}")
+    await asyncio.sleep(0.05)  # let the cancelled call unwind
+    ok &= report(primary.cancelled == 1 and primary.breaker.state == CLOSED,
+                 "losing primary call cancelled without tripping its breaker")
+
+    print("\n2) Failing primary opens its breaker")
+    primary = FakeProvider("primary", mode="fail")
+    secondary = FakeProvider("secondary")
+    router = make_router(primary, secondary)
+    primary.breaker.reset_seconds = 0.5
+    for _ in range(settings.PROVIDER_BREAKER_FAILURES + 5):
+        await router.quote("AAPL")
+    ok &= report(primary.breaker.state == OPEN, f"breaker state {primary.breaker.state}")
+    ok &= report(primary.started == settings.PROVIDER_BREAKER_FAILURES,
+                 f"primary tried {primary.started}x, then skipped")
+
+    print("\n3) Half-open probe after the reset period")
+    await asyncio.sleep(0.6)
+    primary.mode = "ok"
+    quote = await router.quote("AAPL")
+    ok &= report(quote["provider"] == "primary" and primary.breaker.state == CLOSED,
+                 f"probe served by {quote['provider']}, breaker {primary.breaker.state}")
+
+    print("\n4) No-data answers fail over without tripping the breaker")
+    primary = FakeProvider("primary", mode="nodata")
+    secondary = FakeProvider("secondary")
+    router = make_router(primary, secondary)
+    for _ in range(settings.PROVIDER_BREAKER_FAILURES + 2):
+        quote = await router.quote("XYZ")
+    ok &= report(quote["provider"] == "secondary" and primary.breaker.state == CLOSED
+                 and primary.failures == 0, f"served by {quote['provider']}, primary breaker {primary.breaker.state}")
+
+    print("\n5) All providers failing")
+    router = make_router(FakeProvider("a", mode="fail"), FakeProvider("b", mode="nodata"))
+    try:
+        await router.quote("AAPL")
+        ok &= report(False, "expected ProvidersExhausted")
+    except ProvidersExhausted as e:
+        ok &= report(set(e.errors) == {"a", "b"} and not e.no_data, str(e))
+
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--stall", type=float, default=3.0, help="seconds the stalled primary takes")
+    args = parser.parse_args()
+
+    ok = asyncio.run(run_checks(args.stall))
+    print("\nSummary:")
+    if ok:
+        print("  ✅ Hedging, failover and circuit breakers behave as expected")
+        sys.exit(0)
+    print("  ❌ One or more checks failed")
+    sys.exit(3)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""Local Finnhub WebSocket stand-in that replays trades, plus a throughput check.
+
+The server speaks the same protocol as wss://ws.finnhub.io:
+  client -> {"type": "subscribe", "symbol": "AAPL"}
+  server -> {"type": "trade", "data": [{"s": "AAPL", "p": 189.5, "t": 1700000000000, "v": 10}, ...]}
+  server -> {"type": "ping"}
+
+Trades come from a recorded JSONL file (one Finnhub message per line) or,
+without one, from a synthetic random walk. Only trades for subscribed
+symbols are sent, at --rate messages/sec with --batch trades per message.
+
+Modes:
+  --serve     run the stand-in until Ctrl+C; point the backend at it with
+              FINNHUB_WS_URL=ws://127.0.0.1:8765 MARKET_INGEST_MODE=stream
+  (default)   run the stand-in and the backend's FinnhubTradeStream in one
+              process for --seconds and print ingested ticks/sec
+
+Usage:
+  (from project root)
+  python backend/scripts/replay_trades_server.py --rate 2000 --batch 50 --seconds 10
+  python backend/scripts/replay_trades_server.py --serve --trades recorded.jsonl
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+import websockets  # noqa: E402
+from services.trade_stream import FinnhubTradeStream, TickStore  # noqa: E402
+
+DEFAULT_SYMBOLS = ["AAPL", "MSFT", "GOOGL", "AMZN", "NVDA", "META", "TSLA", "JPM", "V", "WMT"]
+
+
+def load_recorded(path: str):
+    trades = []
+    with open(path) as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            message = json.loads(line)
+            if message.get("type") == "trade":
+                trades.extend(message.get("data") or [])
+    return trades
+
+
+def synthetic_trades(symbols):
+    prices = {s: random.uniform(50, 500) for s in symbols}
+    while True:
+        symbol = random.choice(symbols)
+        prices[symbol] *= 1 + random.gauss(0, 0.0005)
+        yield {"s": symbol, "p": round(prices[symbol], 4), "t": int(time.time() * 1000), "v": random.randint(1, 500)}
+
+
+def make_handler(args):
+    recorded = load_recorded(args.trades) if args.trades else None
+
+    async def handler(ws):
+        subscribed = set()
+        source = iter(recorded) if recorded else synthetic_trades(DEFAULT_SYMBOLS)
+
+        async def reader():
+            async for raw in ws:
+                message = json.loads(raw)
+                if message.get("type") == "subscribe":
+                    subscribed.add(message["symbol"])
+                elif message.get("type") == "unsubscribe":
+                    subscribed.discard(message["symbol"])
+
+        read_task = asyncio.create_task(reader())
+        interval = 1.0 / args.rate if args.rate > 0 else 0
+        next_send = time.perf_counter()
+        sent = 0
+        try:
+            while True:
+                batch = []
+                exhausted = True
+                # Bounded scan so an empty subscription set cannot spin forever
+                for scanned, trade in enumerate(source):
+                    if trade["s"] in subscribed:
+                        batch.append(trade)
+                    if len(batch) >= args.batch or scanned >= args.batch * 10:
+                        exhausted = False
+                        break
+                if batch:
+                    await ws.send(json.dumps({"type": "trade", "data": batch}))
+                elif exhausted:
+                    break
+                else:
+                    await asyncio.sleep(0.01)
+                sent += 1
+                if sent % 1000 == 0:
+                    await ws.send(json.dumps({"type": "ping"}))
+                next_send += interval
+                delay = next_send - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                else:
+                    # Unthrottled or behind schedule: still let the client run
+                    await asyncio.sleep(0)
+        except websockets.ConnectionClosed:
+            pass
+        finally:
+            read_task.cancel()
+
+    return handler
+
+
+async def serve(args):
+    async with websockets.serve(make_handler(args), args.host, args.port, max_size=None):
+        print(f"Replaying trades on ws://{args.host}:{args.port} (rate={args.rate}/s, batch={args.batch})")
+        await asyncio.Future()
+
+
+async def measure(args):
+    async with websockets.serve(make_handler(args), args.host, 0, max_size=None) as server:
+        port = server.sockets[0].getsockname()[1]
+        store = TickStore()
+        stream = FinnhubTradeStream(f"ws://{args.host}:{port}", "", store, reconnect_max_seconds=1)
+        stream.start(DEFAULT_SYMBOLS)
+
+        # Let the connection settle before timing
+        while not stream.connected:
+            await asyncio.sleep(0.01)
+        t0 = time.perf_counter()
+        start_ticks = store.ticks
+        await asyncio.sleep(args.seconds)
+        elapsed = time.perf_counter() - t0
+        ticks = store.ticks - start_ticks
+        await stream.stop()
+
+    print(f"Ingested {ticks} ticks in {elapsed:.2f}s -> {ticks / elapsed:,.0f} ticks/sec")
+    print(f"Messages: {stream.messages}  reconnects: {stream.connects - 1}  errors: {stream.errors}")
+    for symbol in DEFAULT_SYMBOLS[:3]:
+        print(f"  {symbol}: {store.quote(symbol, symbol)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--serve", action="store_true", help="run the stand-in server only")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--trades", help="recorded Finnhub messages (JSONL)")
+    parser.add_argument("--rate", type=float, default=1000, help="messages per second (0 = unthrottled)")
+    parser.add_argument("--batch", type=int, default=20, help="trades per message")
+    parser.add_argument("--seconds", type=float, default=5, help="measurement duration")
+    args = parser.parse_args()
+
+    asyncio.run(serve(args) if args.serve else measure(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -23,6 +23,154 @@ MAX_PROMPT_CHARS = int(os.getenv("MAX_PROMPT_CHARS", 2000))
 AI_TIMEOUT_SECONDS = int(os.getenv("AI_TIMEOUT_SECONDS", 200))
 MAX_OUTPUT_TOKENS = int(os.getenv("MAX_OUTPUT_TOKENS", 4096))
 
+# Market Data
+QUOTE_CACHE_TTL_SECONDS = float(os.getenv("QUOTE_CACHE_TTL_SECONDS", 5))
+MARKET_REFRESH_ENABLED = os.getenv("MARKET_REFRESH_ENABLED", "true").lower() in ("1", "true", "yes")
+MARKET_REFRESH_INTERVAL_SECONDS = float(os.getenv("MARKET_REFRESH_INTERVAL_SECONDS", 5))
+# Exchange calendar paces refreshes: the interval above during sessions, these outside them
+MARKET_REFRESH_CALENDAR_PACING = os.getenv("MARKET_REFRESH_CALENDAR_PACING", "true").lower() in ("1", "true", "yes")
+MARKET_REFRESH_EXTENDED_INTERVAL_SECONDS = float(os.getenv("MARKET_REFRESH_EXTENDED_INTERVAL_SECONDS", 60))
+MARKET_REFRESH_CLOSED_INTERVAL_SECONDS = float(os.getenv("MARKET_REFRESH_CLOSED_INTERVAL_SECONDS", 1800))
+# Optional JSON {"NSE": ["YYYY-MM-DD", ...], "NYSE": [...]} of holidays beyond the built-in tables
+EXCHANGE_HOLIDAYS_FILE = os.getenv("EXCHANGE_HOLIDAYS_FILE", "")
+
+# Finnhub quota scheduler (free tier: ~60 calls/minute)
+FINNHUB_RATE_PER_MINUTE = float(os.getenv("FINNHUB_RATE_PER_MINUTE", 60))
+FINNHUB_BURST = int(os.getenv("FINNHUB_BURST", 10))
+FINNHUB_INTERACTIVE_DEADLINE_SECONDS = float(os.getenv("FINNHUB_INTERACTIVE_DEADLINE_SECONDS", 5))
+FINNHUB_BACKGROUND_DEADLINE_SECONDS = float(os.getenv("FINNHUB_BACKGROUND_DEADLINE_SECONDS", 30))
+
+# yfinance executor (blocking calls run off the event loop)
+YF_MAX_WORKERS = int(os.getenv("YF_MAX_WORKERS", 8))
+YF_MAX_QUEUE = int(os.getenv("YF_MAX_QUEUE", 64))
+YF_TIMEOUT_SECONDS = float(os.getenv("YF_TIMEOUT_SECONDS", 20))
+
+# yfinance history cache (shared by /api/finance/quote and /api/finance/quotes)
+HISTORY_CACHE_TTL_SECONDS = float(os.getenv("HISTORY_CACHE_TTL_SECONDS", 60))
+HISTORY_CACHE_MAX_ENTRIES = int(os.getenv("HISTORY_CACHE_MAX_ENTRIES", 512))
+BATCH_QUOTES_MAX_SYMBOLS = int(os.getenv("BATCH_QUOTES_MAX_SYMBOLS", 200))
+# Memoised /api/finance/indicators results (symbol, range, interval, set, last bar)
+INDICATOR_CACHE_MAX_ENTRIES = int(os.getenv("INDICATOR_CACHE_MAX_ENTRIES", 256))
+
+# Persistent OHLCV candle store (daily and longer intervals)
+CANDLE_STORE_ENABLED = os.getenv("CANDLE_STORE_ENABLED", "true").lower() in ("1", "true", "yes")
+CANDLE_STORE_DIR = os.getenv(
+    "CANDLE_STORE_DIR",
+    os.path.join(os.path.dirname(__file__), '../../data/candles')
+)
+CANDLE_TAIL_REFRESH_SECONDS = float(os.getenv("CANDLE_TAIL_REFRESH_SECONDS", 60))
+
+# Upstream ingestion: "poll" (REST quotes) or "stream" (Finnhub trade WebSocket)
+MARKET_INGEST_MODE = os.getenv("MARKET_INGEST_MODE", "poll").lower()
+FINNHUB_WS_URL = os.getenv("FINNHUB_WS_URL", "wss://ws.finnhub.io")
+TRADE_STREAM_RECONNECT_MAX_SECONDS = float(os.getenv("TRADE_STREAM_RECONNECT_MAX_SECONDS", 30))
+
+# Intraday 1m/5m/15m bars built from quotes and trades (/api/stocks/{symbol}/intraday).
+# Memory is fixed: 3 intervals x bars x 48 bytes per symbol (~56 KB at 390 bars)
+INTRADAY_BARS_PER_INTERVAL = int(os.getenv("INTRADAY_BARS_PER_INTERVAL", 390))
+INTRADAY_MAX_SYMBOLS = int(os.getenv("INTRADAY_MAX_SYMBOLS", 2000))
+
+# Price alerts (DynamoDB table keyed by user_id + alert_id)
+ALERTS_TABLE = os.getenv("ALERTS_TABLE", "Vittcott_PriceAlerts")
+# Active alerts only; triggered ones expire after the retention below (DynamoDB TTL on expires_at)
+ALERTS_MAX_PER_USER = int(os.getenv("ALERTS_MAX_PER_USER", 200))
+ALERTS_TRIGGERED_RETENTION_SECONDS = float(os.getenv("ALERTS_TRIGGERED_RETENTION_SECONDS", 7 * 86400))
+# Firing events kept for stream clients reconnecting with Last-Event-ID
+ALERT_EVENT_HISTORY = int(os.getenv("ALERT_EVENT_HISTORY", 1000))
+
+# Quote streaming (SSE)
+STREAM_MAX_SUBSCRIBERS = int(os.getenv("STREAM_MAX_SUBSCRIBERS", 5000))
+STREAM_QUEUE_SIZE = int(os.getenv("STREAM_QUEUE_SIZE", 8))
+STREAM_MAX_OVERFLOWS = int(os.getenv("STREAM_MAX_OVERFLOWS", 20))
+STREAM_HEARTBEAT_SECONDS = float(os.getenv("STREAM_HEARTBEAT_SECONDS", 15))
+STREAM_RETRY_MS = int(os.getenv("STREAM_RETRY_MS", 3000))
+
+# Shared upstream HTTP client (connection pool)
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", 100))
+HTTP_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("HTTP_MAX_KEEPALIVE_CONNECTIONS", 20))
+HTTP_KEEPALIVE_EXPIRY = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", 30))
+HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", 5))
+HTTP_READ_TIMEOUT = float(os.getenv("HTTP_READ_TIMEOUT", 10))
+HTTP_POOL_TIMEOUT = float(os.getenv("HTTP_POOL_TIMEOUT", 5))
+HTTP2_ENABLED = os.getenv("HTTP2_ENABLED", "false").lower() in ("1", "true", "yes")
+
+# Symbol master for search/autocomplete: NSE/BSE/NASDAQ listing files dropped in this directory
+SYMBOL_MASTER_DIR = os.getenv(
+    "SYMBOL_MASTER_DIR",
+    os.path.join(os.path.dirname(__file__), '../../data/symbols')
+)
+SYMBOL_MASTER_RELOAD_SECONDS = float(os.getenv("SYMBOL_MASTER_RELOAD_SECONDS", 30))
+SYMBOL_SEARCH_MAX_RESULTS = int(os.getenv("SYMBOL_SEARCH_MAX_RESULTS", 10))
+# Tie-break order when equally good matches are listed on several exchanges
+SYMBOL_EXCHANGE_PRIORITY = [
+    e.strip() for e in os.getenv("SYMBOL_EXCHANGE_PRIORITY", "NSE,BSE,NASDAQ,NYSE").split(",") if e.strip()
+]
+
+# Mutual fund NAVs: AMFI NAVAll.txt snapshots and NAV history reports, merged and re-read on change
+NAV_DATA_DIR = os.getenv(
+    "NAV_DATA_DIR",
+    os.path.join(os.path.dirname(__file__), '../../data/nav')
+)
+NAV_RELOAD_SECONDS = float(os.getenv("NAV_RELOAD_SECONDS", 300))
+
+# Ticker metadata (yfinance .info) cache on SQLite
+TICKER_METADATA_DB = os.getenv(
+    "TICKER_METADATA_DB",
+    os.path.join(os.path.dirname(__file__), '../../data/ticker_metadata.sqlite3')
+)
+TICKER_METADATA_TTL_SECONDS = float(os.getenv("TICKER_METADATA_TTL_SECONDS", 7 * 86400))
+TICKER_METADATA_NEGATIVE_TTL_SECONDS = float(os.getenv("TICKER_METADATA_NEGATIVE_TTL_SECONDS", 3600))
+# After a failed lookup (network error, rate limit) the symbol is tried again this soon
+TICKER_METADATA_RETRY_SECONDS = float(os.getenv("TICKER_METADATA_RETRY_SECONDS", 60))
+TICKER_METADATA_WARM_CONCURRENCY = int(os.getenv("TICKER_METADATA_WARM_CONCURRENCY", 2))
+TICKER_METADATA_LOOKUP_TIMEOUT_SECONDS = float(os.getenv("TICKER_METADATA_LOOKUP_TIMEOUT_SECONDS", 3))
+# Extra symbols fetched at startup besides the tracked live-quote universe
+TICKER_METADATA_WARM_SYMBOLS = [
+    s.strip() for s in os.getenv("TICKER_METADATA_WARM_SYMBOLS", "").split(",") if s.strip()
+]
+
+# Market data providers: failover order, circuit breakers and hedged requests
+MARKET_QUOTE_PROVIDERS = [
+    p.strip() for p in os.getenv("MARKET_QUOTE_PROVIDERS", "finnhub,yfinance,local").split(",") if p.strip()
+]
+MARKET_HISTORY_PROVIDERS = [
+    p.strip() for p in os.getenv("MARKET_HISTORY_PROVIDERS", "financehub,yfinance,local").split(",") if p.strip()
+]
+PROVIDER_TIMEOUT_SECONDS = float(os.getenv("PROVIDER_TIMEOUT_SECONDS", 8))
+PROVIDER_BREAKER_FAILURES = int(os.getenv("PROVIDER_BREAKER_FAILURES", 5))
+PROVIDER_BREAKER_RESET_SECONDS = float(os.getenv("PROVIDER_BREAKER_RESET_SECONDS", 30))
+PROVIDER_HEDGE_ENABLED = os.getenv("PROVIDER_HEDGE_ENABLED", "true").lower() in ("1", "true", "yes")
+# Hedge after the primary's observed p95; this default applies until enough samples exist
+PROVIDER_HEDGE_DEFAULT_MS = float(os.getenv("PROVIDER_HEDGE_DEFAULT_MS", 1000))
+PROVIDER_HEDGE_MIN_MS = float(os.getenv("PROVIDER_HEDGE_MIN_MS", 50))
+PROVIDER_HEDGE_MIN_SAMPLES = int(os.getenv("PROVIDER_HEDGE_MIN_SAMPLES", 20))
+
+# Live-quote universe: a file with one "symbol[,name]" per line and/or a comma list;
+# the built-in US large caps are tracked when neither is set
+MARKET_UNIVERSE_FILE = os.getenv("MARKET_UNIVERSE_FILE", "")
+MARKET_UNIVERSE_SYMBOLS = [
+    s.strip() for s in os.getenv("MARKET_UNIVERSE_SYMBOLS", "").split(",") if s.strip()
+]
+# Symbols refreshed per refresher cycle; 0 sizes shards to fit the Finnhub quota left after the index quotes
+MARKET_UNIVERSE_SHARD_SIZE = int(os.getenv("MARKET_UNIVERSE_SHARD_SIZE", 0))
+LIVE_STOCKS_MAX_PAGE_SIZE = int(os.getenv("LIVE_STOCKS_MAX_PAGE_SIZE", 500))
+# Snapshot versions kept as diffs for `since=` delta polls (120 x 5s = 10 minutes)
+SNAPSHOT_DIFF_HISTORY = int(os.getenv("SNAPSHOT_DIFF_HISTORY", 120))
+
+# HTTP caching of polled endpoints (ETag + Cache-Control); live max-age defaults to the refresh interval
+LIVE_CACHE_MAX_AGE_SECONDS = float(os.getenv("LIVE_CACHE_MAX_AGE_SECONDS", MARKET_REFRESH_INTERVAL_SECONDS))
+LIVE_CACHE_STALE_WHILE_REVALIDATE_SECONDS = float(os.getenv("LIVE_CACHE_STALE_WHILE_REVALIDATE_SECONDS", 30))
+PORTFOLIO_LIST_MAX_AGE_SECONDS = float(os.getenv("PORTFOLIO_LIST_MAX_AGE_SECONDS", 10))
+PORTFOLIO_LIST_STALE_WHILE_REVALIDATE_SECONDS = float(os.getenv("PORTFOLIO_LIST_STALE_WHILE_REVALIDATE_SECONDS", 60))
+
+# Parsed portfolio uploads kept in memory, revalidated against the S3 ETag
+PORTFOLIO_CACHE_MAX_BYTES = int(os.getenv("PORTFOLIO_CACHE_MAX_BYTES", 64 * 1024 * 1024))
+
+# Response encoding (Accept / Accept-Encoding negotiation)
+RESPONSE_COMPRESS_MIN_BYTES = int(os.getenv("RESPONSE_COMPRESS_MIN_BYTES", 1024))
+RESPONSE_GZIP_LEVEL = int(os.getenv("RESPONSE_GZIP_LEVEL", 5))
+RESPONSE_BROTLI_QUALITY = int(os.getenv("RESPONSE_BROTLI_QUALITY", 4))
+
 # Uvicorn/Server
 PORT = int(os.getenv("PORT", "8000"))
 RELOAD = os.getenv("RELOAD", "false").lower() in ("1", "true", "yes")
@@ -3,13 +3,13 @@ import time
 import uuid
 import asyncio
 from contextlib import asynccontextmanager
+from datetime import date
 from typing import Optional
-from fastapi import FastAPI, HTTPException, Request
+from fastapi import FastAPI, HTTPException, Query, Request
 from fastapi.responses import FileResponse, JSONResponse, RedirectResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
-import httpx
-import yfinance as yf
+import numpy as np
 import boto3
 from pydantic import BaseModel
 
@@ -18,8 +18,28 @@ from config import settings
 from config.logging_config import logger
 from controllers.ai_controller import handle_ai_ask
 from models.ai_models import AskRequest, AskResponse
+from models.finance_models import BatchQuotesRequest, MetadataWarmRequest
 from routes.stocks import router as stocks_router
 from routes.portfolio import router as portfolio_router
+from routes.alerts import router as alerts_router
+from utils.http_client import init_http_client, close_http_client
+from services.market_data import market_refresher
+from services.trade_stream import trade_stream
+from utils.yf_executor import yf_executor, ExecutorSaturated
+from utils.candles import empty_history, history_to_arrays, history_to_payload, last_close
+from utils.downsample import downsample_history
+from utils.encoding import ARROW_STREAM, EncodingError, encode_response, negotiate
+from services.history_service import history_service
+from services.market_providers import provider_router, ProvidersExhausted
+from utils.rate_limiter import RateLimitExceeded, UpstreamThrottled
+from services.symbol_master import symbol_master
+from services.nav_store import nav_store
+from services.ticker_metadata import ticker_metadata
+from services.universe import market_universe
+from services.indicator_service import indicator_service
+from services.price_alerts import alert_engine
+from services.portfolio_service import portfolio_service
+from utils.indicators import DEFAULT_SET, nullable
 
 # CloudWatch logging
 from utils.cloudwatch_logger import setup_cloudwatch_logging
@@ -35,7 +55,7 @@ cloudwatch_logger = setup_cloudwatch_logging(
 # ---------- Lifespan ----------
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    """Initialize Gemini model on startup."""
+    """Initialize Gemini model and the shared upstream HTTP client on startup."""
     logger.info("🚀 Starting Vittcott Backend Application")
     logger.info(f"Environment: {os.getenv('ENVIRONMENT', 'development')}")
     
@@ -53,6 +73,18 @@ async def lifespan(app: FastAPI):
     genai.configure(api_key=settings.GEMINI_API_KEY)
 
     try:
+        app.state.http_client = await init_http_client()
+        symbol_master.start()
+        nav_store.start()
+        await asyncio.get_running_loop().run_in_executor(None, ticker_metadata.open)
+        await asyncio.get_running_loop().run_in_executor(None, alert_engine.open)
+        ticker_metadata.start_warm_up(list(market_universe.symbols) + settings.TICKER_METADATA_WARM_SYMBOLS)
+
+        if settings.MARKET_INGEST_MODE == "stream" and settings.FINANCEHUB_API_KEY:
+            trade_stream.start(market_universe.symbols.keys())
+        if settings.MARKET_REFRESH_ENABLED and settings.FINANCEHUB_API_KEY:
+            market_refresher.start()
+
         try_model = "models/gemini-2.5-flash"
         fallback_model = "models/gemini-2.5-pro-latest"
         try:
@@ -67,6 +99,13 @@ async def lifespan(app: FastAPI):
         if hasattr(app.state, "model"):
             del app.state.model
             logger.info("🧹 Cleaned up Gemini model")
+        await market_refresher.stop()
+        await trade_stream.stop()
+        await symbol_master.stop()
+        await nav_store.stop()
+        await ticker_metadata.stop()
+        await close_http_client()
+        yf_executor.shutdown()
 
 
 # ---------- App ----------
@@ -75,6 +114,7 @@ app = FastAPI(title="VITTCOTT Unified Backend", version="1.0", lifespan=lifespan
 # Include routers
 app.include_router(stocks_router, prefix="/api", tags=["stocks"])
 app.include_router(portfolio_router, prefix="/api", tags=["portfolio"])
+app.include_router(alerts_router, prefix="/api", tags=["alerts"])
 
 # ---------- CORS ----------
 app.add_middleware(
@@ -92,6 +132,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag"],
 )
 
 # ---------- Request Logging Middleware ----------
@@ -150,64 +191,204 @@ async def ai_ask(req: AskRequest, request: Request):
     text = await handle_ai_ask(req.query, req.portfolio)
     return {"response_text": text}
 
-# ---------- FinanceHub Proxy ----------
+# ---------- Market data (FinanceHub / Finnhub / yfinance / local store) ----------
+# Finnhub's free tier has no NSE/BSE indices
+INDEX_QUOTE_PROVIDERS = ("yfinance", "local")
+
+
+def _provider_error(e: ProvidersExhausted) -> HTTPException:
+    """HTTP error for a call no provider could serve."""
+    throttled = e.find(UpstreamThrottled)
+    if throttled is not None:
+        return HTTPException(
+            status_code=429,
+            detail="Market data rate limit reached",
+            headers={"Retry-After": str(int(throttled.retry_after) or 1)}
+        )
+    if e.find(ExecutorSaturated, RateLimitExceeded):
+        return HTTPException(status_code=503, detail="Market data service busy, try again shortly")
+    if e.find(asyncio.TimeoutError):
+        return HTTPException(status_code=504, detail="Stock data request timed out")
+    return HTTPException(status_code=503, detail="No market data provider available")
+
+
 @app.get("/api/finance/quote")
-async def finance_quote(symbol: str, range: str = "1d"):
-    """Stock data via FinanceHub or fallback yfinance."""
-    if settings.FINANCEHUB_API_KEY:
-        url = f"https://api.financehub.example/v1/market/quotes?symbol={symbol}&range={range}"
-        headers = {"Authorization": f"Bearer {settings.FINANCEHUB_API_KEY}"}
-        try:
-            async with httpx.AsyncClient() as client:
-                r = await client.get(url, headers=headers, timeout=15)
-                if r.status_code == 200:
-                    data = r.json()
-                    return {
-                        "symbol": symbol,
-                        "range": range,
-                        "price": data.get("price"),
-                        "change": data.get("change"),
-                        "candles": data.get("candles") or [],
-                        "raw": data,
-                    }
-        except Exception as e:
-            logger.warning("FinanceHub failed, falling back to yfinance: %s", e)
+async def finance_quote(
+    request: Request,
+    symbol: str,
+    range: str = "1d",
+    interval: str = "1d",
+    shape: str = "rows",
+    max_points: Optional[int] = None,
+    downsample: str = "ohlc"
+):
+    """Stock data through the provider chain (FinanceHub, yfinance, local candle store).
+
+    A slow primary is hedged with the next provider after its p95 latency.
+    shape=columns returns candles as {"ts": [...], "open": [...], ...}.
+    max_points caps the candle count for charting: downsample=ohlc merges
+    neighbouring bars into wider candles, downsample=lttb keeps the bars
+    that best preserve the close line's shape.
+    The body is JSON, MessagePack or an Arrow IPC stream depending on Accept.
+    """
+    media = negotiate(request)
+    try:
+        hist = await provider_router.history(symbol, range, interval)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except ProvidersExhausted as e:
+        if not e.no_data:
+            raise _provider_error(e)
+        hist = empty_history()
 
     try:
-        ticker = yf.Ticker(symbol)
-        hist = ticker.history(period="1mo", interval="1d")
-        candles = [
-            {
-                "ts": idx.isoformat(),
-                "open": float(row["Open"]),
-                "high": float(row["High"]),
-                "low": float(row["Low"]),
-                "close": float(row["Close"]),
-                "volume": int(row["Volume"]),
-            }
-            for idx, row in hist.iterrows()
-        ]
-        price = candles[-1]["close"] if candles else None
-        return {"symbol": symbol, "range": range, "price": price, "candles": candles}
+        source_points = len(hist)
+        hist = downsample_history(hist, max_points, downsample)
+        payload = {
+            "symbol": symbol,
+            "range": range,
+            "price": last_close(hist),
+            "provider": hist.attrs.get("provider"),
+        }
+        if max_points is not None:
+            payload["sourcePoints"] = source_points
+        if media == ARROW_STREAM:
+            # Candle columns go straight from the frame into the Arrow table
+            return encode_response(request, payload, media, table_key="candles",
+                                   columns=history_to_arrays(hist))
+        payload["candles"] = history_to_payload(hist, shape)
+        return encode_response(request, payload, media, table_key="candles")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Stock data error: {e}")
 
 
+async def _batch_quotes(symbols: list, range: str, shape: str = "rows",
+                        max_points: Optional[int] = None, downsample: str = "ohlc"):
+    """Shared body of the GET and POST batch quote routes."""
+    # De-duplicate while keeping request order
+    symbols = list(dict.fromkeys(s.strip() for s in symbols if s and s.strip()))
+    if not symbols:
+        raise HTTPException(status_code=400, detail="symbols must be non-empty")
+    if len(symbols) > settings.BATCH_QUOTES_MAX_SYMBOLS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {settings.BATCH_QUOTES_MAX_SYMBOLS} symbols per request"
+        )
+
+    try:
+        frames, errors = await provider_router.history_batch(symbols, range, "1d")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except ProvidersExhausted as e:
+        if not e.no_data:
+            raise _provider_error(e)
+        frames, errors = {}, {symbol: "No data found" for symbol in symbols}
+
+    try:
+        results = {
+            symbol: {
+                "symbol": symbol,
+                "range": range,
+                "price": last_close(hist),
+                "candles": history_to_payload(downsample_history(hist, max_points, downsample), shape),
+            }
+            for symbol, hist in frames.items()
+        }
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return {
+        "range": range,
+        "count": len(results),
+        "results": results,
+        "errors": errors,
+    }
+
+
+@app.get("/api/finance/quotes")
+async def finance_quotes(symbols: str, range: str = "1mo", shape: str = "rows",
+                         max_points: Optional[int] = None, downsample: str = "ohlc"):
+    """Batched quote + history for a comma-separated symbol list."""
+    return await _batch_quotes(symbols.split(","), range, shape, max_points, downsample)
+
+
+@app.post("/api/finance/quotes")
+async def finance_quotes_post(req: BatchQuotesRequest):
+    """Batched quote + history for large symbol lists."""
+    return await _batch_quotes(req.symbols, req.range, req.shape, req.max_points, req.downsample)
+
+
+@app.get("/api/finance/indicators")
+async def finance_indicators(
+    request: Request,
+    symbol: str,
+    indicator_set: str = Query(DEFAULT_SET, alias="set"),
+    range: str = "1mo",
+    interval: str = "1d"
+):
+    """Technical indicators for chart overlays, computed server-side.
+
+    set is a comma list of sma[:n], ema[:n], rsi[:n], macd[:fast:slow:signal]
+    and bbands[:n:k], e.g. set=sma:20,rsi:14,bb:20:2. Columns are aligned
+    with "ts" and null until an indicator has warmed up; history before the
+    range is fetched so long periods are valid from its first bar.
+    """
+    media = negotiate(request)
+    try:
+        specs, result = await indicator_service.get(symbol, range, interval, indicator_set)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except ProvidersExhausted as e:
+        if not e.no_data:
+            raise _provider_error(e)
+        raise HTTPException(status_code=404, detail=f"No candles found for {symbol}")
+
+    payload = {
+        "symbol": symbol,
+        "range": range,
+        "interval": interval,
+        "set": [":".join([name, *(f"{p:g}" for p in params)]) for name, params in specs],
+        "count": len(result.ts),
+        "lastBar": (np.datetime_as_string(result.last_bar, unit="s", timezone="UTC")
+                    if result.last_bar is not None else None),
+        "provider": result.provider,
+    }
+    columns = {"ts": result.ts, **result.columns}
+    if media == ARROW_STREAM:
+        return encode_response(request, payload, media, table_key="columns", columns=columns)
+    payload["columns"] = {
+        "ts": np.datetime_as_string(result.ts, unit="s", timezone="UTC").tolist(),
+        **{name: nullable(values) for name, values in result.columns.items()},
+    }
+    return encode_response(request, payload, media)
+
+
 @app.get("/api/finance/search")
-async def finance_search(query: str):
-    """Search for stocks by symbol or name."""
+async def finance_search(query: str, limit: int = settings.SYMBOL_SEARCH_MAX_RESULTS):
+    """Search for stocks by symbol or name.
+
+    Ranked matches come from the local symbol master; otherwise the query is
+    looked up as a ticker through the persistent metadata cache.
+    """
+    limit = max(1, min(limit, 50))
+    results = symbol_master.search(query, limit)
+    if results:
+        return {"results": results}
+
     try:
-        # Search using yfinance Ticker
-        ticker = yf.Ticker(query)
-        info = ticker.info
+        meta = await ticker_metadata.get(query)
+        if meta is None:
+            return {"results": []}
         
         return {
             "results": [{
-                "symbol": info.get("symbol", query),
-                "name": info.get("longName", info.get("shortName", query)),
-                "exchange": info.get("exchange", "NSE"),
-                "currency": info.get("currency", "INR"),
-                "type": info.get("quoteType", "EQUITY")
+                "symbol": meta.symbol,
+                "name": meta.name or query,
+                "exchange": meta.exchange or "NSE",
+                "currency": meta.currency or "INR",
+                "type": meta.quote_type or "EQUITY"
             }]
         }
     except Exception as e:
@@ -215,6 +396,56 @@ async def finance_search(query: str):
         return {"results": []}
 
 
+@app.get("/api/finance/funds/search")
+async def fund_search(query: str, limit: int = settings.SYMBOL_SEARCH_MAX_RESULTS):
+    """Search mutual fund schemes by scheme code or name, with their latest NAV."""
+    limit = max(1, min(limit, 50))
+    return {"results": nav_store.search(query, limit)}
+
+
+@app.get("/api/finance/funds/nav")
+async def fund_nav(
+    scheme: str,
+    on: Optional[date] = Query(None, alias="date"),
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+):
+    """NAV of a scheme (code or name) as of a date, optionally with its NAV history.
+
+    `date` returns the newest NAV on or before that day (default: latest).
+    `start`/`end` add the daily NAVs between them.
+    """
+    code = nav_store.resolve(scheme)
+    if code is None:
+        raise HTTPException(status_code=404, detail=f"No mutual fund scheme found for {scheme}")
+    index = nav_store.index
+    latest = index.nav(code, on)
+    payload = {
+        "schemeCode": code,
+        "name": index.name(code),
+        "isin": index.isin(code),
+        "nav": latest[1] if latest else None,
+        "navDate": latest[0].isoformat() if latest else None,
+    }
+    if start is not None or end is not None:
+        dates, navs = index.history(code, start, end)
+        payload["history"] = {
+            "date": np.datetime_as_string(dates).tolist(),
+            "nav": navs.tolist(),
+        }
+    return payload
+
+
+@app.post("/api/finance/metadata/warm")
+async def warm_ticker_metadata(req: MetadataWarmRequest):
+    """Fetch name/exchange/currency/sector for many symbols in the background."""
+    symbols = [s.strip() for s in req.symbols if s and s.strip()]
+    if not symbols:
+        raise HTTPException(status_code=400, detail="symbols must be non-empty")
+    started = ticker_metadata.start_warm_up(symbols)
+    return {"accepted": started, "symbols": len(symbols), "cache": ticker_metadata.stats()}
+
+
 @app.get("/api/finance/indices")
 async def get_indices():
     """Get major Indian market indices."""
@@ -224,28 +455,46 @@ async def get_indices():
         {"symbol": "^NSEBANK", "name": "Bank Nifty"},
     ]
     
+    quotes = await asyncio.gather(
+        *(provider_router.quote(idx["symbol"], providers=INDEX_QUOTE_PROVIDERS) for idx in indices),
+        return_exceptions=True
+    )
+
     results = []
-    for idx in indices:
-        try:
-            ticker = yf.Ticker(idx["symbol"])
-            hist = ticker.history(period="2d")
-            if len(hist) >= 2:
-                current = hist.iloc[-1]["Close"]
-                previous = hist.iloc[-2]["Close"]
-                change = ((current - previous) / previous * 100)
-                results.append({
-                    "symbol": idx["symbol"],
-                    "name": idx["name"],
-                    "displayName": idx["name"].upper(),
-                    "price": float(current),
-                    "change": float(change)
-                })
-        except Exception as e:
-            logger.error(f"Error fetching {idx['symbol']}: {e}")
+    for idx, quote in zip(indices, quotes):
+        if isinstance(quote, BaseException):
+            logger.error(f"Error fetching {idx['symbol']}: {quote}")
+            continue
+        current = quote["price"]
+        previous = quote["previousClose"]
+        change = ((current - previous) / previous * 100) if previous else 0.0
+        results.append({
+            "symbol": idx["symbol"],
+            "name": idx["name"],
+            "displayName": idx["name"].upper(),
+            "price": float(current),
+            "change": float(change)
+        })
     
     return {"indices": results}
 
 
+@app.get("/api/finance/stats")
+async def finance_stats():
+    """Queue depth, timeouts and run time for the yfinance executor, plus cache counters."""
+    return {
+        "yfinance_executor": yf_executor.stats(),
+        "history_cache": history_service.stats(),
+        "symbol_master": symbol_master.stats(),
+        "nav_store": nav_store.stats(),
+        "ticker_metadata": ticker_metadata.stats(),
+        "indicators": indicator_service.stats(),
+        "alerts": alert_engine.stats(),
+        "portfolio_cache": portfolio_service.stats(),
+        "providers": provider_router.stats(),
+    }
+
+
 # ---------- Presign / Upload helpers (copied from presign_app.py) ----------
 # ---------- Presign / Upload helpers ----------
 import boto3
@@ -369,6 +618,13 @@ else:
 # Fallback: mount the full frontend (serves index.html for SPA routes)
 app.mount("/", StaticFiles(directory=STATIC_DIR, html=True), name="frontend")
 
+@app.exception_handler(EncodingError)
+async def encoding_error(request: Request, exc: EncodingError):
+    """A response we built could not be encoded: a server fault, never the client's"""
+    logger.error(f"{request.method} {request.url.path}: {exc}")
+    return JSONResponse(status_code=500, content={"detail": "Response encoding failed"})
+
+
 # Optional SPA fallback (for routing in frontend)
 @app.exception_handler(404)
 async def spa_fallback(request: Request, exc):
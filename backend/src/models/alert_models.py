@@ -0,0 +1,10 @@
+"""Price alert models for request/response"""
+from pydantic import BaseModel
+from typing import Optional
+
+class CreateAlertRequest(BaseModel):
+    user_id: str
+    symbol: str
+    threshold: float
+    direction: str = "above"
+    note: Optional[str] = None
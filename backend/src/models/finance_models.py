@@ -0,0 +1,13 @@
+"""Finance models for request/response"""
+from pydantic import BaseModel
+from typing import List, Optional
+
+class BatchQuotesRequest(BaseModel):
+    symbols: List[str]
+    range: str = "1mo"
+    shape: str = "rows"
+    max_points: Optional[int] = None
+    downsample: str = "ohlc"
+
+class MetadataWarmRequest(BaseModel):
+    symbols: List[str]
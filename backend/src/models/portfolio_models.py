@@ -1,6 +1,6 @@
 """Portfolio models for request/response"""
 from pydantic import BaseModel
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Union
 
 class PortfolioListResponse(BaseModel):
     portfolios: List[Dict[str, Any]]
@@ -14,7 +14,7 @@ class PieChartData(BaseModel):
     symbol: str
     value: float
     percentage: float
-    quantity: int
+    quantity: Union[int, float]
 
 class PortfolioSummary(BaseModel):
     total_invested: float
@@ -22,13 +22,17 @@ class PortfolioSummary(BaseModel):
     total_current_value: Optional[float] = None
     total_profit_loss: Optional[float] = None
     total_return_pct: Optional[float] = None
+    # Holdings with a current price, and what was invested in them (the base of the totals above)
+    priced_holdings: Optional[int] = None
+    priced_invested: Optional[float] = None
     winners: Optional[int] = None
     losers: Optional[int] = None
     pie_chart_data: List[PieChartData]
+    sector_allocation: Optional[Dict[str, float]] = None
 
 class HoldingDetail(BaseModel):
     symbol: str
-    quantity: int
+    quantity: Union[int, float]
     purchase_price: float
     invested_value: float
     allocation_pct: float
@@ -36,6 +40,12 @@ class HoldingDetail(BaseModel):
     current_value: Optional[float] = None
     profit_loss: Optional[float] = None
     profit_loss_pct: Optional[float] = None
+    name: Optional[str] = None
+    sector: Optional[str] = None
+    currency: Optional[str] = None
+    asset_type: Optional[str] = None
+    scheme_code: Optional[int] = None
+    nav_date: Optional[str] = None
 
 class PortfolioAnalysisResponse(BaseModel):
     summary: PortfolioSummary
@@ -0,0 +1,70 @@
+"""Price Alert API Routes"""
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import StreamingResponse
+from models.alert_models import CreateAlertRequest
+from services.price_alerts import alert_engine
+from config import settings
+from config.logging_config import logger
+
+router = APIRouter()
+
+
+@router.post("/alerts")
+async def create_alert(req: CreateAlertRequest):
+    """
+    Create a one-shot alert that fires when a symbol crosses a price
+    
+    POST /api/alerts
+    Body: {"user_id": "user123", "symbol": "AAPL", "threshold": 250, "direction": "above"}
+    
+    direction is "above" (crossing upwards), "below" (downwards) or "cross"
+    (either way). Crossings are checked on every market refresh, so the
+    symbol must be in the tracked universe or be a tracked index.
+    """
+    try:
+        alert = await alert_engine.create(req.user_id, req.symbol, req.direction, req.threshold, req.note)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error creating alert: {str(e)}")
+        raise HTTPException(status_code=503, detail="Could not save the alert, try again shortly")
+    return alert.to_dict()
+
+
+@router.get("/alerts/{user_id}")
+async def list_alerts(user_id: str):
+    """Every alert of a user, active and recently triggered, oldest first"""
+    alerts = [alert.to_dict() for alert in alert_engine.alerts_for(user_id)]
+    return {"alerts": alerts, "count": len(alerts)}
+
+
+@router.delete("/alerts/{user_id}/{alert_id}")
+async def delete_alert(user_id: str, alert_id: str):
+    try:
+        deleted = await alert_engine.delete(user_id, alert_id)
+    except Exception as e:
+        logger.error(f"Error deleting alert: {str(e)}")
+        raise HTTPException(status_code=503, detail="Could not delete the alert, try again shortly")
+    if not deleted:
+        raise HTTPException(status_code=404, detail="Alert not found")
+    return {"deleted": alert_id}
+
+
+@router.get("/alerts/{user_id}/stream")
+async def stream_alerts(user_id: str, request: Request):
+    """
+    Server-Sent Events stream of a user's alert firings
+    
+    Each `alert` event carries an id; reconnecting with Last-Event-ID
+    replays the firings missed in between (within ALERT_EVENT_HISTORY).
+    """
+    if alert_engine.full:
+        raise HTTPException(status_code=503, detail="Too many stream subscribers, try again shortly")
+    return StreamingResponse(
+        alert_engine.events(user_id, request.headers.get("last-event-id"), settings.STREAM_HEARTBEAT_SECONDS),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no",
+        }
+    )
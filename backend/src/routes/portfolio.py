@@ -7,21 +7,34 @@ from models.portfolio_models import (
     PortfolioAnalysisResponse
 )
 from services.portfolio_service import portfolio_service
+from utils.encoding import encode_response, negotiate
+from utils.http_cache import cache_control
+from config import settings
 from config.logging_config import logger
 
 router = APIRouter()
 
+# Per-user listing: browsers may reuse it briefly, shared caches must not
+PORTFOLIO_LIST_CACHE_CONTROL = cache_control(
+    settings.PORTFOLIO_LIST_MAX_AGE_SECONDS,
+    settings.PORTFOLIO_LIST_STALE_WHILE_REVALIDATE_SECONDS,
+    private=True
+)
+
 @router.get("/portfolios/{user_id}", response_model=PortfolioListResponse)
-async def list_user_portfolios(user_id: str):
+async def list_user_portfolios(user_id: str, request: Request):
     """
     List all portfolio files for a user
     
     GET /api/portfolios/{user_id}
+    
+    Carries a strong ETag; a matching If-None-Match gets an empty 304.
     """
+    media = negotiate(request)
     try:
         portfolios = await portfolio_service.list_user_portfolios(user_id)
         
-        return PortfolioListResponse(
+        response = PortfolioListResponse(
             portfolios=portfolios,
             count=len(portfolios)
         )
@@ -29,6 +42,9 @@ async def list_user_portfolios(user_id: str):
     except Exception as e:
         logger.error(f"Error listing portfolios: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
+    
+    return encode_response(request, response.model_dump(), media, table_key='portfolios',
+                           cache_control=PORTFOLIO_LIST_CACHE_CONTROL)
 
 
 @router.post("/portfolio/analyze", response_model=PortfolioAnalysisResponse)
@@ -41,7 +57,10 @@ async def analyze_portfolio(request_body: PortfolioAnalysisRequest, app_request:
         "user_id": "user123",
         "filename": "my_portfolio.xlsx"
     }
+    
+    Responds with JSON, MessagePack or Arrow (holdings table) per Accept.
     """
+    media = negotiate(app_request)
     try:
         # Fetch portfolio from S3
         logger.info(f"Analyzing portfolio: {request_body.filename} for user: {request_body.user_id}")
@@ -64,7 +83,8 @@ async def analyze_portfolio(request_body: PortfolioAnalysisRequest, app_request:
             'ai_insights': ai_insights
         }
         
-        return PortfolioAnalysisResponse(**response_data)
+        response = PortfolioAnalysisResponse(**response_data)
+        return encode_response(app_request, response.model_dump(), media, table_key='holdings')
         
     except FileNotFoundError:
         raise HTTPException(status_code=404, detail="Portfolio file not found")
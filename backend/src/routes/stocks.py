@@ -1,152 +1,384 @@
-from fastapi import APIRouter, HTTPException
-import httpx
+from fastapi import APIRouter, HTTPException, Query, Request
+from typing import Optional
+from fastapi.responses import StreamingResponse
 import os
 from datetime import datetime
 import asyncio
+from services.quote_cache import live_quotes_cache, indices_cache
+from services.market_data import market_refresher
+from services.quote_stream import quote_broadcaster
+from services.trade_stream import tick_store, trade_stream
+from services.intraday_bars import INTRADAY_INTERVALS, intraday_bars
+from services.exchange_calendar import CALENDARS, exchange_for, market_status
+from services.snapshot_diffs import snapshot_diffs
+from services.universe import INDEX_SYMBOLS, QuoteTable, display_symbol, market_universe
+from config import settings
+from services.market_providers import provider_router, ProvidersExhausted
+from utils.rate_limiter import finnhub_limiter, RateLimitExceeded, UpstreamThrottled
+from config.logging_config import logger
+from utils.candles import CANDLE_SHAPES, history_to_arrays, history_to_payload, last_close
+from utils.encoding import ARROW_STREAM, encode_response, negotiate, pick_content_encoding
+from utils.http_cache import cache_control, etag_matches, not_modified, version_etag
 
 router = APIRouter()
 
 FINNHUB_API_KEY = os.getenv('FINANCEHUB_API_KEY', '')
-FINNHUB_BASE_URL = 'https://finnhub.io/api/v1'
-
-# Top US stocks (Finnhub free tier supports these)
-INDIAN_STOCKS = {
-    'AAPL': 'Apple Inc.',
-    'MSFT': 'Microsoft Corporation',
-    'GOOGL': 'Alphabet Inc.',
-    'AMZN': 'Amazon.com Inc.',
-    'NVDA': 'NVIDIA Corporation',
-    'META': 'Meta Platforms Inc.',
-    'TSLA': 'Tesla Inc.',
-    'JPM': 'JPMorgan Chase & Co.',
-    'V': 'Visa Inc.',
-    'WMT': 'Walmart Inc.'
-}
-
-async def fetch_quote(client: httpx.AsyncClient, symbol: str, name: str):
-    """Fetch stock quote from Finnhub"""
+
+# Polled endpoints: caches may reuse a body for one refresh interval and keep serving it while revalidating
+LIVE_CACHE_CONTROL = cache_control(
+    settings.LIVE_CACHE_MAX_AGE_SECONDS, settings.LIVE_CACHE_STALE_WHILE_REVALIDATE_SECONDS
+)
+
+def _format_quote(symbol: str, name: str, quote: dict):
+    """Provider quote fields -> the /stocks/live item shape (market status from the exchange calendar)"""
+    exchange = exchange_for(symbol)
+    price = quote['price']
+    prev_close = quote['previousClose']
+    change = ((price - prev_close) / prev_close * 100) if prev_close else 0
+    return {
+        'symbol': symbol.replace('.NS', ''),
+        'name': name,
+        'price': round(price, 2),
+        'change': round(change, 2),
+        'high': round(quote['high'], 2),
+        'low': round(quote['low'], 2),
+        'open': round(quote['open'], 2),
+        'previousClose': round(prev_close, 2),
+        'exchange': exchange,
+        'isMarketOpen': CALENDARS[exchange].is_open(),
+        'timestamp': quote['timestamp'],
+        'provider': quote['provider'],
+    }
+
+async def fetch_quote(symbol: str, name: str):
+    """Fetch one stock quote through the provider chain (Finnhub first by default)"""
     try:
-        response = await client.get(
-            f"{FINNHUB_BASE_URL}/quote",
-            params={'symbol': symbol, 'token': FINNHUB_API_KEY},
-            timeout=15.0
-        )
-        
-        if response.status_code == 200:
-            data = response.json()
-            
-            current = data.get('c', 0)
-            prev_close = data.get('pc', 0)
-            high = data.get('h', 0)
-            low = data.get('l', 0)
-            open_price = data.get('o', 0)
-            timestamp = data.get('t', 0)
-            
-            # Calculate change
-            change = ((current - prev_close) / prev_close * 100) if prev_close else 0
-            
-            # Market status (if current price is 0, market is closed)
-            is_market_open = current > 0
-            
-            return {
-                'symbol': symbol.replace('.NS', ''),
-                'name': name,
-                'price': round(current if current else prev_close, 2),
-                'change': round(change, 2),
-                'high': round(high, 2),
-                'low': round(low, 2),
-                'open': round(open_price, 2),
-                'previousClose': round(prev_close, 2),
-                'isMarketOpen': is_market_open,
-                'timestamp': timestamp
-            }
-    except Exception as e:
-        print(f"Error fetching {symbol}: {e}")
+        return _format_quote(symbol, name, await provider_router.quote(symbol))
+    except ProvidersExhausted as e:
+        throttled = e.find(UpstreamThrottled, RateLimitExceeded)
+        if throttled is not None:
+            raise throttled
+        logger.warning(f"Error fetching {symbol}: {e}")
         return None
 
+def _raise_if_throttled(results: list):
+    """Surface quota exhaustion instead of a generic 503 when nothing succeeded"""
+    throttled = [r for r in results if isinstance(r, UpstreamThrottled)]
+    if throttled:
+        retry_after = max(r.retry_after for r in throttled)
+        raise HTTPException(
+            status_code=429,
+            detail="Finnhub rate limit reached",
+            headers={"Retry-After": str(int(retry_after) or 1)}
+        )
+    if any(isinstance(r, RateLimitExceeded) for r in results):
+        raise HTTPException(status_code=503, detail="Finnhub quota queue is full, try again shortly")
+
 @router.get("/stocks/live")
-async def get_live_stocks():
-    """Get real-time stock data from Finnhub API"""
+async def get_live_stocks(
+    request: Request,
+    q: Optional[str] = Query(None, description="Substring of symbol or company name"),
+    symbols: Optional[str] = Query(None, description="Comma-separated symbols to include"),
+    market_open: Optional[bool] = Query(None, description="Only symbols whose market is open (or closed)"),
+    sort: Optional[str] = Query(None, description="Sort field, '-' prefix for descending (e.g. -change)"),
+    offset: int = Query(0, ge=0),
+    limit: Optional[int] = Query(None, ge=1, le=settings.LIVE_STOCKS_MAX_PAGE_SIZE),
+    since: Optional[str] = Query(None, description="Last snapshotToken seen; returns only what moved")
+):
+    """
+    Get real-time stock data (JSON, MessagePack or Arrow per Accept)
+    
+    Filtering, sorting and paging run over the in-memory snapshot; without
+    `limit` every matching symbol is returned.
+    
+    With `since`, a `"delta": true` response lists only the symbols whose
+    price, change or market status moved after that snapshotToken (filters
+    and sort still apply, paging does not), plus any `removed` symbols. A
+    token too old to answer from the diff ring, or issued before a restart,
+    gets the full snapshot with `"delta": false`.
+    """
     
     if not FINNHUB_API_KEY:
         raise HTTPException(status_code=500, detail="Finnhub API key not configured")
+    media = negotiate(request)
     
-    stocks_data = []
+    # Served from memory when the background refresher has a snapshot
+    snapshot = market_refresher.snapshot('stocks')
+    etag = None
+    changes = None
+    if snapshot is not None:
+        etag = _snapshot_etag(request, snapshot, media, q, symbols, market_open, sort, offset, limit, since)
+        if etag_matches(request, etag):
+            return not_modified(etag, LIVE_CACHE_CONTROL)
+        payload = snapshot.response(market_refresher.stale_limit(snapshot.name))
+        if since is not None:
+            try:
+                changes = snapshot_diffs.changes_since(snapshot, since)
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+    else:
+        # Polls inside one TTL window share a single upstream fan-out
+        payload = await live_quotes_cache.get(_load_live_stocks)
     
-    async with httpx.AsyncClient() as client:
-        tasks = [fetch_quote(client, symbol, name) for symbol, name in INDIAN_STOCKS.items()]
-        results = await asyncio.gather(*tasks, return_exceptions=True)
-        
-        for result in results:
-            if isinstance(result, dict):
-                stocks_data.append(result)
+    wanted = [s.strip() for s in symbols.split(',') if s.strip()] if symbols is not None else None
+    if changes is not None:
+        payload = _delta_payload(payload, since, changes, q, wanted, market_open, sort)
+        return encode_response(request, payload, media, table_key='stocks',
+                               etag=etag, cache_control=LIVE_CACHE_CONTROL)
+    try:
+        total, page = _quote_table(payload['stocks']).query(
+            q=q, symbols=wanted, market_open=market_open, sort=sort, offset=offset, limit=limit
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    payload = {
+        **payload,
+        "stocks": page,
+        "count": len(page),
+        "total": total,
+        "offset": offset,
+        "limit": limit,
+    }
+    if since is not None:
+        payload["delta"] = False
+    return encode_response(request, payload, media, table_key='stocks',
+                           etag=etag, cache_control=LIVE_CACHE_CONTROL)
+
+def _delta_payload(payload: dict, since: str, changes, q, wanted, market_open, sort) -> dict:
+    """Snapshot payload cut down to the symbols that moved after `since`"""
+    changed, removed = changes
+    items = _quote_table(payload['stocks']).select(changed)
+    if wanted is not None:
+        wanted_set = {display_symbol(s.upper()) for s in wanted}
+        removed = [s for s in removed if s in wanted_set]
+    try:
+        _, items = QuoteTable(items).query(q=q, symbols=wanted, market_open=market_open, sort=sort)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {
+        **payload,
+        "stocks": items,
+        "count": len(items),
+        "delta": True,
+        "since": since,
+        "removed": sorted(removed),
+    }
+
+def _snapshot_etag(request: Request, snapshot, media: str, *params) -> str:
+    """
+    Validator for one snapshot version rendered with `params`
+
+    The snapshot age is left out: it is the only part of the body that
+    changes between refreshes of an unchanged version, which is why the
+    validator is weak.
+    """
+    stale = snapshot.failed_refreshes > 0 or snapshot.age() > market_refresher.stale_limit(snapshot.name)
+    coding = pick_content_encoding(request.headers.get('accept-encoding'))
+    return version_etag(snapshot.name, snapshot.version, stale, media, coding, *params)
+
+_table: Optional[QuoteTable] = None
+
+def _quote_table(items: list) -> QuoteTable:
+    """Query view for the current quote list, rebuilt only when the list changes"""
+    global _table
+    if _table is None or _table.items is not items:
+        _table = QuoteTable(items)
+    return _table
+
+async def _load_live_stocks():
+    """Fetch the next universe shard (or read the tick store in stream mode)"""
+    markets = market_status(market_universe.exchanges())
+    open_exchanges = {name for name, status in markets.items() if status['isOpen']}
+    if trade_stream.running:
+        stocks_data = await _quotes_from_tick_store(open_exchanges)
+    else:
+        shard = await _fetch_quotes(market_universe.next_shard())
+        stocks_data = market_universe.merge(shard, open_exchanges)
     
     if not stocks_data:
         raise HTTPException(status_code=503, detail="Unable to fetch stock data")
     
-    # Check if market is open
-    market_status = any(stock.get('isMarketOpen') for stock in stocks_data)
-    
     return {
         "stocks": stocks_data,
         "count": len(stocks_data),
-        "marketOpen": market_status,
+        "universe": len(market_universe),
+        "marketOpen": bool(open_exchanges),
+        "markets": markets,
         "timestamp": datetime.now().isoformat()
     }
 
+async def _fetch_quotes(symbols: dict):
+    """Provider fan-out for {symbol: name}"""
+    tasks = [fetch_quote(symbol, name) for symbol, name in symbols.items()]
+    results = await asyncio.gather(*tasks, return_exceptions=True)
+    quotes = [result for result in results if isinstance(result, dict)]
+    if not quotes:
+        _raise_if_throttled(results)
+    return quotes
+
+def _fill_from_snapshot(dataset: str, key: str, items: list):
+    """Keep the last good quote for symbols a quota-limited refresh skipped"""
+    snapshot = market_refresher.snapshot(dataset)
+    if snapshot is None or not items:
+        return items
+    fetched = {item['symbol'] for item in items}
+    previous = [item for item in snapshot.payload.get(key, []) if item['symbol'] not in fetched]
+    return items + previous
+
+async def _quotes_from_tick_store(open_exchanges: set):
+    """Build quotes from streamed trades, seeding untraded symbols over REST a shard at a time"""
+    missing = {s: n for s, n in market_universe.symbols.items() if not tick_store.has(s)}
+    missing = dict(list(missing.items())[:market_universe.shard_size])
+    if missing:
+        for quote in await _fetch_quotes(missing):
+            symbol = next(s for s in missing if s.replace('.NS', '') == quote['symbol'])
+            tick_store.seed(
+                symbol,
+                prev_close=quote['previousClose'],
+                open_price=quote['open'],
+                high=quote['high'],
+                low=quote['low'],
+                last=quote['price'],
+                ts_ms=int(quote['timestamp']) * 1000
+            )
+    quotes = []
+    for symbol, name in market_universe.symbols.items():
+        quote = tick_store.quote(symbol, name)
+        if quote is not None:
+            exchange = exchange_for(symbol)
+            quotes.append({**quote, 'exchange': exchange, 'isMarketOpen': exchange in open_exchanges})
+    return quotes
+
 @router.get("/stocks/indices")
-async def get_market_indices():
+async def get_market_indices(request: Request):
     """Get US market indices"""
     
     if not FINNHUB_API_KEY:
         raise HTTPException(status_code=500, detail="Finnhub API key not configured")
+    media = negotiate(request)
     
-    indices_symbols = {
-        '^GSPC': 'S&P 500',
-        '^DJI': 'Dow Jones',
-        '^IXIC': 'NASDAQ'
-    }
+    snapshot = market_refresher.snapshot('indices')
+    if snapshot is not None:
+        etag = _snapshot_etag(request, snapshot, media)
+        if etag_matches(request, etag):
+            return not_modified(etag, LIVE_CACHE_CONTROL)
+        return encode_response(request, snapshot.response(market_refresher.stale_limit(snapshot.name)), media,
+                               table_key='indices', etag=etag, cache_control=LIVE_CACHE_CONTROL)
     
-    indices_data = []
+    try:
+        payload = await indices_cache.get(_load_market_indices)
+    except HTTPException as e:
+        if e.status_code == 429:
+            raise
+        # No snapshot yet and upstream is down: keep the empty-list contract
+        payload = {"indices": [], "count": 0}
+    return encode_response(request, payload, media, table_key='indices', cache_control=LIVE_CACHE_CONTROL)
+
+async def _load_market_indices():
+    """Fetch the tracked index symbols through the provider chain"""
+    tasks = [fetch_quote(symbol, name) for symbol, name in INDEX_SYMBOLS.items()]
+    results = await asyncio.gather(*tasks, return_exceptions=True)
     
-    async with httpx.AsyncClient() as client:
-        tasks = [
-            client.get(
-                f"{FINNHUB_BASE_URL}/quote",
-                params={'symbol': symbol, 'token': FINNHUB_API_KEY},
-                timeout=15.0
-            )
-            for symbol in indices_symbols.keys()
-        ]
-        
-        responses = await asyncio.gather(*tasks, return_exceptions=True)
-        
-        for (symbol, name), response in zip(indices_symbols.items(), responses):
-            try:
-                if isinstance(response, Exception):
-                    continue
-                    
-                if response.status_code == 200:
-                    data = response.json()
-                    current = data.get('c', 0)
-                    prev_close = data.get('pc', 0)
-                    
-                    # Use previous close if current is 0
-                    price = current if current > 0 else prev_close
-                    change = ((current - prev_close) / prev_close * 100) if prev_close > 0 else 0
-                    
-                    if price > 0:  # Only add if we have valid price data
-                        indices_data.append({
-                            'symbol': symbol,
-                            'name': name,
-                            'price': round(price, 2),
-                            'change': round(change, 2)
-                        })
-            except Exception as e:
-                print(f"Error processing {symbol}: {e}")
-                continue
+    indices_data = [
+        {
+            'symbol': symbol,
+            'name': quote['name'],
+            'price': quote['price'],
+            'change': quote['change']
+        }
+        for symbol, quote in zip(INDEX_SYMBOLS, results)
+        # Only add if we have valid price data
+        if isinstance(quote, dict) and quote['price'] > 0
+    ]
+    
+    indices_data = _fill_from_snapshot('indices', 'indices', indices_data)
+    if not indices_data:
+        _raise_if_throttled(results)
+        raise HTTPException(status_code=503, detail="Unable to fetch index data")
     
     return {
         "indices": indices_data,
         "count": len(indices_data)
     }
+
+
+# Background refresher keeps both datasets warm (started in main.py lifespan)
+market_refresher.register('stocks', _load_live_stocks, volatile=('timestamp',),
+                          exchanges=market_universe.exchanges())
+market_refresher.register('indices', _load_market_indices,
+                          exchanges=tuple(sorted({exchange_for(s) for s in INDEX_SYMBOLS})))
+
+
+@router.get("/stocks/stream")
+async def stream_stocks():
+    """
+    Server-Sent Events stream of quote changes
+    
+    Sends a full `snapshot` event on connect, then `quotes` events holding
+    only the symbols whose price, change or market status moved.
+    """
+    if not market_refresher.running:
+        raise HTTPException(status_code=503, detail="Quote streaming requires the market refresher")
+    
+    if quote_broadcaster.full:
+        raise HTTPException(status_code=503, detail="Too many stream subscribers, fall back to polling")
+    
+    return StreamingResponse(
+        quote_broadcaster.events(settings.STREAM_HEARTBEAT_SECONDS),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no",
+        }
+    )
+
+
+@router.get("/stocks/{symbol}/intraday")
+async def get_intraday_bars(
+    request: Request,
+    symbol: str,
+    interval: str = Query("1m", description=f"One of {', '.join(INTRADAY_INTERVALS)}"),
+    limit: Optional[int] = Query(None, ge=1, le=settings.INTRADAY_BARS_PER_INTERVAL),
+    shape: str = Query("rows", description=f"One of {', '.join(CANDLE_SHAPES)}")
+):
+    """
+    Intraday OHLCV bars built in memory from live quotes and trades
+    
+    Bars start when the symbol first ticks after a restart and cover at
+    most INTRADAY_BARS_PER_INTERVAL intervals; `limit` keeps the newest.
+    """
+    media = negotiate(request)
+    try:
+        hist = intraday_bars.frame(symbol, interval, limit)
+        if hist is None:
+            raise HTTPException(status_code=404, detail=f"No intraday bars for {symbol}")
+        payload = {
+            "symbol": symbol.upper(),
+            "interval": interval,
+            "count": len(hist),
+            "price": last_close(hist),
+        }
+        if media == ARROW_STREAM:
+            return encode_response(request, payload, media, table_key='bars',
+                                   columns=history_to_arrays(hist), cache_control=LIVE_CACHE_CONTROL)
+        payload["bars"] = history_to_payload(hist, shape)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return encode_response(request, payload, media, table_key='bars', cache_control=LIVE_CACHE_CONTROL)
+
+
+@router.get("/stocks/cache/stats")
+async def get_quote_cache_stats():
+    """Hit/miss and refresh-latency counters for the shared quote snapshots"""
+    return {
+        "caches": [live_quotes_cache.stats(), indices_cache.stats()],
+        "refresher": market_refresher.stats(),
+        "stream": quote_broadcaster.stats(),
+        "trade_stream": trade_stream.stats(),
+        "finnhub_quota": finnhub_limiter.stats(),
+        "universe": market_universe.stats(),
+        "snapshot_diffs": snapshot_diffs.stats(),
+        "intraday": intraday_bars.stats(),
+        "providers": provider_router.stats()
+    }
@@ -0,0 +1,113 @@
+"""
+Alert Store - DynamoDB persistence for price alerts
+"""
+from decimal import Decimal
+from typing import Any, Dict, List, Optional
+import boto3
+from config import settings
+from config.logging_config import logger
+
+# Numeric attributes stored as DynamoDB numbers (boto3 wants Decimal, not float)
+_NUMBER_FIELDS = ('threshold', 'created_at', 'triggered_at', 'triggered_price', 'expires_at')
+
+
+def _to_item(record: Dict[str, Any]) -> Dict[str, Any]:
+    item = {}
+    for key, value in record.items():
+        if value is None:
+            continue
+        item[key] = Decimal(str(value)) if key in _NUMBER_FIELDS else value
+    return item
+
+
+def _from_item(item: Dict[str, Any]) -> Dict[str, Any]:
+    return {key: float(value) if isinstance(value, Decimal) else value for key, value in item.items()}
+
+
+class DynamoAlertStore:
+    """
+    One item per alert, keyed by user_id (hash) and alert_id (range).
+    Triggered alerts carry `expires_at` (epoch seconds), the table's TTL
+    attribute, so DynamoDB deletes them after the retention period.
+
+    When the table cannot be reached (local development without AWS
+    credentials) the store reports itself unavailable and alerts live in
+    memory only until the next restart.
+    """
+
+    def __init__(self, table_name: str, region: str):
+        self.table_name = table_name
+        self.region = region
+        self._table = None
+
+        # Counters
+        self.writes = 0
+        self.errors = 0
+
+    @property
+    def available(self) -> bool:
+        return self._table is not None
+
+    def open(self):
+        """Bind the table; blocking, run it off the event loop"""
+        try:
+            table = boto3.resource('dynamodb', region_name=self.region).Table(self.table_name)
+            table.load()
+            self._table = table
+            logger.info(f"🔔 Price alerts table: {self.table_name}")
+        except Exception as e:
+            logger.warning(f"Price alerts table {self.table_name} unavailable, keeping alerts in memory: {e}")
+
+    def load(self) -> List[Dict[str, Any]]:
+        """Every stored alert (paginated scan)"""
+        if self._table is None:
+            return []
+        records: List[Dict[str, Any]] = []
+        kwargs: Dict[str, Any] = {}
+        try:
+            while True:
+                page = self._table.scan(**kwargs)
+                records.extend(_from_item(item) for item in page.get('Items', []))
+                last_key: Optional[Dict] = page.get('LastEvaluatedKey')
+                if not last_key:
+                    return records
+                kwargs['ExclusiveStartKey'] = last_key
+        except Exception as e:
+            self.errors += 1
+            logger.error(f"Could not load price alerts: {e}")
+            return records
+
+    def put(self, record: Dict[str, Any]):
+        """Create or replace one alert"""
+        if self._table is None:
+            return
+        try:
+            self._table.put_item(Item=_to_item(record))
+            self.writes += 1
+        except Exception as e:
+            self.errors += 1
+            logger.error(f"Could not save price alert {record.get('alert_id')}: {e}")
+            raise
+
+    def delete(self, user_id: str, alert_id: str):
+        if self._table is None:
+            return
+        try:
+            self._table.delete_item(Key={'user_id': user_id, 'alert_id': alert_id})
+            self.writes += 1
+        except Exception as e:
+            self.errors += 1
+            logger.error(f"Could not delete price alert {alert_id}: {e}")
+            raise
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'table': self.table_name,
+            'available': self.available,
+            'writes': self.writes,
+            'errors': self.errors,
+        }
+
+
+# Singleton instance
+alert_store = DynamoAlertStore(settings.ALERTS_TABLE, settings.AWS_REGION)
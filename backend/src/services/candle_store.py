@@ -0,0 +1,287 @@
+"""
+Candle Store - Persistent per-symbol OHLCV arrays with incremental gap filling
+"""
+import json
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import quote
+import numpy as np
+import pandas as pd
+from config import settings
+from config.logging_config import logger
+
+CANDLE_DTYPE = np.dtype([
+    ('ts', 'i8'),
+    ('open', 'f8'),
+    ('high', 'f8'),
+    ('low', 'f8'),
+    ('close', 'f8'),
+    ('volume', 'f8'),
+])
+
+# Intervals kept on disk; intraday bars are short-lived upstream and bypass the store
+STORE_INTERVALS = ('1d', '5d', '1wk', '1mo', '3mo')
+
+# `range` query values -> lookback in days (None = full history)
+RANGE_DAYS = {
+    # Counted in trading bars (RANGE_BARS); the lookback only has to hold that many across market closures
+    '1d': 10,
+    '5d': 15,
+    '1mo': 31,
+    '3mo': 92,
+    '6mo': 183,
+    '1y': 366,
+    '2y': 731,
+    '5y': 1827,
+    '10y': 3653,
+    'max': None,
+}
+
+# Short ranges -> trading bars returned, plus one for the previous close
+RANGE_BARS = {'1d': 1, '5d': 5}
+
+# Calendar span of one bar, used to overlap a history fetch with the first stored bar
+INTERVAL_SECONDS = {'1d': 86400, '5d': 5 * 86400, '1wk': 7 * 86400, '1mo': 31 * 86400, '3mo': 92 * 86400}
+
+# Fetcher signature: (symbol, interval, start_ts or None for max, end_ts or None for now) -> DataFrame
+Fetcher = Callable[[str, str, Optional[int], Optional[int]], pd.DataFrame]
+
+
+def range_start(range_value: str, now: Optional[float] = None) -> Optional[int]:
+    """
+    Epoch seconds where a `range` window starts, None for full history
+
+    Raises:
+        ValueError: Unknown range value
+    """
+    now = now or time.time()
+    if range_value == 'ytd':
+        year_start = datetime.fromtimestamp(now, tz=timezone.utc).replace(
+            month=1, day=1, hour=0, minute=0, second=0, microsecond=0
+        )
+        return int(year_start.timestamp())
+    if range_value not in RANGE_DAYS:
+        raise ValueError(f"Unsupported range: {range_value}. Use one of: {', '.join(list(RANGE_DAYS) + ['ytd'])}")
+    days = RANGE_DAYS[range_value]
+    if days is None:
+        return None
+    return int(now - days * 86400)
+
+
+def range_bars(range_value: str) -> Optional[int]:
+    """Bars a short range returns (its trading bars plus the previous close), None for calendar ranges"""
+    bars = RANGE_BARS.get(range_value)
+    return None if bars is None else bars + 1
+
+
+def window(records: np.ndarray, start: Optional[int], min_bars: int = 2,
+           last: Optional[int] = None) -> np.ndarray:
+    """The newest `last` bars, or bars since `start` (None = all) but at least `min_bars`"""
+    if last is not None:
+        return records[max(0, len(records) - last):]
+    if start is None or not len(records):
+        return records
+    first = int(np.searchsorted(records['ts'], start, side='left'))
+    return records[max(0, min(first, len(records) - min_bars)):]
+
+
+def frame_to_records(frame: pd.DataFrame) -> np.ndarray:
+    """yfinance history frame -> structured candle array sorted by ts"""
+    records = np.zeros(len(frame), dtype=CANDLE_DTYPE)
+    if len(frame) == 0:
+        return records
+    index = frame.index
+    if index.tz is None:
+        index = index.tz_localize('UTC')
+    records['ts'] = index.as_unit('s').asi8
+    records['open'] = frame['Open'].to_numpy(dtype='f8')
+    records['high'] = frame['High'].to_numpy(dtype='f8')
+    records['low'] = frame['Low'].to_numpy(dtype='f8')
+    records['close'] = frame['Close'].to_numpy(dtype='f8')
+    records['volume'] = frame['Volume'].to_numpy(dtype='f8')
+    records = records[~np.isnan(records['close'])]
+    return np.sort(records, order='ts')
+
+
+def records_to_frame(records: np.ndarray, tz: Optional[str]) -> pd.DataFrame:
+    """Structured candle array -> frame shaped like yfinance history"""
+    index = pd.to_datetime(records['ts'], unit='s', utc=True)
+    if tz:
+        index = index.tz_convert(tz)
+    return pd.DataFrame({
+        'Open': records['open'],
+        'High': records['high'],
+        'Low': records['low'],
+        'Close': records['close'],
+        'Volume': records['volume'],
+    }, index=pd.DatetimeIndex(index, name='Date'))
+
+
+def merge_records(old: np.ndarray, new: np.ndarray) -> np.ndarray:
+    """Union by ts; bars in `new` replace bars with the same ts in `old`"""
+    if len(old) == 0:
+        return new
+    if len(new) == 0:
+        return old
+    keep = ~np.isin(old['ts'], new['ts'])
+    merged = np.concatenate([old[keep], new])
+    return np.sort(merged, order='ts')
+
+
+class CandleStore:
+    """
+    One memory-mapped .npy of CANDLE_DTYPE rows per (symbol, interval),
+    plus a small JSON sidecar recording which window has been fetched.
+
+    A read asks for bars since some start; only the part of that window not
+    already on disk is fetched (older history on the left, the still-forming
+    latest bar on the right), merged in, and written back atomically.
+
+    Every gap window overlaps a bar already stored, so a successful fetch
+    never comes back empty. An empty result is therefore treated as an
+    upstream failure: nothing is marked covered or refreshed, and the next
+    read tries again.
+    """
+
+    def __init__(self, root: str, tail_refresh_seconds: float):
+        self.root = root
+        self.tail_refresh_seconds = tail_refresh_seconds
+        self._locks: Dict[Tuple[str, str], threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+
+        # Counters
+        self.reads = 0
+        self.fetches = 0
+        self.bars_fetched = 0
+        self.empty_fetches = 0
+
+    def _lock(self, symbol: str, interval: str) -> threading.Lock:
+        with self._locks_guard:
+            return self._locks.setdefault((symbol, interval), threading.Lock())
+
+    def _paths(self, symbol: str, interval: str) -> Tuple[str, str]:
+        base = os.path.join(self.root, interval, quote(symbol, safe=''))
+        return base + '.npy', base + '.json'
+
+    def _load(self, symbol: str, interval: str) -> Tuple[np.ndarray, Optional[dict]]:
+        data_path, meta_path = self._paths(symbol, interval)
+        if not (os.path.exists(data_path) and os.path.exists(meta_path)):
+            return np.zeros(0, dtype=CANDLE_DTYPE), None
+        with open(meta_path) as f:
+            meta = json.load(f)
+        return np.load(data_path, mmap_mode='r'), meta
+
+    def _save(self, symbol: str, interval: str, records: np.ndarray, meta: dict):
+        data_path, meta_path = self._paths(symbol, interval)
+        os.makedirs(os.path.dirname(data_path), exist_ok=True)
+        # Write-then-rename so concurrent readers never see a partial file
+        tmp_data = data_path + '.tmp.npy'
+        np.save(tmp_data, np.ascontiguousarray(records))
+        os.replace(tmp_data, data_path)
+        tmp_meta = meta_path + '.tmp'
+        with open(tmp_meta, 'w') as f:
+            json.dump(meta, f)
+        os.replace(tmp_meta, meta_path)
+
+    def gaps(self, records: np.ndarray, meta: Optional[dict], start: Optional[int], now: float,
+             interval: str = '1d') -> List[Tuple[Optional[int], Optional[int]]]:
+        """Windows (start, end) still to fetch; None start = full history, None end = now"""
+        if meta is None:
+            return [(start, None)]
+        gaps = []
+        covered_start = meta.get('covered_start')
+        if covered_start is not None and (start is None or start < covered_start):
+            # Reach past the first stored bar so a good answer always holds at least that bar
+            end = int(records['ts'][0]) + INTERVAL_SECONDS.get(interval, 86400) if len(records) else covered_start
+            gaps.append((start, max(end, covered_start)))
+        if now - meta.get('last_fetch', 0) > self.tail_refresh_seconds:
+            # Re-fetch from the last stored bar so the forming bar is replaced
+            tail_start = int(records['ts'][-1]) if len(records) else covered_start
+            gaps.append((tail_start, None))
+        return gaps
+
+    def pending_gaps(self, symbol: str, interval: str, start: Optional[int],
+                     now: float) -> List[Tuple[Optional[int], Optional[int]]]:
+        """Windows a read for `start` would fetch, without fetching them"""
+        with self._lock(symbol, interval):
+            records, meta = self._load(symbol, interval)
+            return self.gaps(records, meta, start, now, interval)
+
+    def read(self, symbol: str, interval: str, start: Optional[int], fetcher: Fetcher,
+             min_bars: int = 2, last: Optional[int] = None) -> pd.DataFrame:
+        """
+        Bars since `start` (None = all), filling missing windows through `fetcher`
+
+        At least `min_bars` bars are returned when the store has them, so a
+        one-day range still carries the previous close. `last` returns the
+        newest bars instead (short ranges, see range_bars).
+        """
+        self.reads += 1
+        now = time.time()
+        with self._lock(symbol, interval):
+            records, meta = self._load(symbol, interval)
+            gaps = self.gaps(records, meta, start, now, interval)
+            if gaps:
+                records, meta = self._fill(symbol, interval, records, meta, gaps, fetcher, start, now)
+
+        tz = meta.get('tz') if meta else None
+        return records_to_frame(np.asarray(window(records, start, min_bars, last)), tz)
+
+    def read_cached(self, symbol: str, interval: str, start: Optional[int],
+                    min_bars: int = 2, last: Optional[int] = None) -> pd.DataFrame:
+        """Bars since `start` already on disk; never fetches (empty frame if none)"""
+        with self._lock(symbol, interval):
+            records, meta = self._load(symbol, interval)
+        tz = meta.get('tz') if meta else None
+        return records_to_frame(np.asarray(window(records, start, min_bars, last)), tz)
+
+    def _fill(self, symbol, interval, records, meta, gaps, fetcher, start, now):
+        records = np.array(records)
+        tz = meta.get('tz') if meta else None
+        covered = meta is not None
+        covered_start = meta.get('covered_start') if meta else None
+        last_fetch = meta.get('last_fetch', 0) if meta else 0
+        filled = 0
+        for gap_start, gap_end in gaps:
+            frame = fetcher(symbol, interval, gap_start, gap_end)
+            self.fetches += 1
+            if frame is None or frame.empty:
+                # Failed (or throttled) upstream: leave the window uncovered so it is retried
+                self.empty_fetches += 1
+                continue
+            if tz is None and getattr(frame.index, 'tz', None) is not None:
+                tz = str(frame.index.tz)
+            new = frame_to_records(frame)
+            self.bars_fetched += len(new)
+            records = merge_records(records, new)
+            filled += 1
+            # Bars came back for the whole window, so none exist between its start and the first bar
+            if not covered or gap_start is None or (covered_start is not None and gap_start < covered_start):
+                covered_start = gap_start
+                covered = True
+            if gap_end is None:
+                last_fetch = now
+
+        if not filled:
+            logger.warning(f"Candle store fetch for {symbol} {interval} returned no bars; will retry")
+            return records, meta
+        meta = {'covered_start': covered_start, 'last_fetch': last_fetch, 'tz': tz}
+        self._save(symbol, interval, records, meta)
+        logger.info(f"Candle store filled {symbol} {interval}: {filled}/{len(gaps)} gap(s), {len(records)} bars on disk")
+        return records, meta
+
+    def stats(self) -> Dict:
+        return {
+            'root': self.root,
+            'reads': self.reads,
+            'upstream_fetches': self.fetches,
+            'bars_fetched': self.bars_fetched,
+            'empty_fetches': self.empty_fetches,
+        }
+
+
+# Singleton instance
+candle_store = CandleStore(settings.CANDLE_STORE_DIR, settings.CANDLE_TAIL_REFRESH_SECONDS)
@@ -0,0 +1,259 @@
+"""
+Exchange Calendar - Trading sessions, holidays and pre/post-market hours for NSE/BSE and US venues
+"""
+import json
+from dataclasses import dataclass, field
+from datetime import date, datetime, time, timedelta, timezone
+from functools import lru_cache
+from typing import Dict, FrozenSet, Iterable, Optional, Tuple
+from zoneinfo import ZoneInfo
+from config import settings
+from config.logging_config import logger
+
+# Session phases, most active first
+OPEN = 'open'
+PRE = 'pre'
+POST = 'post'
+CLOSED = 'closed'
+_PHASE_RANK = {OPEN: 0, PRE: 1, POST: 1, CLOSED: 2}
+
+# NSE/BSE trading holidays (weekday closures only). The exchanges publish
+# these yearly; add later years through EXCHANGE_HOLIDAYS_FILE until the
+# table here is updated.
+NSE_HOLIDAYS = frozenset(date.fromisoformat(d) for d in (
+    # 2025
+    '2025-02-26', '2025-03-14', '2025-03-31', '2025-04-10', '2025-04-14', '2025-04-18',
+    '2025-05-01', '2025-08-15', '2025-08-27', '2025-10-02', '2025-10-21', '2025-10-22',
+    '2025-11-05', '2025-12-25',
+    # 2026
+    '2026-01-15', '2026-01-26', '2026-03-03', '2026-03-26', '2026-03-31', '2026-04-03',
+    '2026-04-14', '2026-05-01', '2026-05-28', '2026-06-26', '2026-09-14', '2026-10-02',
+    '2026-10-20', '2026-11-10', '2026-11-24', '2026-12-25',
+))
+
+# One-off US closures the holiday rules cannot predict
+US_SPECIAL_CLOSURES = frozenset(date.fromisoformat(d) for d in (
+    '2025-01-09',  # National Day of Mourning for President Carter
+))
+
+
+def _nth_weekday(year: int, month: int, weekday: int, n: int) -> date:
+    """n-th `weekday` (Mon=0) of a month; n=-1 for the last one"""
+    if n > 0:
+        first = date(year, month, 1)
+        return first + timedelta(days=(weekday - first.weekday()) % 7 + 7 * (n - 1))
+    last = (date(year, month + 1, 1) if month < 12 else date(year + 1, 1, 1)) - timedelta(days=1)
+    return last - timedelta(days=(last.weekday() - weekday) % 7)
+
+
+def _easter(year: int) -> date:
+    """Gregorian Easter Sunday (anonymous Gregorian algorithm)"""
+    a, b, c = year % 19, year // 100, year % 100
+    d, e = b // 4, b % 4
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = c // 4, c % 4
+    l = (32 + 2 * e + 2 * i - h - k) % 7  # noqa: E741
+    m = (a + 11 * h + 22 * l) // 451
+    month = (h + l - 7 * m + 114) // 31
+    day = (h + l - 7 * m + 114) % 31 + 1
+    return date(year, month, day)
+
+
+def _observed(d: date) -> Optional[date]:
+    """NYSE observance: Saturday holidays move to Friday, Sunday ones to Monday"""
+    if d.weekday() == 5:
+        # A Saturday New Year's Day is not made up on the previous year's last trading day
+        return None if (d.month, d.day) == (1, 1) else d - timedelta(days=1)
+    if d.weekday() == 6:
+        return d + timedelta(days=1)
+    return d
+
+
+@lru_cache(maxsize=16)
+def us_holidays(year: int) -> Tuple[FrozenSet[date], Dict[date, time]]:
+    """(full-day NYSE/NASDAQ holidays, early closes -> close time) for one year"""
+    fixed = [date(year, 1, 1), date(year, 7, 4), date(year, 12, 25)]
+    if year >= 2022:
+        fixed.append(date(year, 6, 19))
+    holidays = {d for d in (_observed(f) for f in fixed) if d is not None}
+    holidays.update({
+        _nth_weekday(year, 1, 0, 3),     # Martin Luther King Jr. Day
+        _nth_weekday(year, 2, 0, 3),     # Washington's Birthday
+        _easter(year) - timedelta(days=2),  # Good Friday
+        _nth_weekday(year, 5, 0, -1),    # Memorial Day
+        _nth_weekday(year, 9, 0, 1),     # Labor Day
+        _nth_weekday(year, 11, 3, 4),    # Thanksgiving
+    })
+    holidays.update(d for d in US_SPECIAL_CLOSURES if d.year == year)
+
+    early = {}
+    thanksgiving = _nth_weekday(year, 11, 3, 4)
+    for d in (date(year, 7, 3), thanksgiving + timedelta(days=1), date(year, 12, 24)):
+        if d.weekday() < 5 and d not in holidays:
+            early[d] = time(13, 0)
+    return frozenset(holidays), early
+
+
+@dataclass(frozen=True)
+class ExchangeCalendar:
+    """
+    Weekday sessions in the exchange's local time.
+
+    `pre` and `post` are the extended-hours windows around the regular
+    session; prices can move then but far less often. Early closes cut the
+    regular session short and shift the post-market window with it.
+    """
+    name: str
+    tz: ZoneInfo
+    pre_open: time
+    open: time
+    close: time
+    post_close: time
+    holidays: FrozenSet[date] = frozenset()
+    rule_based_us: bool = False
+    extra_holidays: FrozenSet[date] = field(default_factory=frozenset)
+
+    def _day(self, d: date) -> Optional[Tuple[datetime, datetime, datetime, datetime]]:
+        """(pre-open, open, close, post-close) for a trading day, None when closed"""
+        if d.weekday() >= 5 or d in self.holidays or d in self.extra_holidays:
+            return None
+        close = self.close
+        post_close = self.post_close
+        if self.rule_based_us:
+            holidays, early = us_holidays(d.year)
+            if d in holidays:
+                return None
+            if d in early:
+                close = early[d]
+                post_close = time(17, 0)
+        at = lambda t: datetime.combine(d, t, tzinfo=self.tz)  # noqa: E731
+        return at(self.pre_open), at(self.open), at(close), at(post_close)
+
+    def is_trading_day(self, d: date) -> bool:
+        return self._day(d) is not None
+
+    def phase(self, now: Optional[datetime] = None) -> str:
+        """OPEN, PRE, POST or CLOSED at `now` (default: current time)"""
+        local = (now or datetime.now(timezone.utc)).astimezone(self.tz)
+        day = self._day(local.date())
+        if day is None:
+            return CLOSED
+        pre_open, open_, close, post_close = day
+        if open_ <= local < close:
+            return OPEN
+        if pre_open <= local < open_:
+            return PRE
+        if close <= local < post_close:
+            return POST
+        return CLOSED
+
+    def is_open(self, now: Optional[datetime] = None) -> bool:
+        """Regular session in progress"""
+        return self.phase(now) == OPEN
+
+    def next_change(self, now: Optional[datetime] = None) -> datetime:
+        """First moment after `now` where the phase changes"""
+        local = (now or datetime.now(timezone.utc)).astimezone(self.tz)
+        d = local.date()
+        for _ in range(15):
+            day = self._day(d)
+            if day is not None:
+                for boundary in day:
+                    if boundary > local:
+                        return boundary
+            d += timedelta(days=1)
+        return local + timedelta(days=1)
+
+    def next_open(self, now: Optional[datetime] = None) -> Optional[datetime]:
+        """Start of the next regular session after `now`"""
+        local = (now or datetime.now(timezone.utc)).astimezone(self.tz)
+        d = local.date()
+        for _ in range(15):
+            day = self._day(d)
+            if day is not None and day[1] > local:
+                return day[1]
+            d += timedelta(days=1)
+        return None
+
+    def status(self, now: Optional[datetime] = None) -> Dict:
+        now = now or datetime.now(timezone.utc)
+        phase = self.phase(now)
+        next_open = self.next_open(now)
+        return {
+            'exchange': self.name,
+            'phase': phase,
+            'isOpen': phase == OPEN,
+            'nextChange': self.next_change(now).isoformat(),
+            'nextOpen': next_open.isoformat() if next_open else None,
+        }
+
+
+def _load_extra_holidays(path: str) -> Dict[str, FrozenSet[date]]:
+    """{"NSE": ["2027-01-26", ...], ...} from the optional override file"""
+    if not path:
+        return {}
+    try:
+        with open(path) as f:
+            raw = json.load(f)
+        return {name.upper(): frozenset(date.fromisoformat(d) for d in days) for name, days in raw.items()}
+    except (OSError, ValueError) as e:
+        logger.warning(f"Could not read exchange holidays file {path}: {e}")
+        return {}
+
+
+def _build_calendars() -> Dict[str, ExchangeCalendar]:
+    extra = _load_extra_holidays(settings.EXCHANGE_HOLIDAYS_FILE)
+    india = ZoneInfo('Asia/Kolkata')
+    new_york = ZoneInfo('America/New_York')
+    calendars = {}
+    for name in ('NSE', 'BSE'):
+        calendars[name] = ExchangeCalendar(
+            name, india, time(9, 0), time(9, 15), time(15, 30), time(16, 0),
+            holidays=NSE_HOLIDAYS, extra_holidays=extra.get(name, frozenset()),
+        )
+    for name in ('NYSE', 'NASDAQ'):
+        calendars[name] = ExchangeCalendar(
+            name, new_york, time(4, 0), time(9, 30), time(16, 0), time(20, 0),
+            rule_based_us=True, extra_holidays=extra.get(name, frozenset()),
+        )
+    return calendars
+
+
+CALENDARS = _build_calendars()
+
+# Index symbols whose venue the suffix rules cannot tell
+INDEX_EXCHANGES = {'^NSEI': 'NSE', '^NSEBANK': 'NSE', '^BSESN': 'BSE'}
+
+
+def exchange_for(symbol: str) -> str:
+    """Calendar name for a ticker: .NS -> NSE, .BO -> BSE, anything else trades in the US"""
+    symbol = symbol.upper()
+    if symbol in INDEX_EXCHANGES:
+        return INDEX_EXCHANGES[symbol]
+    if symbol.endswith('.NS'):
+        return 'NSE'
+    if symbol.endswith('.BO'):
+        return 'BSE'
+    return 'NYSE'
+
+
+def combined_phase(exchanges: Iterable[str], now: Optional[datetime] = None) -> str:
+    """Most active phase across several exchanges"""
+    phases = [CALENDARS[name].phase(now) for name in exchanges]
+    return min(phases, key=_PHASE_RANK.__getitem__) if phases else OPEN
+
+
+def seconds_until_change(exchanges: Iterable[str], now: Optional[datetime] = None) -> float:
+    """Seconds until the soonest phase change on any of the exchanges"""
+    now = now or datetime.now(timezone.utc)
+    changes = [CALENDARS[name].next_change(now) for name in exchanges]
+    if not changes:
+        return float('inf')
+    return max(0.0, (min(changes) - now).total_seconds())
+
+
+def market_status(exchanges: Iterable[str], now: Optional[datetime] = None) -> Dict[str, Dict]:
+    """status() per exchange, keyed by name"""
+    return {name: CALENDARS[name].status(now) for name in sorted(set(exchanges))}
@@ -0,0 +1,228 @@
+"""
+History Service - Cached yfinance OHLCV history shared by single and batch quote routes
+"""
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+import pandas as pd
+import yfinance as yf
+from config import settings
+from config.logging_config import logger
+from services.candle_store import STORE_INTERVALS, candle_store, range_bars, range_start
+from utils.yf_executor import yf_executor
+
+OHLCV_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+
+def _window_kwargs(start: Optional[int], end: Optional[int]) -> Dict:
+    """yfinance start/end (or period=max) arguments for an epoch window"""
+    if start is None:
+        return {'period': 'max'}
+    kwargs = {'start': datetime.fromtimestamp(start, tz=timezone.utc)}
+    if end is not None:
+        kwargs['end'] = datetime.fromtimestamp(end, tz=timezone.utc)
+    return kwargs
+
+
+def _fetch_window(symbol: str, interval: str, start: Optional[int], end: Optional[int]) -> pd.DataFrame:
+    """CandleStore fetcher backed by yf.Ticker.history"""
+    return yf.Ticker(symbol).history(interval=interval, **_window_kwargs(start, end))
+
+
+class HistoryService:
+    """
+    In-memory LRU of history frames keyed by (symbol, period, interval).
+
+    The single-symbol route and the batch route read and fill the same
+    cache, so a symbol fetched by either is free for the other until the
+    TTL expires. Batch misses are fetched with one yf.download call.
+
+    Daily and longer intervals sit on the persistent CandleStore, so a miss
+    here only downloads the bars missing from disk; `period` is a `range`
+    value (1d, 5d, 1mo, ..., ytd, max).
+    """
+
+    def __init__(self, ttl_seconds: float, max_entries: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._cache: "OrderedDict[Tuple[str, str, str], Tuple[float, pd.DataFrame]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def _get_cached(self, key: Tuple[str, str, str]) -> Optional[pd.DataFrame]:
+        entry = self._cache.get(key)
+        if entry is None:
+            return None
+        fetched_at, frame = entry
+        if time.monotonic() - fetched_at > self.ttl_seconds:
+            del self._cache[key]
+            return None
+        self._cache.move_to_end(key)
+        return frame
+
+    def _put(self, key: Tuple[str, str, str], frame: pd.DataFrame):
+        self._cache[key] = (time.monotonic(), frame)
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.max_entries:
+            self._cache.popitem(last=False)
+
+    async def get_history(self, symbol: str, period: str = "1mo", interval: str = "1d") -> pd.DataFrame:
+        """
+        OHLCV history for one symbol
+
+        Returns:
+            DataFrame indexed by timestamp with Open/High/Low/Close/Volume
+        """
+        key = (symbol, period, interval)
+        frame = self._get_cached(key)
+        if frame is not None:
+            self.hits += 1
+            return frame
+
+        self.misses += 1
+        if self._store_backed(interval):
+            start = range_start(period)
+            frame = await yf_executor.run(candle_store.read, symbol, interval, start, _fetch_window,
+                                          last=range_bars(period))
+        else:
+            frame = await yf_executor.run(lambda: yf.Ticker(symbol).history(period=period, interval=interval))
+        if not frame.empty:
+            self._put(key, frame)
+        return frame
+
+    async def get_history_batch(
+        self, symbols: List[str], period: str = "1mo", interval: str = "1d"
+    ) -> Tuple[Dict[str, pd.DataFrame], Dict[str, str]]:
+        """
+        OHLCV history for many symbols with one upstream download for the misses
+
+        Returns:
+            (frames keyed by symbol, error message keyed by symbol)
+        """
+        frames: Dict[str, pd.DataFrame] = {}
+        errors: Dict[str, str] = {}
+        missing = []
+        for symbol in symbols:
+            frame = self._get_cached((symbol, period, interval))
+            if frame is not None:
+                self.hits += 1
+                frames[symbol] = frame
+            else:
+                missing.append(symbol)
+
+        if not missing:
+            return frames, errors
+
+        self.misses += len(missing)
+        if self._store_backed(interval):
+            start = range_start(period)
+            stored, store_errors = await yf_executor.run(self._read_store_batch, missing, interval, start,
+                                                         range_bars(period))
+            for symbol, frame in stored.items():
+                self._put((symbol, period, interval), frame)
+            frames.update(stored)
+            errors.update(store_errors)
+            return frames, errors
+
+        try:
+            data = await yf_executor.run(lambda: yf.download(
+                missing,
+                period=period,
+                interval=interval,
+                group_by='ticker',
+                threads=True,
+                progress=False,
+            ))
+        except Exception as e:
+            logger.error(f"Batch history download failed for {len(missing)} symbols: {e}")
+            for symbol in missing:
+                errors[symbol] = str(e) or e.__class__.__name__
+            return frames, errors
+
+        for symbol in missing:
+            frame = self._split_download(data, symbol)
+            if frame is None or frame.empty:
+                errors[symbol] = "No data found"
+                continue
+            self._put((symbol, period, interval), frame)
+            frames[symbol] = frame
+        return frames, errors
+
+    @staticmethod
+    def _store_backed(interval: str) -> bool:
+        return settings.CANDLE_STORE_ENABLED and interval in STORE_INTERVALS
+
+    def _read_store_batch(
+        self, symbols: List[str], interval: str, start: Optional[int], last: Optional[int] = None
+    ) -> Tuple[Dict[str, pd.DataFrame], Dict[str, str]]:
+        """Gap-fill many symbols from disk with one yf.download covering every gap (runs in a worker thread)"""
+        now = time.time()
+        pending = {s: candle_store.pending_gaps(s, interval, start, now) for s in symbols}
+        to_fetch = [s for s, gaps in pending.items() if gaps]
+        frames: Dict[str, pd.DataFrame] = {}
+        errors: Dict[str, str] = {}
+
+        data = None
+        if to_fetch:
+            gap_starts = [gap_start for s in to_fetch for gap_start, _ in pending[s]]
+            fetch_start = None if any(g is None for g in gap_starts) else min(gap_starts)
+            try:
+                data = yf.download(
+                    to_fetch,
+                    interval=interval,
+                    group_by='ticker',
+                    threads=True,
+                    progress=False,
+                    **_window_kwargs(fetch_start, None)
+                )
+            except Exception as e:
+                logger.error(f"Batch gap fill failed for {len(to_fetch)} symbols: {e}")
+                for symbol in to_fetch:
+                    errors[symbol] = str(e) or e.__class__.__name__
+
+        for symbol in symbols:
+            if symbol in errors:
+                continue
+            downloaded = self._split_download(data, symbol)
+            frame = candle_store.read(
+                symbol, interval, start,
+                fetcher=lambda *_args, downloaded=downloaded: downloaded,
+                last=last
+            )
+            if frame.empty:
+                errors[symbol] = "No data found"
+            else:
+                frames[symbol] = frame
+        return frames, errors
+
+    @staticmethod
+    def _split_download(data: Optional[pd.DataFrame], symbol: str) -> Optional[pd.DataFrame]:
+        """Pull one ticker's OHLCV frame out of a grouped yf.download result"""
+        if data is None or data.empty:
+            return None
+        if isinstance(data.columns, pd.MultiIndex):
+            if symbol not in data.columns.get_level_values(0):
+                return None
+            frame = data[symbol]
+        else:
+            frame = data
+        frame = frame[[c for c in OHLCV_COLUMNS if c in frame.columns]]
+        return frame.dropna(how='all')
+
+    def stats(self) -> Dict:
+        return {
+            'entries': len(self._cache),
+            'max_entries': self.max_entries,
+            'ttl_seconds': self.ttl_seconds,
+            'hits': self.hits,
+            'misses': self.misses,
+            'candle_store': candle_store.stats(),
+        }
+
+
+# Singleton instance
+history_service = HistoryService(
+    ttl_seconds=settings.HISTORY_CACHE_TTL_SECONDS,
+    max_entries=settings.HISTORY_CACHE_MAX_ENTRIES,
+)
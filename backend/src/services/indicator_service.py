@@ -0,0 +1,130 @@
+"""
+Indicator Service - Memoised technical indicators over provider candle history
+"""
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from config import settings
+from services.candle_store import RANGE_DAYS, STORE_INTERVALS, range_bars, range_start
+from services.market_providers import provider_router
+from utils.candles import history_to_arrays
+from utils.indicators import Spec, compute, lookback, parse_set
+
+# Rough calendar days per bar, used to widen a range for indicator warm-up
+BAR_DAYS = {'1d': 1.5, '5d': 7, '1wk': 7, '1mo': 31, '3mo': 92}
+
+# Ranges tried, shortest first, when widening a request for warm-up
+WARMUP_RANGES = ('1mo', '3mo', '6mo', '1y', '2y', '5y', '10y')
+
+
+def warmup_range(range_value: str, interval: str, bars: int, now: Optional[float] = None) -> str:
+    """
+    Shortest range holding `range_value` plus `bars` earlier bars
+
+    Intraday intervals bypass the candle store and are served as asked.
+
+    Raises:
+        ValueError: Unknown range value
+    """
+    start = range_start(range_value, now)
+    if start is None or interval not in STORE_INTERVALS:
+        return range_value
+    now = now or time.time()
+    needed = (now - start) / 86400 + bars * BAR_DAYS[interval]
+    for candidate in WARMUP_RANGES:
+        if RANGE_DAYS[candidate] >= needed:
+            return candidate
+    return 'max'
+
+
+@dataclass(frozen=True)
+class IndicatorResult:
+    """Indicator columns for one (symbol, range, interval, set) as of `last_bar`"""
+    ts: np.ndarray
+    columns: Dict[str, np.ndarray]
+    last_bar: np.datetime64
+    provider: Optional[str]
+
+
+class IndicatorService:
+    """
+    Computes indicator sets over the same candle history /finance/quote
+    serves, extended backwards so long periods are warmed up at the start
+    of the requested window.
+
+    Results are memoised by symbol, range, interval, indicator set and the
+    last bar (timestamp and close), so re-opening a chart recomputes
+    nothing until a new bar arrives or the forming bar moves.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._cache: "OrderedDict[tuple, IndicatorResult]" = OrderedDict()
+
+        # Counters
+        self.hits = 0
+        self.misses = 0
+        self.compute_ms = 0.0
+
+    async def get(self, symbol: str, range_value: str, interval: str,
+                  indicator_set: str) -> Tuple[List[Spec], IndicatorResult]:
+        """
+        (parsed specs, result) for one request
+
+        Raises:
+            ValueError: Bad indicator set or range
+            ProvidersExhausted: No provider could serve the candles
+        """
+        specs = parse_set(indicator_set)
+        fetch_range = warmup_range(range_value, interval, lookback(specs))
+        hist = await provider_router.history(symbol, fetch_range, interval)
+        arrays = history_to_arrays(hist)
+        ts, close = arrays['ts'], arrays['close']
+
+        last = (ts[-1].astype('datetime64[s]').astype('i8').item(), float(close[-1])) if len(ts) else None
+        key = (symbol.upper(), range_value, interval, tuple(specs), last, len(ts))
+        result = self._cache.get(key)
+        if result is not None:
+            self.hits += 1
+            self._cache.move_to_end(key)
+            return specs, result
+
+        self.misses += 1
+        t0 = time.perf_counter()
+        columns = compute(close, specs)
+        start = range_start(range_value)
+        bars = range_bars(range_value)
+        first = 0
+        if bars is not None:
+            first = max(0, len(ts) - bars)
+        elif start is not None:
+            first = int(np.searchsorted(ts, np.datetime64(start, 's')))
+        result = IndicatorResult(
+            ts=ts[first:],
+            columns={name: values[first:] for name, values in columns.items()},
+            last_bar=ts[-1] if len(ts) else None,
+            provider=hist.attrs.get('provider'),
+        )
+        self.compute_ms += (time.perf_counter() - t0) * 1000
+
+        self._cache[key] = result
+        while len(self._cache) > self.max_entries:
+            self._cache.popitem(last=False)
+        return specs, result
+
+    def stats(self) -> Dict:
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self._cache),
+            'max_entries': self.max_entries,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups, 3) if lookups else None,
+            'compute_ms_total': round(self.compute_ms, 2),
+        }
+
+
+# Singleton instance
+indicator_service = IndicatorService(settings.INDICATOR_CACHE_MAX_ENTRIES)
@@ -0,0 +1,196 @@
+"""
+Intraday Bars - 1m/5m/15m OHLCV bars per symbol in fixed-size NumPy ring buffers
+"""
+from typing import Any, Dict, Iterable, List, Optional
+import numpy as np
+import pandas as pd
+from config import settings
+from services.market_data import MarketSnapshot, market_refresher
+from services.trade_stream import trade_stream
+from services.universe import display_symbol
+
+# Bar interval -> seconds, finest first
+INTRADAY_INTERVALS = {'1m': 60, '5m': 300, '15m': 900}
+
+# Snapshot dataset whose quotes feed the bars (index items carry no timestamp)
+_QUOTE_DATASET = 'stocks'
+
+_PRICE_FIELDS = ('open', 'high', 'low', 'close', 'volume')
+
+
+class IntradayBars:
+    """
+    Builds intraday OHLCV bars incrementally from quotes and trades.
+
+    Every symbol owns one slot in (interval, slot, bar) arrays; each
+    interval keeps the newest `bars` bars in a ring, so memory is fixed by
+    the slot count and never grows with uptime. A tick updates the current
+    bar of each interval in place, or advances the ring head and starts a
+    new bar, and allocates no arrays. Ticks older than the current 1m bar
+    are dropped.
+
+    Symbols receiving trades ignore snapshot quotes, which only repeat
+    what the trades already carried at a coarser step.
+    """
+
+    def __init__(self, bars: int, max_symbols: int, capacity: int = 64):
+        self.bars = bars
+        self.max_symbols = max_symbols
+        self._seconds = list(INTRADAY_INTERVALS.values())
+        self._slots: Dict[str, int] = {}
+        self._allocate(min(capacity, max_symbols))
+
+        # Counters
+        self.ticks = 0
+        self.late = 0
+        self.rejected = 0
+
+    def _allocate(self, capacity: int):
+        shape = (len(self._seconds), capacity, self.bars)
+        self.start = np.zeros(shape, dtype=np.int64)
+        for field in _PRICE_FIELDS:
+            setattr(self, field, np.zeros(shape, dtype=np.float64))
+        self.head = np.zeros(shape[:2], dtype=np.int64)
+        self.count = np.zeros(shape[:2], dtype=np.int64)
+        self.last_ts = np.zeros(capacity, dtype=np.int64)
+        self.day_volume = np.zeros(capacity, dtype=np.float64)
+        self.traded = np.zeros(capacity, dtype=bool)
+
+    def _grow(self):
+        old = {attr: getattr(self, attr) for attr in
+               ('start', 'head', 'count', 'last_ts', 'day_volume', 'traded') + _PRICE_FIELDS}
+        capacity = min(len(self.last_ts) * 2, self.max_symbols)
+        self._allocate(capacity)
+        for attr, values in old.items():
+            if values.ndim == 1:
+                getattr(self, attr)[:len(values)] = values
+            else:
+                getattr(self, attr)[:, :values.shape[1]] = values
+
+    def slot(self, symbol: str) -> Optional[int]:
+        """Slot index for a symbol, allocating one on first use; None when full"""
+        idx = self._slots.get(symbol)
+        if idx is None:
+            idx = len(self._slots)
+            if idx >= self.max_symbols:
+                self.rejected += 1
+                return None
+            if idx >= len(self.last_ts):
+                self._grow()
+            self._slots[symbol] = idx
+        return idx
+
+    def apply(self, symbol: str, price: float, volume: float, ts_ms: int, traded: bool = False):
+        """Fold one tick into every interval's current bar"""
+        idx = self.slot(display_symbol(symbol.upper()))
+        if idx is None or price <= 0:
+            return
+        if traded:
+            self.traded[idx] = True
+        ts = ts_ms // 1000
+        head = self.head[0, idx]
+        if self.count[0, idx] and ts < self.start[0, idx, head]:
+            self.late += 1
+            return
+        for k, seconds in enumerate(self._seconds):
+            bucket = ts - ts % seconds
+            head = self.head[k, idx]
+            if self.count[k, idx] and bucket == self.start[k, idx, head]:
+                if price > self.high[k, idx, head]:
+                    self.high[k, idx, head] = price
+                if price < self.low[k, idx, head]:
+                    self.low[k, idx, head] = price
+                self.close[k, idx, head] = price
+                self.volume[k, idx, head] += volume
+                continue
+            if self.count[k, idx]:
+                head = (head + 1) % self.bars
+                self.head[k, idx] = head
+            if self.count[k, idx] < self.bars:
+                self.count[k, idx] += 1
+            self.start[k, idx, head] = bucket
+            self.open[k, idx, head] = price
+            self.high[k, idx, head] = price
+            self.low[k, idx, head] = price
+            self.close[k, idx, head] = price
+            self.volume[k, idx, head] = volume
+        if ts_ms > self.last_ts[idx]:
+            self.last_ts[idx] = ts_ms
+        self.ticks += 1
+
+    def apply_trades(self, trades: Iterable[Dict[str, Any]]):
+        """Trade stream listener: a Finnhub `trade` message's data list"""
+        for trade in trades:
+            self.apply(trade['s'], float(trade['p']), float(trade.get('v') or 0), int(trade['t']), traded=True)
+
+    def on_snapshot(self, snapshot: MarketSnapshot):
+        """
+        Refresher listener: fold refreshed quotes
+
+        Quotes whose timestamp has not moved (closed markets, unchanged
+        shards) are skipped. Cumulative day volume, where a quote has it,
+        is turned into the volume traded since the previous quote.
+        """
+        if snapshot.name != _QUOTE_DATASET:
+            return
+        for item in snapshot.payload.get('stocks') or []:
+            price, ts = item.get('price'), item.get('timestamp')
+            if not price or not ts:
+                continue
+            idx = self.slot(display_symbol(item['symbol'].upper()))
+            if idx is None or self.traded[idx] or ts * 1000 <= self.last_ts[idx]:
+                continue
+            volume = 0.0
+            day_volume = item.get('volume')
+            if day_volume is not None:
+                # A smaller cumulative volume means a new session started
+                previous = self.day_volume[idx]
+                volume = day_volume - previous if day_volume >= previous else day_volume
+                self.day_volume[idx] = day_volume
+            self.apply(item['symbol'], float(price), volume, int(ts) * 1000)
+
+    def frame(self, symbol: str, interval: str, limit: Optional[int] = None) -> Optional[pd.DataFrame]:
+        """
+        The newest `limit` bars, oldest first, as an OHLCV frame (UTC index)
+
+        None for a symbol that has never ticked.
+
+        Raises:
+            ValueError: Unknown interval
+        """
+        if interval not in INTRADAY_INTERVALS:
+            raise ValueError(f"Unsupported interval: {interval}. Use one of: {', '.join(INTRADAY_INTERVALS)}")
+        idx = self._slots.get(display_symbol(symbol.upper()))
+        if idx is None:
+            return None
+        k = list(INTRADAY_INTERVALS).index(interval)
+        take = int(self.count[k, idx]) if limit is None else min(int(self.count[k, idx]), limit)
+        positions = (self.head[k, idx] - take + 1 + np.arange(take)) % self.bars
+        index = pd.DatetimeIndex(self.start[k, idx, positions].astype('datetime64[s]'), name='Date').tz_localize('UTC')
+        return pd.DataFrame(
+            {field.capitalize(): getattr(self, field)[k, idx, positions] for field in _PRICE_FIELDS},
+            index=index,
+        )
+
+    @property
+    def symbols(self) -> List[str]:
+        return list(self._slots)
+
+    def stats(self) -> Dict[str, Any]:
+        arrays = ('start', 'head', 'count', 'last_ts', 'day_volume', 'traded') + _PRICE_FIELDS
+        return {
+            'symbols': len(self._slots),
+            'max_symbols': self.max_symbols,
+            'bars_per_interval': self.bars,
+            'intervals': list(INTRADAY_INTERVALS),
+            'ticks': self.ticks,
+            'late': self.late,
+            'rejected': self.rejected,
+            'bytes': sum(getattr(self, attr).nbytes for attr in arrays),
+        }
+
+
+# Singleton instance
+intraday_bars = IntradayBars(settings.INTRADAY_BARS_PER_INTERVAL, settings.INTRADAY_MAX_SYMBOLS)
+market_refresher.add_listener(intraday_bars.on_snapshot)
+trade_stream.add_listener(intraday_bars.apply_trades)
@@ -0,0 +1,267 @@
+"""
+Market Data Service - Background refresher that keeps quote snapshots in memory
+"""
+import asyncio
+import hashlib
+import secrets
+import time
+from dataclasses import dataclass, field, replace
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+from config import settings
+from config.logging_config import logger
+from services.exchange_calendar import CLOSED, OPEN, combined_phase, seconds_until_change
+from utils.encoding import dumps_json
+from utils.rate_limiter import Priority, current_priority
+
+
+@dataclass(frozen=True)
+class MarketSnapshot:
+    """
+    Last good payload for one dataset.
+
+    Snapshots are replaced wholesale on refresh and never mutated after
+    they are published, so readers can hand them out without locking.
+    The version only moves when the content digest changes, so it can
+    back HTTP validators. Versions restart at 1 with every process, so
+    clients resume from `token` ("epoch:version"), which also names the
+    process that numbered them.
+    """
+    name: str
+    payload: Dict[str, Any]
+    fetched_at: float
+    version: int
+    failed_refreshes: int = 0
+    last_error: Optional[str] = None
+    digest: str = ''
+    epoch: str = ''
+
+    @property
+    def token(self) -> str:
+        return f"{self.epoch}:{self.version}"
+
+    def age(self) -> float:
+        """Seconds since the payload was fetched"""
+        return time.time() - self.fetched_at
+
+    def response(self, stale_after: float) -> Dict[str, Any]:
+        """Payload plus freshness metadata, ready to return from a route"""
+        age = self.age()
+        return {
+            **self.payload,
+            'snapshotAge': round(age, 3),
+            'snapshotVersion': self.version,
+            'snapshotToken': self.token,
+            'stale': self.failed_refreshes > 0 or age > stale_after,
+        }
+
+
+def payload_digest(payload: Dict[str, Any], volatile: Tuple[str, ...] = ()) -> str:
+    """Content hash of a payload, ignoring keys that change on every load"""
+    content = {k: v for k, v in payload.items() if k not in volatile}
+    return hashlib.blake2b(dumps_json(content), digest_size=16).hexdigest()
+
+
+@dataclass
+class _Dataset:
+    loader: Callable[[], Awaitable[Dict[str, Any]]]
+    volatile: Tuple[str, ...] = ()
+    exchanges: Tuple[str, ...] = ()
+    snapshot: Optional[MarketSnapshot] = None
+    interval: float = 0.0
+    next_due: float = 0.0
+    refreshes: int = 0
+    unchanged: int = 0
+    errors: int = 0
+    last_refresh_ms: float = 0.0
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+
+
+class MarketDataRefresher:
+    """
+    Refreshes registered datasets on a schedule in a background task.
+
+    Routes read `snapshot(name)` in O(1) instead of calling upstream. When a
+    refresh fails the last good snapshot stays in place and is marked stale.
+
+    Datasets tied to exchanges are paced by the exchange calendar: every
+    `interval_seconds` while a regular session is open, every
+    `extended_interval_seconds` in pre/post-market and every
+    `closed_interval_seconds` otherwise, waking early for the next session.
+    """
+
+    def __init__(self, interval_seconds: float, extended_interval_seconds: float,
+                 closed_interval_seconds: float, calendar_pacing: bool = True):
+        self.interval_seconds = interval_seconds
+        self.extended_interval_seconds = extended_interval_seconds
+        self.closed_interval_seconds = closed_interval_seconds
+        self.calendar_pacing = calendar_pacing
+        self._datasets: Dict[str, _Dataset] = {}
+        self._listeners: List[Callable[[MarketSnapshot], None]] = []
+        self._task: Optional[asyncio.Task] = None
+        # Tells this process's snapshot versions apart from a previous run's
+        self.epoch = secrets.token_hex(4)
+
+    @property
+    def stale_after(self) -> float:
+        """Age beyond which a snapshot is reported stale even without errors"""
+        return self.interval_seconds * 3
+
+    def stale_limit(self, name: str) -> float:
+        """Stale threshold for one dataset: three of its current refresh intervals"""
+        dataset = self._datasets.get(name)
+        if dataset is None or not dataset.interval:
+            return self.stale_after
+        return dataset.interval * 3
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def register(self, name: str, loader: Callable[[], Awaitable[Dict[str, Any]]],
+                 volatile: Tuple[str, ...] = (), exchanges: Tuple[str, ...] = ()):
+        """
+        Add a dataset refreshed by `loader` on every cycle
+
+        Keys in `volatile` (e.g. a load timestamp) are left out when deciding
+        whether a refresh changed anything. `exchanges` (calendar names) set
+        the pace; without them the dataset refreshes every interval.
+        """
+        self._datasets[name] = _Dataset(loader=loader, volatile=volatile, exchanges=tuple(exchanges))
+
+    def interval_for(self, name: str, now: Optional[datetime] = None) -> float:
+        """Seconds until the dataset's next refresh, given its exchanges' session phase"""
+        dataset = self._datasets[name]
+        if not self.calendar_pacing or not dataset.exchanges:
+            return self.interval_seconds
+        phase = combined_phase(dataset.exchanges, now)
+        if phase == OPEN:
+            return self.interval_seconds
+        slow = self.closed_interval_seconds if phase == CLOSED else self.extended_interval_seconds
+        # Never sleep through the start of the next phase
+        return max(self.interval_seconds, min(slow, seconds_until_change(dataset.exchanges, now)))
+
+    def add_listener(self, listener: Callable[[MarketSnapshot], None]):
+        """Call `listener(snapshot)` after every successful refresh"""
+        self._listeners.append(listener)
+
+    def snapshot(self, name: str) -> Optional[MarketSnapshot]:
+        """Current snapshot for a dataset, or None before the first good refresh"""
+        dataset = self._datasets.get(name)
+        return dataset.snapshot if dataset else None
+
+    async def refresh(self, name: str):
+        """Refresh one dataset, keeping the previous snapshot on failure"""
+        dataset = self._datasets[name]
+        async with dataset.lock:
+            start = time.perf_counter()
+            previous = dataset.snapshot
+            try:
+                payload = await dataset.loader()
+                digest = payload_digest(payload, dataset.volatile)
+                dataset.refreshes += 1
+                if previous is not None and previous.digest == digest:
+                    # Nothing moved: same version and body, fresh age, no listeners
+                    dataset.snapshot = replace(previous, fetched_at=time.time(),
+                                               failed_refreshes=0, last_error=None)
+                    dataset.unchanged += 1
+                    return
+                dataset.snapshot = MarketSnapshot(
+                    name=name,
+                    payload=payload,
+                    fetched_at=time.time(),
+                    version=(previous.version + 1) if previous else 1,
+                    digest=digest,
+                    epoch=self.epoch,
+                )
+            except Exception as e:
+                dataset.errors += 1
+                error = getattr(e, 'detail', None) or str(e)
+                logger.warning(f"Market refresh '{name}' failed, serving last good snapshot: {error}")
+                if previous is not None:
+                    dataset.snapshot = replace(
+                        previous,
+                        failed_refreshes=previous.failed_refreshes + 1,
+                        last_error=error,
+                    )
+                return
+            finally:
+                dataset.last_refresh_ms = (time.perf_counter() - start) * 1000
+
+        for listener in self._listeners:
+            try:
+                listener(dataset.snapshot)
+            except Exception as e:
+                logger.error(f"Market snapshot listener failed for '{name}': {e}")
+
+    async def refresh_all(self):
+        """Refresh every registered dataset concurrently"""
+        await asyncio.gather(*(self.refresh(name) for name in self._datasets))
+
+    async def _run(self):
+        # Scheduled refreshes queue behind interactive upstream calls
+        current_priority.set(Priority.BACKGROUND)
+        logger.info(f"📈 Market data refresher started (interval={self.interval_seconds}s)")
+        while True:
+            due = [name for name, d in self._datasets.items() if d.next_due <= time.monotonic()]
+            try:
+                await asyncio.gather(*(self.refresh(name) for name in due))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Market refresher cycle failed: {e}")
+            for name in due:
+                dataset = self._datasets[name]
+                dataset.interval = self.interval_for(name)
+                dataset.next_due = time.monotonic() + dataset.interval
+            wake = min((d.next_due for d in self._datasets.values()),
+                       default=time.monotonic() + self.interval_seconds)
+            await asyncio.sleep(max(0.0, wake - time.monotonic()))
+
+    def start(self):
+        """Start the background refresh task on the running loop"""
+        if not self.running:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Cancel the background task and wait for it to exit"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+            logger.info("🧹 Stopped market data refresher")
+
+    def stats(self) -> Dict[str, Any]:
+        """Refresh counters and snapshot ages per dataset"""
+        datasets = []
+        for name, dataset in self._datasets.items():
+            snap = dataset.snapshot
+            datasets.append({
+                'name': name,
+                'exchanges': list(dataset.exchanges),
+                'interval_seconds': dataset.interval or self.interval_seconds,
+                'refreshes': dataset.refreshes,
+                'unchanged': dataset.unchanged,
+                'errors': dataset.errors,
+                'last_refresh_ms': round(dataset.last_refresh_ms, 2),
+                'version': snap.version if snap else None,
+                'age_seconds': round(snap.age(), 3) if snap else None,
+                'stale': (snap.failed_refreshes > 0 or snap.age() > self.stale_limit(name)) if snap else None,
+            })
+        return {
+            'running': self.running,
+            'interval_seconds': self.interval_seconds,
+            'datasets': datasets,
+        }
+
+
+# Singleton instance
+market_refresher = MarketDataRefresher(
+    settings.MARKET_REFRESH_INTERVAL_SECONDS,
+    settings.MARKET_REFRESH_EXTENDED_INTERVAL_SECONDS,
+    settings.MARKET_REFRESH_CLOSED_INTERVAL_SECONDS,
+    settings.MARKET_REFRESH_CALENDAR_PACING,
+)
@@ -0,0 +1,429 @@
+"""
+Market Providers - One interface over FinanceHub, Finnhub, yfinance and the local candle store,
+with per-provider circuit breakers, hedged requests and latency stats
+"""
+import asyncio
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import pandas as pd
+from config import settings
+from config.logging_config import logger
+from services.candle_store import STORE_INTERVALS, candle_store, range_bars, range_start
+from services.history_service import history_service
+from utils.circuit_breaker import CircuitBreaker, LatencyTracker
+from utils.http_client import get_http_client
+from utils.rate_limiter import finnhub_limiter, RateLimitExceeded, UpstreamThrottled
+
+FINNHUB_BASE_URL = 'https://finnhub.io/api/v1'
+FINANCEHUB_BASE_URL = 'https://api.financehub.example/v1'
+
+OPERATIONS = ('quote', 'history', 'history_batch')
+
+
+class ProviderError(Exception):
+    """A provider could not answer"""
+
+
+class NoData(ProviderError):
+    """The provider is healthy but has nothing for this symbol/window"""
+
+
+class CircuitOpen(ProviderError):
+    """Skipped because the provider's breaker is open"""
+
+
+class ProvidersExhausted(ProviderError):
+    """Every provider for an operation failed; `errors` maps provider name -> exception"""
+
+    def __init__(self, operation: str, errors: Dict[str, BaseException]):
+        detail = ', '.join(f"{name}: {e.__class__.__name__}" for name, e in errors.items()) or 'none configured'
+        super().__init__(f"No provider could serve {operation} ({detail})")
+        self.operation = operation
+        self.errors = errors
+
+    def find(self, *types) -> Optional[BaseException]:
+        return next((e for e in self.errors.values() if isinstance(e, types)), None)
+
+    @property
+    def no_data(self) -> bool:
+        """True when every provider that answered had no data (rather than failing)"""
+        answered = [e for e in self.errors.values() if not isinstance(e, CircuitOpen)]
+        return bool(answered) and all(isinstance(e, NoData) for e in answered)
+
+
+def quote_from_history(hist: pd.DataFrame) -> Dict[str, Any]:
+    """Quote fields from the last two daily bars of a history frame"""
+    if hist is None or hist.empty:
+        raise NoData("empty history")
+    last = hist.iloc[-1]
+    previous_close = float(hist['Close'].iloc[-2]) if len(hist) > 1 else float(last['Open'])
+    bar_time = hist.index[-1]
+    bar_date = bar_time.date()
+    today = datetime.now(bar_time.tzinfo or timezone.utc).date()
+    return {
+        'price': float(last['Close']),
+        'previousClose': previous_close,
+        'open': float(last['Open']),
+        'high': float(last['High']),
+        'low': float(last['Low']),
+        'timestamp': int(bar_time.timestamp()),
+        # A daily bar dated today means the session has traded
+        'isMarketOpen': bar_date == today,
+    }
+
+
+class MarketDataProvider:
+    """
+    Base class: subclasses implement any of quote/history/history_batch.
+
+    quote(symbol) -> {price, previousClose, open, high, low, timestamp, isMarketOpen}
+    history(symbol, period, interval) -> yfinance-shaped OHLCV frame
+    history_batch(symbols, period, interval) -> (frames by symbol, errors by symbol)
+    """
+
+    name = 'base'
+
+    def __init__(self):
+        self.breaker = CircuitBreaker(
+            self.name, settings.PROVIDER_BREAKER_FAILURES, settings.PROVIDER_BREAKER_RESET_SECONDS
+        )
+        self.latency = LatencyTracker()
+
+        # Counters
+        self.calls = 0
+        self.successes = 0
+        self.failures = 0
+        self.timeouts = 0
+        self.no_data = 0
+        self.throttled = 0
+        self.cancelled = 0
+
+    def available(self) -> bool:
+        """False when the provider is not configured (e.g. missing API key)"""
+        return True
+
+    async def reserve(self, operation: str):
+        """Wait for upstream quota before a call; runs outside the router's timeout"""
+
+    def supports(self, operation: str) -> bool:
+        return getattr(type(self), operation, None) is not getattr(MarketDataProvider, operation, None)
+
+    async def quote(self, symbol: str) -> Dict[str, Any]:
+        raise NotImplementedError
+
+    async def history(self, symbol: str, period: str, interval: str) -> pd.DataFrame:
+        raise NotImplementedError
+
+    async def history_batch(self, symbols: List[str], period: str,
+                            interval: str) -> Tuple[Dict[str, pd.DataFrame], Dict[str, str]]:
+        raise NotImplementedError
+
+    def hedge_delay(self) -> float:
+        """Seconds to wait on this provider before hedging: its p95, once known"""
+        if len(self.latency) < settings.PROVIDER_HEDGE_MIN_SAMPLES:
+            delay_ms = settings.PROVIDER_HEDGE_DEFAULT_MS
+        else:
+            delay_ms = self.latency.percentile(95)
+        return max(delay_ms, settings.PROVIDER_HEDGE_MIN_MS) / 1000.0
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'available': self.available(),
+            'operations': [op for op in OPERATIONS if self.supports(op)],
+            'calls': self.calls,
+            'successes': self.successes,
+            'failures': self.failures,
+            'timeouts': self.timeouts,
+            'no_data': self.no_data,
+            'throttled': self.throttled,
+            'cancelled': self.cancelled,
+            'error_rate': round((self.failures + self.timeouts) / self.calls, 4) if self.calls else 0.0,
+            'latency': self.latency.stats(),
+            'breaker': self.breaker.stats(),
+        }
+
+
+class FinanceHubProvider(MarketDataProvider):
+    name = 'financehub'
+
+    def available(self) -> bool:
+        return bool(settings.FINANCEHUB_API_KEY)
+
+    async def history(self, symbol: str, period: str, interval: str) -> pd.DataFrame:
+        response = await get_http_client().get(
+            f"{FINANCEHUB_BASE_URL}/market/quotes",
+            params={'symbol': symbol, 'range': period},
+            headers={'Authorization': f"Bearer {settings.FINANCEHUB_API_KEY}"},
+        )
+        if response.status_code != 200:
+            raise ProviderError(f"FinanceHub HTTP {response.status_code}")
+        try:
+            candles = response.json().get('candles') or []
+            frame = pd.DataFrame(candles)
+            if frame.empty:
+                raise NoData(f"FinanceHub has no candles for {symbol}")
+            frame.index = pd.DatetimeIndex(pd.to_datetime(frame['ts'], utc=True), name='Date')
+            frame = frame.rename(columns=str.capitalize)[['Open', 'High', 'Low', 'Close', 'Volume']]
+        except NoData:
+            raise
+        except Exception as e:
+            raise ProviderError(f"Unexpected FinanceHub payload: {e}") from e
+        return frame.astype('f8')
+
+
+class FinnhubProvider(MarketDataProvider):
+    name = 'finnhub'
+
+    def available(self) -> bool:
+        return bool(settings.FINANCEHUB_API_KEY)
+
+    async def reserve(self, operation: str):
+        # Queued behind the shared quota with the caller's priority and deadline
+        await finnhub_limiter.acquire()
+
+    async def quote(self, symbol: str) -> Dict[str, Any]:
+        response = await finnhub_limiter.send(
+            get_http_client(),
+            f"{FINNHUB_BASE_URL}/quote",
+            params={'symbol': symbol, 'token': settings.FINANCEHUB_API_KEY}
+        )
+        if response.status_code != 200:
+            raise ProviderError(f"Finnhub HTTP {response.status_code}")
+        try:
+            data = response.json()
+        except Exception as e:
+            raise ProviderError(f"Unexpected Finnhub payload: {e}") from e
+        current = data.get('c') or 0
+        prev_close = data.get('pc') or 0
+        if not current and not prev_close:
+            # Finnhub answers unknown/unsupported symbols with all zeros
+            raise NoData(f"Finnhub has no quote for {symbol}")
+        return {
+            'price': current if current else prev_close,
+            'previousClose': prev_close,
+            'open': data.get('o') or 0,
+            'high': data.get('h') or 0,
+            'low': data.get('l') or 0,
+            'timestamp': data.get('t') or 0,
+            'isMarketOpen': current > 0,
+        }
+
+
+class YFinanceProvider(MarketDataProvider):
+    name = 'yfinance'
+
+    async def quote(self, symbol: str) -> Dict[str, Any]:
+        return quote_from_history(await history_service.get_history(symbol, period='5d', interval='1d'))
+
+    async def history(self, symbol: str, period: str, interval: str) -> pd.DataFrame:
+        frame = await history_service.get_history(symbol, period=period, interval=interval)
+        if frame.empty:
+            raise NoData(f"yfinance has no {interval} bars for {symbol}")
+        return frame
+
+    async def history_batch(self, symbols: List[str], period: str,
+                            interval: str) -> Tuple[Dict[str, pd.DataFrame], Dict[str, str]]:
+        return await history_service.get_history_batch(symbols, period=period, interval=interval)
+
+
+class LocalFileProvider(MarketDataProvider):
+    """Last resort: whatever the candle store already has on disk, no network"""
+
+    name = 'local'
+
+    async def _read(self, symbol: str, period: str, interval: str) -> pd.DataFrame:
+        if interval not in STORE_INTERVALS:
+            raise NoData(f"{interval} bars are not kept on disk")
+        start = range_start(period)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            None, lambda: candle_store.read_cached(symbol, interval, start, last=range_bars(period))
+        )
+
+    async def quote(self, symbol: str) -> Dict[str, Any]:
+        return quote_from_history(await self._read(symbol, '5d', '1d'))
+
+    async def history(self, symbol: str, period: str, interval: str) -> pd.DataFrame:
+        frame = await self._read(symbol, period, interval)
+        if frame.empty:
+            raise NoData(f"No stored {interval} bars for {symbol}")
+        return frame
+
+    async def history_batch(self, symbols: List[str], period: str,
+                            interval: str) -> Tuple[Dict[str, pd.DataFrame], Dict[str, str]]:
+        frames: Dict[str, pd.DataFrame] = {}
+        errors: Dict[str, str] = {}
+        for symbol in symbols:
+            frame = await self._read(symbol, period, interval)
+            if frame.empty:
+                errors[symbol] = "No data found"
+            else:
+                frames[symbol] = frame
+        if not frames:
+            raise NoData("No stored bars for any requested symbol")
+        return frames, errors
+
+
+class MarketDataRouter:
+    """
+    Sends each call to the first healthy provider in a configured order.
+
+    If the primary has not answered within its own p95 latency, the next
+    provider is started in parallel (one hedge per call) and whichever
+    succeeds first wins; the loser is cancelled. Failures and timeouts feed
+    the provider's circuit breaker, and open circuits are skipped until
+    their reset period ends. Waiting for a provider's rate limit quota is
+    not timed, so a busy quota never trips the breaker. "No data" answers fail over without counting
+    against the provider.
+    """
+
+    def __init__(self, providers: Sequence[MarketDataProvider], quote_order: List[str],
+                 history_order: List[str], timeout_seconds: float, hedge_enabled: bool):
+        self.providers = {p.name: p for p in providers}
+        self.orders = {
+            'quote': quote_order,
+            'history': history_order,
+            'history_batch': history_order,
+        }
+        self.timeout_seconds = timeout_seconds
+        self.hedge_enabled = hedge_enabled
+
+        # Counters
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.exhausted = 0
+
+    async def quote(self, symbol: str, providers: Optional[Sequence[str]] = None) -> Dict[str, Any]:
+        """Quote fields plus the name of the provider that served them"""
+        quote, provider = await self._call('quote', providers, symbol)
+        return {**quote, 'provider': provider}
+
+    async def history(self, symbol: str, period: str, interval: str,
+                      providers: Optional[Sequence[str]] = None) -> pd.DataFrame:
+        """OHLCV frame; frame.attrs['provider'] names the source"""
+        frame, provider = await self._call('history', providers, symbol, period, interval)
+        frame.attrs['provider'] = provider
+        return frame
+
+    async def history_batch(self, symbols: List[str], period: str, interval: str,
+                            providers: Optional[Sequence[str]] = None
+                            ) -> Tuple[Dict[str, pd.DataFrame], Dict[str, str]]:
+        (frames, errors), _ = await self._call('history_batch', providers, symbols, period, interval)
+        return frames, errors
+
+    async def _attempt(self, provider: MarketDataProvider, operation: str, args: tuple):
+        provider.calls += 1
+        start = time.perf_counter()
+        try:
+            # A quota wait is neither latency nor a timeout: the limiter has its own deadline
+            await provider.reserve(operation)
+            start = time.perf_counter()
+            result = await asyncio.wait_for(getattr(provider, operation)(*args), self.timeout_seconds)
+        except asyncio.CancelledError:
+            # Lost a hedge race (or the client went away): no verdict on the provider
+            provider.cancelled += 1
+            provider.breaker.release()
+            raise
+        except asyncio.TimeoutError:
+            provider.timeouts += 1
+            provider.breaker.record_failure()
+            raise
+        except NoData:
+            provider.no_data += 1
+            provider.latency.add((time.perf_counter() - start) * 1000)
+            provider.breaker.record_success()
+            raise
+        except (RateLimitExceeded, UpstreamThrottled):
+            # Quota, not health: the limiter already backs off
+            provider.throttled += 1
+            provider.breaker.release()
+            raise
+        except ValueError:
+            provider.breaker.release()
+            raise
+        except Exception as e:
+            provider.failures += 1
+            provider.breaker.record_failure()
+            logger.warning(f"Provider {provider.name} {operation} failed: {e}")
+            raise
+        provider.successes += 1
+        provider.latency.add((time.perf_counter() - start) * 1000)
+        provider.breaker.record_success()
+        return result
+
+    def _candidates(self, operation: str, names: Optional[Sequence[str]]) -> List[MarketDataProvider]:
+        names = names or self.orders[operation]
+        return [
+            self.providers[name] for name in names
+            if name in self.providers
+            and self.providers[name].supports(operation)
+            and self.providers[name].available()
+        ]
+
+    async def _call(self, operation: str, names: Optional[Sequence[str]], *args):
+        queue = self._candidates(operation, names)
+        errors: Dict[str, BaseException] = {}
+        running: Dict[asyncio.Future, MarketDataProvider] = {}
+        hedged = False
+
+        def launch() -> Optional[MarketDataProvider]:
+            while queue:
+                provider = queue.pop(0)
+                if provider.breaker.allow():
+                    running[asyncio.ensure_future(self._attempt(provider, operation, args))] = provider
+                    return provider
+                errors[provider.name] = CircuitOpen(f"{provider.name} circuit open")
+            return None
+
+        primary = launch()
+        try:
+            while running:
+                delay = None
+                if self.hedge_enabled and not hedged and queue and len(running) == 1:
+                    delay = primary.hedge_delay()
+                done, _ = await asyncio.wait(running, timeout=delay, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    hedged = True
+                    if launch() is not None:
+                        self.hedges += 1
+                    continue
+                for task in done:
+                    provider = running.pop(task)
+                    error = task.exception()
+                    if error is None:
+                        if hedged and provider is not primary:
+                            self.hedge_wins += 1
+                        return task.result(), provider.name
+                    if isinstance(error, ValueError):
+                        # Bad request (e.g. unknown range); no provider will do better
+                        raise error
+                    errors[provider.name] = error
+                if not running:
+                    primary = launch()
+        finally:
+            for task in running:
+                task.cancel()
+        self.exhausted += 1
+        raise ProvidersExhausted(operation, errors)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'orders': self.orders,
+            'timeout_seconds': self.timeout_seconds,
+            'hedge_enabled': self.hedge_enabled,
+            'hedges': self.hedges,
+            'hedge_wins': self.hedge_wins,
+            'exhausted': self.exhausted,
+            'providers': {name: p.stats() for name, p in self.providers.items()},
+        }
+
+
+# Singleton instance
+provider_router = MarketDataRouter(
+    [FinanceHubProvider(), FinnhubProvider(), YFinanceProvider(), LocalFileProvider()],
+    quote_order=settings.MARKET_QUOTE_PROVIDERS,
+    history_order=settings.MARKET_HISTORY_PROVIDERS,
+    timeout_seconds=settings.PROVIDER_TIMEOUT_SECONDS,
+    hedge_enabled=settings.PROVIDER_HEDGE_ENABLED,
+)
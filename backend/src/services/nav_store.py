@@ -0,0 +1,346 @@
+"""
+NAV Store - Mutual fund NAV history from AMFI-format files, indexed for point-in-time lookup
+"""
+import asyncio
+import io
+import os
+import time
+from datetime import date
+from typing import Dict, Iterable, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+from config import settings
+from config.logging_config import logger
+from services.symbol_master import SymbolEntry, SymbolIndex, _trigrams, normalize
+
+NAV_EXTENSIONS = ('.txt', '.csv')
+
+# Key layout: scheme rank in the high bits, days since 1970-01-01 in the low 20 (good to year 4840)
+_DAY_BITS = 20
+_DAY_MASK = (1 << _DAY_BITS) - 1
+
+# Header spellings across NAVAll.txt and the NAV history report
+_CODE_COLUMN = 'scheme code'
+_NAME_COLUMN = 'scheme name'
+_NAV_COLUMN = 'net asset value'
+_DATE_COLUMN = 'date'
+_ISIN_PREFIXES = ('isin div payout', 'isin growth')
+
+# Placeholders AMFI writes for a missing NAV or ISIN
+_MISSING = ['N.A.', 'N.A', 'NA', '-']
+
+# Trigram overlap a fuzzy scheme-name match needs before it is trusted for valuation
+MIN_RESOLVE_SIMILARITY = 0.6
+
+# A name is only resolved as a fund when it has one of these words ("HDFC Bank" is a share)
+FUND_NAME_WORDS = frozenset({
+    'fund', 'plan', 'scheme', 'direct', 'regular', 'growth', 'idcw', 'dividend', 'payout',
+    'reinvestment', 'bonus', 'etf', 'fof', 'index', 'elss',
+})
+
+
+def parse_nav_file(text: str) -> pd.DataFrame:
+    """
+    Rows of one AMFI file as a (code, name, isin, nav, date) frame
+
+    Handles NAVAll.txt (daily, all schemes) and the NAV history report
+    (Scheme Code;Scheme Name;...;Net Asset Value;Repurchase Price;Sale
+    Price;Date). Fund-house and category section lines, blank lines and
+    rows whose NAV is "N.A." are skipped. The semicolon split and the
+    date/number conversion run in pandas, not per row in Python.
+    """
+    lines = text.splitlines()
+    header = next((line for line in lines if line.lower().startswith(_CODE_COLUMN)), None)
+    if header is None:
+        return pd.DataFrame(columns=['code', 'name', 'isin', 'nav', 'date'])
+    columns = [c.strip().lower() for c in header.split(';')]
+    rows = [line for line in lines if line[:1].isdigit() and ';' in line]
+
+    # Numbers are parsed by the C reader itself; only text columns stay objects
+    isin_column = next((c for c in columns if c.startswith(_ISIN_PREFIXES)), None)
+    text_columns = {c: object for c in (_NAME_COLUMN, isin_column, _DATE_COLUMN) if c}
+    frame = pd.read_csv(io.StringIO('\n'.join(rows)), sep=';', header=None, names=columns,
+                        dtype=text_columns, na_values=_MISSING, usecols=range(len(columns)),
+                        on_bad_lines='skip', engine='c')
+    out = pd.DataFrame({
+        'code': pd.to_numeric(frame[_CODE_COLUMN], errors='coerce'),
+        # Names and ISINs repeat on every history row; NavIndex strips the one it keeps
+        'name': frame[_NAME_COLUMN],
+        'isin': frame[isin_column] if isin_column else None,
+        'nav': pd.to_numeric(frame[_NAV_COLUMN], errors='coerce'),
+        'date': pd.to_datetime(frame[_DATE_COLUMN], format='%d-%b-%Y', errors='coerce', cache=True),
+    })
+    return out.dropna(subset=['code', 'nav', 'date'])
+
+
+class NavIndex:
+    """
+    Immutable NAV history for every scheme, in two flat arrays.
+
+    Rows are sorted by (scheme, date) and addressed by one int64 key per
+    row (scheme rank << 20 | day), so a scheme's history is a contiguous
+    slice and a point-in-time lookup is a single binary search over the
+    keys: O(log n) for one scheme, one vectorised searchsorted for many.
+    At 16 bytes per NAV, ten million history rows take 160 MB.
+    """
+
+    def __init__(self, frame: pd.DataFrame):
+        codes = frame['code'].to_numpy(dtype='i8')
+        days = frame['date'].to_numpy(dtype='datetime64[D]').astype('i8')
+        navs = frame['nav'].to_numpy(dtype='f8')
+        self.codes = np.unique(codes)
+        keys = (np.searchsorted(self.codes, codes) << _DAY_BITS) | days
+
+        # Stable sort, keeping the last loaded row of a duplicated (scheme, date)
+        order = np.argsort(keys, kind='stable')
+        keys = keys[order]
+        last = np.ones(len(keys), dtype=bool)
+        last[:-1] = keys[:-1] != keys[1:]
+        self.keys = keys[last]
+        self.navs = navs[order][last]
+
+        ranks = self.keys >> _DAY_BITS
+        self.starts = np.searchsorted(ranks, np.arange(len(self.codes)))
+        ends = np.append(self.starts[1:], len(self.keys))
+        # Names and ISINs as of each scheme's newest row
+        newest = order[last][ends - 1] if len(self.keys) else np.zeros(0, dtype='i8')
+        self.names: List[str] = [str(n).strip() for n in frame['name'].to_numpy()[newest].tolist()]
+        isins = [i.strip() if isinstance(i, str) else None for i in frame['isin'].to_numpy()[newest].tolist()]
+        self.isins: List[Optional[str]] = [i if i not in ('', '-') else None for i in isins]
+        self._search = SymbolIndex(
+            [SymbolEntry(str(code), name, 'AMFI', 'INR', 'MUTUALFUND')
+             for code, name in zip(self.codes.tolist(), self.names)],
+            [],
+        )
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    @property
+    def rows(self) -> int:
+        return len(self.keys)
+
+    def _rank(self, code: int) -> Optional[int]:
+        i = int(np.searchsorted(self.codes, code))
+        return i if i < len(self.codes) and self.codes[i] == code else None
+
+    def has(self, code: int) -> bool:
+        return self._rank(code) is not None
+
+    def name(self, code: int) -> Optional[str]:
+        rank = self._rank(code)
+        return self.names[rank] if rank is not None else None
+
+    def isin(self, code: int) -> Optional[str]:
+        rank = self._rank(code)
+        return self.isins[rank] if rank is not None else None
+
+    def nav(self, code: int, on: Optional[date] = None) -> Optional[Tuple[date, float]]:
+        """(NAV date, NAV) of the newest NAV on or before `on` (default: newest overall)"""
+        rank = self._rank(code)
+        if rank is None:
+            return None
+        day = _DAY_MASK if on is None else int(np.datetime64(on, 'D').astype('i8'))
+        i = int(np.searchsorted(self.keys, (rank << _DAY_BITS) | day, side='right')) - 1
+        if i < self.starts[rank]:
+            return None
+        return _day_to_date(int(self.keys[i]) & _DAY_MASK), float(self.navs[i])
+
+    def navs_at(self, codes: Iterable[int], on: Optional[date] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Vectorised nav() for many schemes: (NAV dates, NAVs)
+
+        Unknown schemes, or schemes without a NAV by `on`, get NaT / NaN.
+        """
+        codes = np.asarray(list(codes), dtype='i8')
+        if len(self.codes) == 0:
+            return np.full(len(codes), np.datetime64('NaT'), dtype='datetime64[D]'), np.full(len(codes), np.nan)
+        ranks = np.minimum(np.searchsorted(self.codes, codes), len(self.codes) - 1)
+        day = _DAY_MASK if on is None else int(np.datetime64(on, 'D').astype('i8'))
+        rows = np.searchsorted(self.keys, (ranks << _DAY_BITS) | day, side='right') - 1
+        found = (self.codes[ranks] == codes) & (rows >= self.starts[ranks])
+        rows = np.maximum(rows, 0)
+        dates = (self.keys[rows] & _DAY_MASK).astype('datetime64[D]')
+        dates[~found] = np.datetime64('NaT')
+        return dates, np.where(found, self.navs[rows], np.nan)
+
+    def history(self, code: int, start: Optional[date] = None,
+                end: Optional[date] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """(dates, NAVs) of one scheme between `start` and `end` inclusive (NAVs are a view)"""
+        rank = self._rank(code)
+        if rank is None:
+            return np.zeros(0, dtype='datetime64[D]'), np.zeros(0)
+        lo_day = 0 if start is None else int(np.datetime64(start, 'D').astype('i8'))
+        hi_day = _DAY_MASK if end is None else int(np.datetime64(end, 'D').astype('i8'))
+        lo = np.searchsorted(self.keys, (rank << _DAY_BITS) | lo_day)
+        hi = np.searchsorted(self.keys, (rank << _DAY_BITS) | hi_day, side='right')
+        return (self.keys[lo:hi] & _DAY_MASK).astype('datetime64[D]'), self.navs[lo:hi]
+
+    def search(self, query: str, limit: int) -> List[SymbolEntry]:
+        """Schemes by code or name fragment, best first (symbol-master ranking)"""
+        return self._search.search(query, limit)
+
+
+def _day_to_date(day: int) -> date:
+    return np.datetime64(day, 'D').astype(object)
+
+
+class NavStore:
+    """
+    Owns the current NavIndex and rebuilds it when the NAV files change.
+
+    Drop NAVAll.txt snapshots and NAV history reports into NAV_DATA_DIR;
+    all of them are merged into one index, later files winning for a
+    (scheme, date) seen twice. As with the symbol master, a rebuild runs off
+    the event loop and is installed in one assignment.
+    """
+
+    def __init__(self, directory: str, reload_seconds: float):
+        self.directory = directory
+        self.reload_seconds = reload_seconds
+        self._index = NavIndex(parse_nav_file(''))
+        self._signature: Optional[Tuple] = None
+        self._task: Optional[asyncio.Task] = None
+
+        # Counters
+        self.lookups = 0
+        self.reloads = 0
+        self.load_errors = 0
+        self.loaded_at: Optional[float] = None
+        self.last_load_ms = 0.0
+
+    @property
+    def index(self) -> NavIndex:
+        return self._index
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def _scan(self) -> Tuple:
+        if not os.path.isdir(self.directory):
+            return ()
+        signature = []
+        for name in sorted(os.listdir(self.directory)):
+            if name.lower().endswith(NAV_EXTENSIONS):
+                path = os.path.join(self.directory, name)
+                stat = os.stat(path)
+                signature.append((path, stat.st_mtime_ns, stat.st_size))
+        return tuple(signature)
+
+    def load(self, force: bool = False) -> bool:
+        """
+        Rebuild the index if any NAV file was added, removed or modified
+
+        Returns:
+            True when a new index was installed
+        """
+        signature = self._scan()
+        if signature == self._signature and not force:
+            return False
+
+        start = time.perf_counter()
+        frames = []
+        # Oldest files first so newer files win for a repeated (scheme, date)
+        for path, _, _ in sorted(signature, key=lambda s: s[1]):
+            try:
+                with open(path, encoding='utf-8-sig', errors='replace') as f:
+                    frames.append(parse_nav_file(f.read()))
+            except Exception as e:
+                self.load_errors += 1
+                logger.error(f"Failed to read NAV file {path}: {e}")
+        frame = pd.concat(frames, ignore_index=True) if frames else parse_nav_file('')
+
+        self._index = NavIndex(frame)
+        self._signature = signature
+        self.reloads += 1
+        self.loaded_at = time.time()
+        self.last_load_ms = (time.perf_counter() - start) * 1000
+        logger.info(f"📊 NAV store loaded {len(self._index)} schemes, {self._index.rows} NAVs "
+                    f"from {len(signature)} file(s) in {self.last_load_ms:.0f}ms")
+        return True
+
+    def resolve(self, text: str) -> Optional[int]:
+        """
+        Scheme code for a holding's code or scheme name, None when unsure
+
+        Names must read like a fund (FUND_NAME_WORDS) and go through the
+        symbol-master ranking; the best hit is only accepted when its name
+        shares most of the query's trigrams, so an equity name is not priced
+        as a similarly named fund.
+        """
+        self.lookups += 1
+        text = str(text).strip()
+        if text.isdigit():
+            return int(text) if self._index.has(int(text)) else None
+        query = normalize(text)
+        if not FUND_NAME_WORDS.intersection(query.lower().split()):
+            return None
+        matches = self._index.search(query, 1)
+        if not matches:
+            return None
+        query_grams = _trigrams(query.split())
+        name_grams = _trigrams(normalize(matches[0].name).split())
+        if len(query_grams & name_grams) / len(query_grams) < MIN_RESOLVE_SIMILARITY:
+            return None
+        return int(matches[0].symbol)
+
+    def search(self, query: str, limit: int) -> List[Dict]:
+        """Scheme search results: code, name, ISIN and latest NAV"""
+        results = []
+        for entry in self._index.search(query, limit):
+            code = int(entry.symbol)
+            latest = self._index.nav(code)
+            results.append({
+                'schemeCode': code,
+                'name': entry.name,
+                'isin': self._index.isin(code),
+                'nav': latest[1] if latest else None,
+                'navDate': latest[0].isoformat() if latest else None,
+            })
+        return results
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            try:
+                await loop.run_in_executor(None, self.load)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.load_errors += 1
+                logger.error(f"NAV store reload failed: {e}")
+            await asyncio.sleep(self.reload_seconds)
+
+    def start(self):
+        """Load the NAV files and keep watching them for changes"""
+        if not self.running:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> Dict:
+        return {
+            'directory': self.directory,
+            'schemes': len(self._index),
+            'navs': self._index.rows,
+            'bytes': self._index.keys.nbytes + self._index.navs.nbytes,
+            'files': len(self._signature or ()),
+            'lookups': self.lookups,
+            'reloads': self.reloads,
+            'load_errors': self.load_errors,
+            'last_load_ms': round(self.last_load_ms, 2),
+            'loaded_at': self.loaded_at,
+            'watching': self.running,
+        }
+
+
+# Singleton instance
+nav_store = NavStore(settings.NAV_DATA_DIR, settings.NAV_RELOAD_SECONDS)
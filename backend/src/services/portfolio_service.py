@@ -1,16 +1,25 @@
 """
 Portfolio Service - Handles S3 portfolio fetching and analysis
 """
+import asyncio
 import io
+import time
+from collections import OrderedDict
+import numpy as np
 import pandas as pd
 import boto3
-from typing import Dict, List, Optional
+from botocore.exceptions import ClientError
+from typing import Dict, List, Optional, Tuple
 from config import settings
 from config.logging_config import logger
+from services.nav_store import nav_store
+from services.symbol_master import symbol_master, normalize
+from services.ticker_metadata import ticker_metadata
+from utils.excel_reader import read_excel_auto_header
 
 class PortfolioService:
     def __init__(self):
-        """Initialize S3 client"""
+        """Initialize S3 client and the parsed-portfolio cache"""
         self.s3_client = boto3.client(
             's3',
             region_name=settings.AWS_REGION,
@@ -18,52 +27,150 @@ class PortfolioService:
             aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY
         )
         self.bucket_name = settings.S3_PORTFOLIO_BUCKET
+        
+        # Normalized frames keyed by (bucket, key) -> (ETag, frame, bytes), least recently used first
+        self.cache_max_bytes = settings.PORTFOLIO_CACHE_MAX_BYTES
+        self._cache: "OrderedDict[Tuple[str, str], Tuple[str, pd.DataFrame, int]]" = OrderedDict()
+        self._cache_bytes = 0
+        self._inflight: Dict[Tuple[str, str], asyncio.Future] = {}
+        
+        # Counters
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+        self.last_parse_ms = 0.0
     
     async def fetch_portfolio_from_s3(self, user_id: str, filename: str) -> pd.DataFrame:
         """
         Fetch portfolio file from S3 and parse it
         
+        Parsed frames are cached per S3 object and revalidated with a
+        conditional GET (IfNoneMatch on the cached ETag): an unchanged file
+        costs one 304 round trip and no download or parsing. Concurrent
+        requests for the same file share one fetch.
+        
         Args:
             user_id: User ID for S3 folder structure
             filename: Portfolio filename
             
         Returns:
-            DataFrame with portfolio data
+            DataFrame with portfolio data (a copy the caller may modify)
         """
         try:
             # S3 key structure: users/{user_id}/{filename}
-            s3_key = f"users/{user_id}/{filename}"
-            
-            logger.info(f"Fetching portfolio from S3: {s3_key}")
-            
-            # Download file from S3
-            response = self.s3_client.get_object(
-                Bucket=self.bucket_name,
-                Key=s3_key
-            )
-            
-            # Read file content
-            file_content = response['Body'].read()
+            key = (self.bucket_name, f"users/{user_id}/{filename}")
             
-            # Parse based on file extension
-            if filename.endswith('.xlsx') or filename.endswith('.xls'):
-                # Read Excel file and auto-detect header row
-                df = self._read_excel_with_auto_header(io.BytesIO(file_content))
-            elif filename.endswith('.csv'):
-                df = pd.read_csv(io.BytesIO(file_content))
+            if key in self._inflight:
+                self.coalesced += 1
             else:
-                raise ValueError(f"Unsupported file format: {filename}")
-            
-            # Normalize column names to handle different formats (Groww, Zerodha, etc.)
-            df = self._normalize_columns(df)
-            
-            logger.info(f"Successfully parsed portfolio with {len(df)} rows")
-            return df
+                self._inflight[key] = asyncio.ensure_future(self._fetch_shared(key, filename))
+            # Shield so a disconnecting client cannot cancel the shared fetch
+            df = await asyncio.shield(self._inflight[key])
+            return df.copy()
             
         except Exception as e:
             logger.error(f"Error fetching portfolio from S3: {str(e)}")
             raise
     
+    async def _fetch_shared(self, key: Tuple[str, str], filename: str) -> pd.DataFrame:
+        try:
+            cached = self._cache.get(key)
+            etag = cached[0] if cached else None
+            try:
+                new_etag, df = await asyncio.get_running_loop().run_in_executor(
+                    None, self._fetch_blocking, key, filename, etag
+                )
+            except Exception:
+                # Deleted or unreadable now; never serve the old parse again
+                self._drop(key)
+                raise
+            if df is None:
+                self.cache_hits += 1
+                if key in self._cache:
+                    self._cache.move_to_end(key)
+                else:
+                    # Evicted while the conditional GET was in flight; the frame is still current
+                    self._put(key, cached[0], cached[1])
+                return cached[1]
+            self.cache_misses += 1
+            self._put(key, new_etag, df)
+            return df
+        finally:
+            self._inflight.pop(key, None)
+    
+    def _fetch_blocking(self, key: Tuple[str, str], filename: str,
+                        etag: Optional[str]) -> Tuple[Optional[str], Optional[pd.DataFrame]]:
+        """(ETag, parsed frame), or (ETag, None) when the object still matches `etag`"""
+        bucket, s3_key = key
+        kwargs = {'Bucket': bucket, 'Key': s3_key}
+        if etag:
+            kwargs['IfNoneMatch'] = etag
+        
+        logger.info(f"Fetching portfolio from S3: {s3_key}")
+        try:
+            # Download file from S3
+            response = self.s3_client.get_object(**kwargs)
+        except ClientError as e:
+            status = e.response.get('ResponseMetadata', {}).get('HTTPStatusCode')
+            if etag and (status == 304 or e.response.get('Error', {}).get('Code') in ('304', 'NotModified')):
+                logger.info(f"Portfolio unchanged, using cached parse: {s3_key}")
+                return etag, None
+            raise
+        
+        # Read file content
+        file_content = response['Body'].read()
+        
+        start = time.perf_counter()
+        # Parse based on file extension
+        if filename.endswith('.xlsx'):
+            # Read Excel file and auto-detect header row
+            df = self._read_excel_with_auto_header(io.BytesIO(file_content))
+        elif filename.endswith('.xls'):
+            df = self._read_legacy_excel(io.BytesIO(file_content))
+        elif filename.endswith('.csv'):
+            df = pd.read_csv(io.BytesIO(file_content))
+        else:
+            raise ValueError(f"Unsupported file format: {filename}")
+        
+        # Normalize column names to handle different formats (Groww, Zerodha, etc.)
+        df = self._normalize_columns(df)
+        self.last_parse_ms = (time.perf_counter() - start) * 1000
+        
+        logger.info(f"Successfully parsed portfolio with {len(df)} rows")
+        return response.get('ETag'), df
+    
+    def _drop(self, key: Tuple[str, str]):
+        old = self._cache.pop(key, None)
+        if old is not None:
+            self._cache_bytes -= old[2]
+    
+    def _put(self, key: Tuple[str, str], etag: Optional[str], df: pd.DataFrame):
+        """Cache a parsed frame, evicting least recently used ones past the byte budget"""
+        self._drop(key)
+        size = int(df.memory_usage(index=True, deep=True).sum())
+        if not etag or size > self.cache_max_bytes:
+            return
+        self._cache[key] = (etag, df, size)
+        self._cache_bytes += size
+        while self._cache_bytes > self.cache_max_bytes:
+            _, (_, _, evicted) = self._cache.popitem(last=False)
+            self._cache_bytes -= evicted
+            self.evictions += 1
+    
+    def stats(self) -> Dict:
+        return {
+            'entries': len(self._cache),
+            'bytes': self._cache_bytes,
+            'max_bytes': self.cache_max_bytes,
+            'hits': self.cache_hits,
+            'misses': self.cache_misses,
+            'coalesced': self.coalesced,
+            'evictions': self.evictions,
+            'inflight': len(self._inflight),
+            'last_parse_ms': round(self.last_parse_ms, 2),
+        }
+    
     async def list_user_portfolios(self, user_id: str) -> List[Dict[str, str]]:
         """
         List all portfolio files for a user
@@ -103,10 +210,49 @@ class PortfolioService:
             logger.error(f"Error listing portfolios: {str(e)}")
             raise
     
+    @staticmethod
+    def _is_portfolio_header(values) -> bool:
+        """Whether a row's non-empty cells are the holdings table header (Groww, Zerodha, fund statements)"""
+        row_str = ' '.join(str(x).lower() for x in values)
+        stock_header = (('stock' in row_str or 'symbol' in row_str) and 'quantity' in row_str
+                        and ('average' in row_str or 'price' in row_str))
+        fund_header = 'scheme' in row_str and 'units' in row_str
+        return stock_header or fund_header
+    
+    @staticmethod
+    def _drop_blank_holdings(df: pd.DataFrame) -> pd.DataFrame:
+        # Remove any completely empty rows
+        df = df.dropna(how='all')
+        
+        # Remove rows without a stock/scheme name (totals and footnotes)
+        for name in ('Stock Name', 'Scheme Name', 'Tradingsymbol', 'Symbol'):
+            if name in df.columns:
+                return df[df[name].notna()]
+        if df.columns[0] in ['Stock Name', 'stock name', 'Stock name']:
+            df = df[df[df.columns[0]].notna()]
+        return df
+    
     def _read_excel_with_auto_header(self, file_content) -> pd.DataFrame:
         """
-        Read Excel file and automatically detect the header row.
+        Read an .xlsx file and automatically detect the header row.
         Handles files with title rows, summary rows, etc. (Groww format)
+        
+        The workbook is streamed once: the header is looked for in the
+        first rows and the rows below it go straight into the frame.
+        """
+        df = read_excel_auto_header(file_content, self._is_portfolio_header)
+        if df is not None:
+            return self._drop_blank_holdings(df)
+        
+        # If no specific header found, use default
+        file_content.seek(0)
+        logger.warning("No stock data headers found, using default parsing")
+        return pd.read_excel(file_content)
+    
+    def _read_legacy_excel(self, file_content) -> pd.DataFrame:
+        """
+        Read an .xls file (xlrd via pandas; openpyxl cannot stream it) and detect the header row.
+        Parses the sheet once to find the header and again from it.
         """
         # Read all rows without headers first
         df_raw = pd.read_excel(file_content, header=None)
@@ -114,26 +260,12 @@ class PortfolioService:
         
         # Look for the row containing "Stock Name" and "Quantity"
         for i in range(len(df_raw)):
-            row_values = [str(x).lower() for x in df_raw.iloc[i].values if pd.notna(x)]
-            row_str = ' '.join(row_values)
-            
-            # Check if this row has stock data headers
-            if 'stock' in row_str and 'quantity' in row_str and ('average' in row_str or 'price' in row_str):
+            if self._is_portfolio_header([x for x in df_raw.iloc[i].values if pd.notna(x)]):
                 logger.info(f"Found stock data headers at row {i}")
                 # Read the file with the correct header row
                 df = pd.read_excel(file_content, skiprows=i)
                 file_content.seek(0)
-                
-                # Remove any completely empty rows
-                df = df.dropna(how='all')
-                
-                # Remove rows where Stock Name is NaN
-                if 'Stock Name' in df.columns:
-                    df = df[df['Stock Name'].notna()]
-                elif df.columns[0] in ['Stock Name', 'stock name', 'Stock name']:
-                    df = df[df[df.columns[0]].notna()]
-                
-                return df
+                return self._drop_blank_holdings(df)
         
         # If no specific header found, use default
         file_content.seek(0)
@@ -176,6 +308,18 @@ class PortfolioService:
             'LTP': 'current_price',
             'ltp': 'current_price',
             
+            # Mutual fund statements (Groww, CAMS/KFintech exports)
+            'Scheme Name': 'symbol',
+            'scheme name': 'symbol',
+            'Units': 'quantity',
+            'units': 'quantity',
+            'Average NAV': 'purchase_price',
+            'Avg. NAV': 'purchase_price',
+            'Invested Value': 'invested_value',
+            'invested value': 'invested_value',
+            'Current NAV': 'current_price',
+            'NAV': 'current_price',
+            
             # Standard format (already correct)
             'symbol': 'symbol',
             'Symbol': 'symbol',
@@ -186,6 +330,10 @@ class PortfolioService:
         # Rename columns based on mapping
         df_renamed = df.rename(columns=column_mappings)
         
+        # Fund statements give the amount invested rather than an average NAV
+        if 'purchase_price' not in df_renamed.columns and {'invested_value', 'quantity'} <= set(df_renamed.columns):
+            df_renamed['purchase_price'] = df_renamed['invested_value'] / df_renamed['quantity']
+        
         # Verify required columns exist
         required_cols = ['symbol', 'quantity', 'purchase_price']
         missing_cols = [col for col in required_cols if col not in df_renamed.columns]
@@ -221,6 +369,9 @@ class PortfolioService:
             # Calculate investment value
             df['invested_value'] = df['quantity'] * df['purchase_price']
             
+            # Price mutual fund holdings at their latest NAV where the file has no current price
+            self._price_mutual_funds(df)
+            
             # If current_price exists, calculate current value and P&L
             if 'current_price' in df.columns:
                 df['current_value'] = df['quantity'] * df['current_price']
@@ -238,7 +389,7 @@ class PortfolioService:
                     'symbol': row['symbol'],
                     'value': float(row['invested_value']),
                     'percentage': float(row['allocation_pct']),
-                    'quantity': int(row['quantity'])
+                    'quantity': self._quantity(row['quantity'])
                 })
             
             # Calculate summary metrics
@@ -248,15 +399,20 @@ class PortfolioService:
                 'pie_chart_data': pie_data
             }
             
-            # Add current value metrics if available
-            if 'current_value' in df.columns:
-                total_current = df['current_value'].sum()
-                total_pl = df['profit_loss'].sum()
+            # Add current value metrics if available, over priced rows only so
+            # value, P&L and return describe the same holdings
+            priced = df['current_value'].notna() if 'current_value' in df.columns else None
+            if priced is not None and priced.any():
+                priced_invested = df.loc[priced, 'invested_value'].sum()
+                total_current = df.loc[priced, 'current_value'].sum()
+                total_pl = total_current - priced_invested
                 
                 summary.update({
                     'total_current_value': float(total_current),
                     'total_profit_loss': float(total_pl),
-                    'total_return_pct': float((total_pl / total_invested) * 100),
+                    'total_return_pct': float((total_pl / priced_invested) * 100) if priced_invested else None,
+                    'priced_holdings': int(priced.sum()),
+                    'priced_invested': float(priced_invested),
                     'winners': int((df['profit_loss'] > 0).sum()),
                     'losers': int((df['profit_loss'] < 0).sum())
                 })
@@ -266,13 +422,20 @@ class PortfolioService:
             for _, row in df.iterrows():
                 holding = {
                     'symbol': row['symbol'],
-                    'quantity': int(row['quantity']),
+                    'quantity': self._quantity(row['quantity']),
                     'purchase_price': float(row['purchase_price']),
                     'invested_value': float(row['invested_value']),
                     'allocation_pct': float(row['allocation_pct'])
                 }
                 
-                if 'current_price' in df.columns:
+                if 'scheme_code' in df.columns and pd.notna(row['scheme_code']):
+                    holding.update({
+                        'asset_type': 'mutual_fund',
+                        'scheme_code': int(row['scheme_code']),
+                        'nav_date': row['nav_date'],
+                    })
+                
+                if 'current_price' in df.columns and pd.notna(row['current_price']):
                     holding.update({
                         'current_price': float(row['current_price']),
                         'current_value': float(row['current_value']),
@@ -282,6 +445,8 @@ class PortfolioService:
                 
                 holdings.append(holding)
             
+            await self._enrich_holdings(holdings, summary)
+            
             return {
                 'summary': summary,
                 'holdings': holdings
@@ -291,6 +456,90 @@ class PortfolioService:
             logger.error(f"Error analyzing portfolio: {str(e)}")
             raise
     
+    @staticmethod
+    def _quantity(value):
+        """Share counts stay integers; fractional fund units are kept"""
+        value = float(value)
+        return int(value) if value.is_integer() else round(value, 4)
+    
+    def _price_mutual_funds(self, df: pd.DataFrame):
+        """
+        Fill current_price with the latest NAV for rows that name a mutual fund
+        
+        Rows that already have a price, or resolve to a listed equity, are
+        left alone. Scheme names are resolved through the NAV store and all
+        NAVs are looked up in one vectorised call.
+        """
+        if len(nav_store.index) == 0:
+            return
+        if 'current_price' not in df.columns:
+            df['current_price'] = float('nan')
+        rows, codes = [], []
+        for i, raw in df.loc[df['current_price'].isna(), 'symbol'].items():
+            if symbol_master.get(self._resolve_ticker(raw)) is not None:
+                continue
+            code = nav_store.resolve(raw)
+            if code is not None:
+                rows.append(i)
+                codes.append(code)
+        if not rows:
+            if df['current_price'].isna().all():
+                df.drop(columns='current_price', inplace=True)
+            return
+        dates, navs = nav_store.index.navs_at(codes)
+        df['scheme_code'] = pd.Series(codes, index=rows, dtype='Int64')
+        df['nav_date'] = pd.Series(np.datetime_as_string(dates).tolist(), index=rows, dtype=object)
+        df.loc[rows, 'current_price'] = navs
+        logger.info(f"Priced {len(rows)} mutual fund holding(s) from the NAV store")
+    
+    def _resolve_ticker(self, raw: str) -> str:
+        """
+        Broker exports carry tickers (Zerodha) or company names (Groww);
+        map either to a Yahoo-style symbol through the symbol master.
+        """
+        raw = str(raw).strip()
+        entry = symbol_master.get(raw) or symbol_master.get(f"{raw}.NS")
+        if entry is not None:
+            return entry.symbol
+        matches = symbol_master.search(raw, 1)
+        if matches and normalize(matches[0]['name']).startswith(normalize(raw)):
+            return matches[0]['symbol']
+        return raw
+    
+    async def _enrich_holdings(self, holdings: List[Dict], summary: Dict):
+        """
+        Add name/sector/currency per holding and the sector split to the summary
+        
+        Reads the ticker metadata cache; symbols it has never seen are fetched
+        within TICKER_METADATA_LOOKUP_TIMEOUT_SECONDS and otherwise left blank.
+        """
+        tickers = {h['symbol']: self._resolve_ticker(h['symbol'])
+                   for h in holdings if h.get('asset_type') != 'mutual_fund'}
+        try:
+            metadata = await ticker_metadata.get_many(
+                tickers.values(), timeout=settings.TICKER_METADATA_LOOKUP_TIMEOUT_SECONDS
+            )
+        except Exception as e:
+            logger.warning(f"Holding enrichment skipped: {e}")
+            return
+        
+        sectors: Dict[str, float] = {}
+        for holding in holdings:
+            if holding.get('asset_type') == 'mutual_fund':
+                holding['name'] = nav_store.index.name(holding['scheme_code'])
+                holding['currency'] = 'INR'
+                holding['sector'] = 'Mutual Fund'
+            else:
+                ticker = tickers[holding['symbol']]
+                meta = metadata.get(ticker.upper())
+                listing = symbol_master.get(ticker)
+                holding['name'] = (meta and meta.name) or (listing and listing.name) or None
+                holding['currency'] = (meta and meta.currency) or (listing and listing.currency) or None
+                holding['sector'] = meta.sector if meta else None
+            sector = holding['sector'] or 'Unknown'
+            sectors[sector] = sectors.get(sector, 0.0) + holding['allocation_pct']
+        summary['sector_allocation'] = {k: round(v, 2) for k, v in sorted(sectors.items(), key=lambda kv: -kv[1])}
+    
     async def generate_ai_insights(self, analysis: Dict, model) -> str:
         """
         Generate AI insights using Gemini
@@ -326,11 +575,12 @@ Keep the response concise (max 300 words) and actionable."""
 
             # Add P&L context if available
             if 'total_profit_loss' in summary:
+                return_pct = summary['total_return_pct']
                 prompt += f"""
 
-**Performance Metrics:**
-- Current Value: ₹{summary['total_current_value']:,.2f}
-- Total P&L: ₹{summary['total_profit_loss']:,.2f} ({summary['total_return_pct']:.2f}%)
+**Performance Metrics** ({summary['priced_holdings']} of {summary['total_stocks']} holdings priced):
+- Current Value: ₹{summary['total_current_value']:,.2f} (invested ₹{summary['priced_invested']:,.2f})
+- Total P&L: ₹{summary['total_profit_loss']:,.2f}{f" ({return_pct:.2f}%)" if return_pct is not None else ""}
 - Winners: {summary['winners']} | Losers: {summary['losers']}
 """
             
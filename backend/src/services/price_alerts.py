@@ -0,0 +1,436 @@
+"""
+Price Alerts - Threshold-crossing alerts indexed per symbol and evaluated on every refresh
+"""
+import asyncio
+import secrets
+import time
+import uuid
+from bisect import bisect_left, bisect_right
+from collections import deque
+from dataclasses import asdict, dataclass
+from typing import Any, AsyncIterator, Callable, Deque, Dict, List, Optional, Tuple
+from config import settings
+from config.logging_config import logger
+from services.alert_store import DynamoAlertStore, alert_store
+from services.market_data import MarketSnapshot, market_refresher
+from services.quote_stream import _encode_event
+from services.universe import INDEX_SYMBOLS, display_symbol, market_universe
+
+# Crossing directions: upwards through the threshold, downwards, or either way
+DIRECTIONS = ('above', 'below', 'cross')
+
+ACTIVE = 'active'
+TRIGGERED = 'triggered'
+
+# Snapshot datasets whose item prices are checked
+_PRICE_ITEMS = {'stocks': 'stocks', 'indices': 'indices'}
+
+
+def _tracked(symbol: str) -> bool:
+    """True for symbols the refresher prices: the universe and the indices"""
+    return symbol in market_universe or symbol in INDEX_SYMBOLS
+
+
+@dataclass
+class Alert:
+    alert_id: str
+    user_id: str
+    symbol: str
+    direction: str
+    threshold: float
+    created_at: float
+    note: Optional[str] = None
+    status: str = ACTIVE
+    triggered_at: Optional[float] = None
+    triggered_price: Optional[float] = None
+    expires_at: Optional[int] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+class _Book:
+    """One symbol's active alerts, sorted by threshold (parallel lists for bisect)"""
+    __slots__ = ('thresholds', 'alerts')
+
+    def __init__(self):
+        self.thresholds: List[float] = []
+        self.alerts: List[Alert] = []
+
+    def add(self, alert: Alert):
+        i = bisect_right(self.thresholds, alert.threshold)
+        self.thresholds.insert(i, alert.threshold)
+        self.alerts.insert(i, alert)
+
+    def remove(self, alert: Alert) -> bool:
+        i = bisect_left(self.thresholds, alert.threshold)
+        while i < len(self.alerts) and self.thresholds[i] == alert.threshold:
+            if self.alerts[i] is alert:
+                del self.thresholds[i]
+                del self.alerts[i]
+                return True
+            i += 1
+        return False
+
+    def crossed(self, previous: float, price: float) -> Tuple[int, int, Tuple[str, ...]]:
+        """
+        Slice of thresholds the move from `previous` to `price` passed, and
+        the directions that fire on it
+
+        Up moves cross previous < t <= price, down moves price <= t < previous.
+        """
+        if price > previous:
+            return (bisect_right(self.thresholds, previous), bisect_right(self.thresholds, price),
+                    ('above', 'cross'))
+        return bisect_left(self.thresholds, price), bisect_left(self.thresholds, previous), ('below', 'cross')
+
+
+class _Subscriber:
+    def __init__(self, user_id: str, queue_size: int):
+        self.user_id = user_id
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.closed = False
+
+
+class AlertEngine:
+    """
+    Active alerts are kept per symbol in arrays sorted by threshold. A
+    refresh looks only at symbols whose price moved and bisects each move
+    into the band of thresholds it crossed, so evaluation cost follows the
+    alerts that fire rather than the number of alerts stored.
+
+    Alerts fire once: they leave the index, are saved as triggered with an
+    expiry `retention_seconds` later, and a firing event is queued for the
+    owner's stream subscribers. Recent events are kept so a reconnecting
+    stream can replay what it missed; event ids ("epoch:sequence") name
+    the process that numbered them.
+
+    `tracked(symbol)` limits new alerts to symbols that get priced; None
+    accepts any symbol.
+    """
+
+    def __init__(self, store: Optional[DynamoAlertStore], max_per_user: int,
+                 history: int, queue_size: int, max_subscribers: int,
+                 retention_seconds: float = 7 * 86400,
+                 tracked: Optional[Callable[[str], bool]] = None):
+        self.store = store
+        self.max_per_user = max_per_user
+        self.queue_size = queue_size
+        self.max_subscribers = max_subscribers
+        self.retention_seconds = retention_seconds
+        self.tracked = tracked
+        self._books: Dict[str, _Book] = {}
+        self._by_user: Dict[str, Dict[str, Alert]] = {}
+        self._last_prices: Dict[str, float] = {}
+        # Triggered alerts in expiry order: (expires_at, user_id, alert_id)
+        self._expiring: Deque[Tuple[float, str, str]] = deque()
+        self._events: Deque[Tuple[int, str, bytes]] = deque(maxlen=history)
+        self.epoch = secrets.token_hex(4)
+        self._sequence = 0
+        self._subscribers: Dict[str, List[_Subscriber]] = {}
+
+        # Counters
+        self.refreshes = 0
+        self.moves = 0
+        self.candidates = 0
+        self.fired = 0
+        self.expired = 0
+        self.evaluate_ms = 0.0
+        self.dropped_subscribers = 0
+
+    # ---- alert management ----
+
+    def open(self):
+        """Bind the store and index every stored alert; blocking"""
+        if self.store is None:
+            return
+        self.store.open()
+        records = self.store.load()
+        active: Dict[str, List[Alert]] = {}
+        triggered: List[Alert] = []
+        for record in records:
+            alert = Alert(**record)
+            self._by_user.setdefault(alert.user_id, {})[alert.alert_id] = alert
+            if alert.status == ACTIVE:
+                active.setdefault(alert.symbol, []).append(alert)
+            else:
+                if alert.expires_at is None:
+                    alert.expires_at = int((alert.triggered_at or alert.created_at) + self.retention_seconds)
+                triggered.append(alert)
+        # DynamoDB deletes expired items lazily; drop the ones it has not reached yet
+        triggered.sort(key=lambda a: a.expires_at)
+        self._expiring.extend((a.expires_at, a.user_id, a.alert_id) for a in triggered)
+        self._prune(time.time())
+        # One sort per symbol instead of an insert per alert
+        for symbol, alerts in active.items():
+            alerts.sort(key=lambda a: a.threshold)
+            book = self._books.setdefault(symbol, _Book())
+            book.thresholds = [a.threshold for a in alerts]
+            book.alerts = alerts
+        logger.info(f"🔔 Loaded {len(records)} price alerts")
+
+    def _index(self, alert: Alert):
+        self._by_user.setdefault(alert.user_id, {})[alert.alert_id] = alert
+        if alert.status == ACTIVE:
+            self._books.setdefault(alert.symbol, _Book()).add(alert)
+
+    def _unindex(self, alert: Alert):
+        book = self._books.get(alert.symbol)
+        if book is not None and book.remove(alert) and not book.alerts:
+            del self._books[alert.symbol]
+
+    async def _persist(self, method: str, *args):
+        if self.store is not None:
+            await asyncio.get_running_loop().run_in_executor(None, getattr(self.store, method), *args)
+
+    def alerts_for(self, user_id: str) -> List[Alert]:
+        return sorted(self._by_user.get(user_id, {}).values(), key=lambda a: a.created_at)
+
+    async def create(self, user_id: str, symbol: str, direction: str, threshold: float,
+                     note: Optional[str] = None) -> Alert:
+        """
+        Add an alert that fires the next time `symbol` crosses `threshold`
+
+        Raises:
+            ValueError: Bad direction or threshold, a symbol that is not
+                tracked, or the user's active alert limit is reached
+        """
+        if direction not in DIRECTIONS:
+            raise ValueError(f"Unsupported direction: {direction}. Use one of: {', '.join(DIRECTIONS)}")
+        if not threshold > 0:
+            raise ValueError("threshold must be a positive price")
+        symbol = display_symbol(symbol.strip().upper())
+        if self.tracked is not None and not self.tracked(symbol):
+            raise ValueError(f"{symbol} is not in the tracked market universe, so its price is never checked")
+        active = sum(1 for a in self._by_user.get(user_id, {}).values() if a.status == ACTIVE)
+        if active >= self.max_per_user:
+            raise ValueError(f"At most {self.max_per_user} active alerts per user")
+        alert = Alert(
+            alert_id=uuid.uuid4().hex,
+            user_id=user_id,
+            symbol=symbol,
+            direction=direction,
+            threshold=float(threshold),
+            created_at=time.time(),
+            note=note,
+        )
+        await self._persist('put', alert.to_dict())
+        self._index(alert)
+        return alert
+
+    async def delete(self, user_id: str, alert_id: str) -> bool:
+        """Remove an alert (active or triggered); False when it does not exist"""
+        alert = self._by_user.get(user_id, {}).get(alert_id)
+        if alert is None:
+            return False
+        await self._persist('delete', user_id, alert_id)
+        self._by_user[user_id].pop(alert_id, None)
+        if alert.status == ACTIVE:
+            self._unindex(alert)
+        return True
+
+    # ---- evaluation ----
+
+    def evaluate(self, prices: Dict[str, float]) -> List[Tuple[Alert, float]]:
+        """
+        Fire every active alert crossed since the last prices seen
+
+        The first price for a symbol only sets its baseline. Returns the
+        fired (alert, previous price) pairs; the alerts are already marked
+        triggered and removed from the index.
+        """
+        t0 = time.perf_counter()
+        fired: List[Tuple[Alert, float]] = []
+        now = time.time()
+        for symbol, price in prices.items():
+            previous = self._last_prices.get(symbol)
+            self._last_prices[symbol] = price
+            if previous is None or price == previous:
+                continue
+            self.moves += 1
+            book = self._books.get(symbol)
+            if book is None:
+                continue
+            lo, hi, directions = book.crossed(previous, price)
+            if lo == hi:
+                continue
+            self.candidates += hi - lo
+            kept_thresholds, kept_alerts = [], []
+            for threshold, alert in zip(book.thresholds[lo:hi], book.alerts[lo:hi]):
+                if alert.direction in directions:
+                    alert.status = TRIGGERED
+                    alert.triggered_at = now
+                    alert.triggered_price = price
+                    alert.expires_at = int(now + self.retention_seconds)
+                    self._expiring.append((alert.expires_at, alert.user_id, alert.alert_id))
+                    fired.append((alert, previous))
+                else:
+                    kept_thresholds.append(threshold)
+                    kept_alerts.append(alert)
+            book.thresholds[lo:hi] = kept_thresholds
+            book.alerts[lo:hi] = kept_alerts
+            if not book.alerts:
+                del self._books[symbol]
+        self.refreshes += 1
+        self.fired += len(fired)
+        self._prune(now)
+        self.evaluate_ms += (time.perf_counter() - t0) * 1000
+        return fired
+
+    def _prune(self, now: float):
+        """Forget triggered alerts past their expiry (the table's TTL removes the items)"""
+        while self._expiring and self._expiring[0][0] <= now:
+            _, user_id, alert_id = self._expiring.popleft()
+            alerts = self._by_user.get(user_id)
+            alert = alerts.get(alert_id) if alerts else None
+            if alert is None or alert.status != TRIGGERED:
+                # Deleted in the meantime
+                continue
+            del alerts[alert_id]
+            if not alerts:
+                del self._by_user[user_id]
+            self.expired += 1
+
+    def on_snapshot(self, snapshot: MarketSnapshot):
+        """Refresher listener: evaluate the snapshot's prices, then persist and publish what fired"""
+        key = _PRICE_ITEMS.get(snapshot.name)
+        if key is None:
+            return
+        prices = {
+            item['symbol'].upper(): float(item['price'])
+            for item in snapshot.payload.get(key) or []
+            if item.get('price')
+        }
+        for alert, previous in self.evaluate(prices):
+            self._publish(alert, previous)
+            if self.store is not None and self.store.available:
+                # Off the event loop: the refresh must not wait on DynamoDB
+                asyncio.get_running_loop().run_in_executor(None, self._save_triggered, alert.to_dict())
+
+    def _save_triggered(self, record: Dict[str, Any]):
+        try:
+            self.store.put(record)
+        except Exception:
+            # Logged by the store; the alert already left the index and will not fire twice
+            pass
+
+    # ---- firing events ----
+
+    def _publish(self, alert: Alert, previous: float):
+        self._sequence += 1
+        data = {
+            'alertId': alert.alert_id,
+            'symbol': alert.symbol,
+            'direction': alert.direction,
+            'threshold': alert.threshold,
+            'price': alert.triggered_price,
+            'previousPrice': previous,
+            'note': alert.note,
+            'firedAt': alert.triggered_at,
+        }
+        frame = _encode_event('alert', data, event_id=f"{self.epoch}:{self._sequence}")
+        self._events.append((self._sequence, alert.user_id, frame))
+        for sub in list(self._subscribers.get(alert.user_id, [])):
+            try:
+                sub.queue.put_nowait(frame)
+            except asyncio.QueueFull:
+                # Too far behind: close it; the client reconnects with Last-Event-ID and replays
+                self._drop(sub)
+
+    @property
+    def full(self) -> bool:
+        return sum(len(subs) for subs in self._subscribers.values()) >= self.max_subscribers
+
+    def subscribe(self, user_id: str) -> Optional[_Subscriber]:
+        """Register a stream client, or None when the subscriber limit is reached"""
+        if self.full:
+            return None
+        sub = _Subscriber(user_id, self.queue_size)
+        self._subscribers.setdefault(user_id, []).append(sub)
+        return sub
+
+    def unsubscribe(self, sub: _Subscriber):
+        sub.closed = True
+        subs = self._subscribers.get(sub.user_id, [])
+        if sub in subs:
+            subs.remove(sub)
+            if not subs:
+                del self._subscribers[sub.user_id]
+
+    def _drop(self, sub: _Subscriber):
+        self.unsubscribe(sub)
+        while not sub.queue.empty():
+            sub.queue.get_nowait()
+        sub.queue.put_nowait(None)
+        self.dropped_subscribers += 1
+
+    def _replay_after(self, last_event_id: Optional[str]) -> Optional[int]:
+        """Sequence to replay after for a Last-Event-ID; None when there is nothing to replay"""
+        if not last_event_id:
+            return None
+        epoch, _, sequence = last_event_id.rpartition(':')
+        if epoch == self.epoch and sequence.isdigit():
+            return int(sequence)
+        # Issued before a restart: everything kept since then is new to the client
+        return 0
+
+    async def events(self, user_id: str, last_event_id: Optional[str],
+                     heartbeat_seconds: float) -> AsyncIterator[bytes]:
+        """
+        Frame iterator for one user: missed events after `last_event_id`, then live ones
+
+        The client is subscribed on the first read, so one that disconnects
+        before the response starts never holds a slot. If the limit was
+        reached in between, the stream ends after the retry hint.
+        """
+        sub = self.subscribe(user_id)
+        try:
+            yield f"retry: {int(settings.STREAM_RETRY_MS)}\n\n".encode()
+            if sub is None:
+                return
+            after = self._replay_after(last_event_id)
+            if after is not None:
+                for sequence, owner, frame in list(self._events):
+                    if sequence > after and owner == user_id:
+                        yield frame
+            while not sub.closed:
+                try:
+                    frame = await asyncio.wait_for(sub.queue.get(), timeout=heartbeat_seconds)
+                except asyncio.TimeoutError:
+                    yield b": keep-alive\n\n"
+                    continue
+                if frame is None:
+                    break
+                yield frame
+        finally:
+            if sub is not None:
+                self.unsubscribe(sub)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'alerts': sum(len(alerts) for alerts in self._by_user.values()),
+            'active': sum(len(book.alerts) for book in self._books.values()),
+            'symbols': len(self._books),
+            'refreshes': self.refreshes,
+            'moves': self.moves,
+            'candidates': self.candidates,
+            'fired': self.fired,
+            'expired': self.expired,
+            'evaluate_ms_total': round(self.evaluate_ms, 2),
+            'subscribers': sum(len(subs) for subs in self._subscribers.values()),
+            'dropped_subscribers': self.dropped_subscribers,
+            'store': self.store.stats() if self.store is not None else None,
+        }
+
+
+# Singleton instance, fed by the market refresher
+alert_engine = AlertEngine(
+    alert_store,
+    max_per_user=settings.ALERTS_MAX_PER_USER,
+    history=settings.ALERT_EVENT_HISTORY,
+    queue_size=settings.STREAM_QUEUE_SIZE,
+    max_subscribers=settings.STREAM_MAX_SUBSCRIBERS,
+    retention_seconds=settings.ALERTS_TRIGGERED_RETENTION_SECONDS,
+    tracked=_tracked,
+)
+market_refresher.add_listener(alert_engine.on_snapshot)
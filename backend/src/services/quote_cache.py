@@ -0,0 +1,114 @@
+"""
+Quote Cache - Process-wide TTL snapshot of market quotes with single-flight refresh
+"""
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+from config import settings
+from config.logging_config import logger
+
+
+class QuoteSnapshotCache:
+    """
+    Holds the last upstream payload for a fixed TTL.
+
+    Concurrent callers that miss inside the same window share a single
+    in-flight refresh instead of each fanning out to the upstream API.
+    Failed refreshes are never cached; every waiter sees the error.
+    """
+
+    def __init__(self, name: str, ttl_seconds: float):
+        self.name = name
+        self.ttl_seconds = ttl_seconds
+        self._value: Optional[Any] = None
+        self._fetched_at = 0.0
+        self._inflight: Optional[asyncio.Future] = None
+
+        # Counters
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.refreshes = 0
+        self.refresh_errors = 0
+        self.last_refresh_ms = 0.0
+        self.max_refresh_ms = 0.0
+        self.total_refresh_ms = 0.0
+
+    def age(self) -> Optional[float]:
+        """Seconds since the cached value was fetched, or None if empty"""
+        if self._value is None:
+            return None
+        return time.monotonic() - self._fetched_at
+
+    async def get(self, loader: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Return the cached value, refreshing through `loader` when expired
+
+        Args:
+            loader: Coroutine function producing a fresh value
+
+        Returns:
+            Cached or freshly loaded value
+        """
+        age = self.age()
+        if age is not None and age < self.ttl_seconds:
+            self.hits += 1
+            return self._value
+
+        if self._inflight is None:
+            self.misses += 1
+            self._inflight = asyncio.ensure_future(self._refresh(loader))
+        else:
+            self.coalesced += 1
+
+        # Shield so a disconnecting client cannot cancel the shared refresh
+        return await asyncio.shield(self._inflight)
+
+    async def _refresh(self, loader: Callable[[], Awaitable[Any]]) -> Any:
+        start = time.perf_counter()
+        try:
+            value = await loader()
+            self._value = value
+            self._fetched_at = time.monotonic()
+            self.refreshes += 1
+            return value
+        except Exception as e:
+            self.refresh_errors += 1
+            logger.warning(f"Quote cache '{self.name}' refresh failed: {e}")
+            raise
+        finally:
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            self.last_refresh_ms = elapsed_ms
+            self.max_refresh_ms = max(self.max_refresh_ms, elapsed_ms)
+            self.total_refresh_ms += elapsed_ms
+            self._inflight = None
+
+    def invalidate(self):
+        """Drop the cached value so the next caller refreshes"""
+        self._value = None
+        self._fetched_at = 0.0
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss and refresh-latency counters"""
+        attempts = self.refreshes + self.refresh_errors
+        lookups = self.hits + self.misses + self.coalesced
+        age = self.age()
+        return {
+            'name': self.name,
+            'ttl_seconds': self.ttl_seconds,
+            'hits': self.hits,
+            'misses': self.misses,
+            'coalesced': self.coalesced,
+            'hit_ratio': round((self.hits + self.coalesced) / lookups, 4) if lookups else 0.0,
+            'refreshes': self.refreshes,
+            'refresh_errors': self.refresh_errors,
+            'last_refresh_ms': round(self.last_refresh_ms, 2),
+            'avg_refresh_ms': round(self.total_refresh_ms / attempts, 2) if attempts else 0.0,
+            'max_refresh_ms': round(self.max_refresh_ms, 2),
+            'age_seconds': round(age, 3) if age is not None else None,
+        }
+
+
+# Singleton instances
+live_quotes_cache = QuoteSnapshotCache('stocks_live', settings.QUOTE_CACHE_TTL_SECONDS)
+indices_cache = QuoteSnapshotCache('stocks_indices', settings.QUOTE_CACHE_TTL_SECONDS)
@@ -0,0 +1,199 @@
+"""
+Quote Stream - Fans out changed quotes from the market refresher to SSE clients
+"""
+import asyncio
+import json
+import time
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+from config import settings
+from config.logging_config import logger
+from services.market_data import MarketSnapshot, market_refresher
+
+# Fields that make a quote "changed" for streaming purposes
+CHANGE_FIELDS = ('price', 'change', 'isMarketOpen')
+
+# Queue sentinel: the subscriber fell behind and must be sent a full snapshot
+_RESYNC = object()
+
+
+def _encode_event(event: str, data: Dict[str, Any], event_id: Optional[str] = None) -> bytes:
+    """Encode one Server-Sent Event frame"""
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"event: {event}")
+    lines.append(f"data: {json.dumps(data, separators=(',', ':'))}")
+    return ("\n".join(lines) + "\n\n").encode()
+
+
+class StreamSubscriber:
+    """One connected client: a small queue of pre-encoded frames"""
+
+    def __init__(self, queue_size: int):
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.connected_at = time.time()
+        self.overflows = 0
+        self.closed = False
+
+
+class QuoteBroadcaster:
+    """
+    Publishes only the quotes that changed between refresher snapshots.
+
+    Each change set is encoded once and the same bytes are queued for every
+    subscriber, so per-client cost is a single put_nowait. A subscriber whose
+    queue is full has it cleared and replaced by a resync marker (its pending
+    updates are coalesced into one full snapshot); one that overflows too
+    often is dropped.
+    """
+
+    def __init__(self, queue_size: int, max_subscribers: int, max_overflows: int):
+        self.queue_size = queue_size
+        self.max_subscribers = max_subscribers
+        self.max_overflows = max_overflows
+        self._subscribers: List[StreamSubscriber] = []
+        self._last_quotes: Dict[str, Dict[str, Tuple]] = {}
+        self._snapshots: Dict[str, MarketSnapshot] = {}
+        self._snapshot_frame: Optional[Tuple[Tuple, bytes]] = None
+
+        # Counters
+        self.published = 0
+        self.frames_sent = 0
+        self.resyncs = 0
+        self.dropped = 0
+
+    @staticmethod
+    def _items(name: str, payload: Dict[str, Any]) -> List[Dict[str, Any]]:
+        return payload.get('stocks' if name == 'stocks' else name) or []
+
+    def on_snapshot(self, snapshot: MarketSnapshot):
+        """Refresher listener: diff against the last snapshot and fan out"""
+        name = snapshot.name
+        previous = self._last_quotes.get(name, {})
+        current = {}
+        changed = []
+        for quote in self._items(name, snapshot.payload):
+            key = tuple(quote.get(f) for f in CHANGE_FIELDS)
+            current[quote['symbol']] = key
+            if previous.get(quote['symbol']) != key:
+                changed.append(quote)
+
+        self._last_quotes[name] = current
+        self._snapshots[name] = snapshot
+        if not changed or not self._subscribers:
+            return
+
+        frame = _encode_event(
+            'quotes',
+            {'dataset': name, 'version': snapshot.version, 'changed': changed},
+            event_id=f"{name}:{snapshot.version}",
+        )
+        self.published += 1
+        for sub in list(self._subscribers):
+            self._offer(sub, frame)
+
+    def _offer(self, sub: StreamSubscriber, frame: bytes):
+        try:
+            sub.queue.put_nowait(frame)
+            return
+        except asyncio.QueueFull:
+            pass
+
+        sub.overflows += 1
+        if sub.overflows > self.max_overflows:
+            self._drop(sub)
+            return
+
+        # Coalesce: discard queued deltas, the next read sends a full snapshot
+        while not sub.queue.empty():
+            sub.queue.get_nowait()
+        sub.queue.put_nowait(_RESYNC)
+        self.resyncs += 1
+
+    def _drop(self, sub: StreamSubscriber):
+        sub.closed = True
+        if sub in self._subscribers:
+            self._subscribers.remove(sub)
+        while not sub.queue.empty():
+            sub.queue.get_nowait()
+        sub.queue.put_nowait(None)
+        self.dropped += 1
+        logger.info("Dropped slow quote stream subscriber")
+
+    def snapshot_frame(self) -> bytes:
+        """Full snapshot of every dataset, encoded once per version set"""
+        versions = tuple((name, snap.version) for name, snap in sorted(self._snapshots.items()))
+        if self._snapshot_frame is None or self._snapshot_frame[0] != versions:
+            data = {
+                name: {'version': snap.version, 'items': self._items(name, snap.payload)}
+                for name, snap in self._snapshots.items()
+            }
+            self._snapshot_frame = (versions, _encode_event('snapshot', data))
+        return self._snapshot_frame[1]
+
+    @property
+    def full(self) -> bool:
+        return len(self._subscribers) >= self.max_subscribers
+
+    def subscribe(self) -> Optional[StreamSubscriber]:
+        """Register a client, or None when the subscriber limit is reached"""
+        if len(self._subscribers) >= self.max_subscribers:
+            return None
+        sub = StreamSubscriber(self.queue_size)
+        self._subscribers.append(sub)
+        return sub
+
+    def unsubscribe(self, sub: StreamSubscriber):
+        sub.closed = True
+        if sub in self._subscribers:
+            self._subscribers.remove(sub)
+
+    async def events(self, heartbeat_seconds: float) -> AsyncIterator[bytes]:
+        """
+        Frame iterator for one client: full snapshot first, then deltas
+
+        The client is subscribed on the first read, not before, so one that
+        disconnects before the response starts never holds a slot. If the
+        limit was reached in between, the stream ends after the retry hint
+        and the client reconnects.
+        """
+        yield f"retry: {int(settings.STREAM_RETRY_MS)}\n\n".encode()
+        sub = self.subscribe()
+        if sub is None:
+            return
+        try:
+            if self._snapshots:
+                yield self.snapshot_frame()
+            while not sub.closed:
+                try:
+                    frame = await asyncio.wait_for(sub.queue.get(), timeout=heartbeat_seconds)
+                except asyncio.TimeoutError:
+                    yield b": keep-alive\n\n"
+                    continue
+                if frame is None:
+                    break
+                if frame is _RESYNC:
+                    frame = self.snapshot_frame()
+                self.frames_sent += 1
+                yield frame
+        finally:
+            self.unsubscribe(sub)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'subscribers': len(self._subscribers),
+            'max_subscribers': self.max_subscribers,
+            'published': self.published,
+            'frames_sent': self.frames_sent,
+            'resyncs': self.resyncs,
+            'dropped': self.dropped,
+        }
+
+
+# Singleton instance, fed by the market refresher
+quote_broadcaster = QuoteBroadcaster(
+    queue_size=settings.STREAM_QUEUE_SIZE,
+    max_subscribers=settings.STREAM_MAX_SUBSCRIBERS,
+    max_overflows=settings.STREAM_MAX_OVERFLOWS,
+)
+market_refresher.add_listener(quote_broadcaster.on_snapshot)
@@ -0,0 +1,143 @@
+"""
+Snapshot Diffs - Bounded ring of per-version quote changes for delta polling
+"""
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Deque, Dict, FrozenSet, Optional, Tuple
+from config import settings
+from services.market_data import MarketSnapshot, market_refresher
+from services.quote_stream import CHANGE_FIELDS
+
+# Payload key holding the item list of each dataset that supports deltas
+ITEM_KEYS = {'stocks': 'stocks', 'indices': 'indices'}
+
+# Merged answers remembered per dataset for the current version
+_MERGED_CACHE_SIZE = 32
+
+
+@dataclass(frozen=True)
+class SnapshotDiff:
+    """Symbols that moved between `version - 1` and `version`"""
+    version: int
+    changed: FrozenSet[str]
+    removed: FrozenSet[str]
+
+
+@dataclass
+class _History:
+    version: int
+    keys: Dict[str, tuple]
+    diffs: Deque[SnapshotDiff]
+    merged: Dict[int, Tuple[FrozenSet[str], FrozenSet[str]]] = field(default_factory=dict)
+
+    @property
+    def oldest(self) -> int:
+        """Smallest `since` that can still be answered with a delta"""
+        return self.diffs[0].version - 1 if self.diffs else self.version
+
+
+def parse_token(token: str) -> Tuple[str, int]:
+    """
+    "epoch:version" (a snapshotToken) -> (epoch, version)
+
+    Raises:
+        ValueError: Malformed token
+    """
+    epoch, sep, version = token.rpartition(':')
+    if not sep or not epoch or not version.isdigit():
+        raise ValueError(f"Invalid since token: {token!r}. Pass the snapshotToken of a previous response")
+    return epoch, int(version)
+
+
+class SnapshotDiffLog:
+    """
+    Records which symbols changed at every snapshot version.
+
+    Each refresh is diffed once against the previous version's change keys
+    (price, change, market status) and appended to a fixed-size ring, so a
+    poll carrying `since=<epoch>:N` is answered by merging the few diffs
+    after N instead of comparing full snapshots. A `since` older than the
+    ring, or from another epoch (before a restart), needs a full resync.
+    """
+
+    def __init__(self, history: int):
+        self.history = history
+        self._datasets: Dict[str, _History] = {}
+
+        # Counters
+        self.deltas = 0
+        self.resyncs = 0
+
+    def on_snapshot(self, snapshot: MarketSnapshot):
+        """Refresher listener: record what moved in this version"""
+        key = ITEM_KEYS.get(snapshot.name)
+        if key is None:
+            return
+        keys = {
+            item['symbol']: tuple(item.get(f) for f in CHANGE_FIELDS)
+            for item in snapshot.payload.get(key) or []
+        }
+        history = self._datasets.get(snapshot.name)
+        if history is None or snapshot.version != history.version + 1:
+            # First snapshot, or versions skipped: start a fresh base
+            self._datasets[snapshot.name] = _History(snapshot.version, keys, deque(maxlen=self.history))
+            return
+
+        previous = history.keys
+        changed = frozenset(s for s, k in keys.items() if previous.get(s) != k)
+        removed = frozenset(s for s in previous if s not in keys)
+        history.diffs.append(SnapshotDiff(snapshot.version, changed, removed))
+        history.version = snapshot.version
+        history.keys = keys
+        history.merged.clear()
+
+    def changes_since(self, snapshot: MarketSnapshot,
+                      token: str) -> Optional[Tuple[FrozenSet[str], FrozenSet[str]]]:
+        """
+        (changed, removed) symbols between the `token` version and `snapshot`
+
+        None when the ring cannot answer (another epoch, unknown or too old
+        a version, or a log that has not caught up with `snapshot`) and the
+        caller must send the full snapshot instead.
+
+        Raises:
+            ValueError: `token` is not "epoch:version"
+        """
+        epoch, since = parse_token(token)
+        history = self._datasets.get(snapshot.name)
+        version = snapshot.version
+        if (epoch != snapshot.epoch or history is None or history.version != version
+                or not history.oldest <= since <= version):
+            self.resyncs += 1
+            return None
+        self.deltas += 1
+        merged = history.merged.get(since)
+        if merged is None:
+            changed, removed = set(), set()
+            for diff in reversed(history.diffs):
+                if diff.version <= since:
+                    break
+                # Newest diff wins: a symbol removed then re-added counts as changed
+                changed.update(s for s in diff.changed if s not in removed)
+                removed.update(s for s in diff.removed if s not in changed)
+            merged = (frozenset(changed), frozenset(removed))
+            if len(history.merged) >= _MERGED_CACHE_SIZE:
+                history.merged.pop(next(iter(history.merged)))
+            history.merged[since] = merged
+        return merged
+
+    def stats(self) -> Dict:
+        return {
+            'history': self.history,
+            'deltas': self.deltas,
+            'resyncs': self.resyncs,
+            'datasets': {
+                name: {'version': h.version, 'oldest_since': h.oldest, 'diffs': len(h.diffs)}
+                for name, h in self._datasets.items()
+            },
+        }
+
+
+# Singleton instance
+snapshot_diffs = SnapshotDiffLog(settings.SNAPSHOT_DIFF_HISTORY)
+market_refresher.add_listener(snapshot_diffs.on_snapshot)
@@ -0,0 +1,421 @@
+"""
+Symbol Master - In-memory ticker/company index built from local exchange listing files
+"""
+import asyncio
+import csv
+import io
+import os
+import re
+import time
+from bisect import bisect_left
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+import numpy as np
+from config import settings
+from config.logging_config import logger
+
+LISTING_EXTENSIONS = ('.csv', '.txt')
+
+# Yahoo-style suffixes so search results can be passed straight to yfinance
+EXCHANGE_SUFFIX = {'NSE': '.NS', 'BSE': '.BO'}
+EXCHANGE_CURRENCY = {'NSE': 'INR', 'BSE': 'INR'}
+
+# otherlisted.txt exchange codes
+US_EXCHANGE_CODES = {'A': 'NYSE American', 'N': 'NYSE', 'P': 'NYSE Arca', 'Z': 'CBOE BZX', 'V': 'IEX'}
+
+_NON_ALNUM = re.compile(r'[^A-Z0-9]+')
+
+
+@dataclass(frozen=True)
+class SymbolEntry:
+    symbol: str
+    name: str
+    exchange: str
+    currency: str
+    type: str = 'EQUITY'
+
+    def to_result(self) -> Dict[str, str]:
+        """Same shape as the finance_search results"""
+        return {
+            'symbol': self.symbol,
+            'name': self.name,
+            'exchange': self.exchange,
+            'currency': self.currency,
+            'type': self.type,
+        }
+
+
+def normalize(text: str) -> str:
+    """Upper-case words separated by single spaces; punctuation dropped"""
+    return _NON_ALNUM.sub(' ', text.upper()).strip()
+
+
+def base_ticker(symbol: str) -> str:
+    """RELIANCE.NS -> RELIANCE; BRK.B stays BRK.B"""
+    for suffix in EXCHANGE_SUFFIX.values():
+        if symbol.endswith(suffix):
+            return symbol[:-len(suffix)]
+    return symbol
+
+
+def _trigrams(words: Iterable[str]) -> set:
+    grams = set()
+    for word in words:
+        padded = f' {word} '
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+def _column(header: Dict[str, str], *names: str) -> Optional[str]:
+    """Original header spelling for the first of `names` present (case/space-insensitive)"""
+    for name in names:
+        if name.lower() in header:
+            return header[name.lower()]
+    return None
+
+
+def parse_listing(text: str, default_exchange: str) -> List[SymbolEntry]:
+    """
+    Rows of one listing file
+
+    Recognises NSE EQUITY_L.csv, BSE scrip master, nasdaqlisted.txt and
+    otherlisted.txt (pipe-delimited), and a generic symbol,name[,exchange,
+    currency,type] CSV whose exchange defaults to the file name.
+    """
+    first_line = text.split('\n', 1)[0]
+    delimiter = '|' if first_line.count('|') > first_line.count(',') else ','
+    reader = csv.DictReader(io.StringIO(text), delimiter=delimiter)
+    if not reader.fieldnames:
+        return []
+    header = {f.strip().lower(): f for f in reader.fieldnames if f}
+
+    if 'name of company' in header:
+        exchange = 'NSE'
+        symbol_col, name_col = _column(header, 'SYMBOL'), _column(header, 'NAME OF COMPANY')
+    elif 'security id' in header:
+        exchange = 'BSE'
+        symbol_col, name_col = _column(header, 'Security Id'), _column(header, 'Security Name', 'Issuer Name')
+    elif 'act symbol' in header:
+        exchange = None  # per-row Exchange column
+        symbol_col, name_col = _column(header, 'ACT Symbol'), _column(header, 'Security Name')
+    elif 'security name' in header and 'symbol' in header:
+        exchange = 'NASDAQ'
+        symbol_col, name_col = _column(header, 'Symbol'), _column(header, 'Security Name')
+    else:
+        exchange = None if _column(header, 'exchange') else default_exchange
+        symbol_col, name_col = _column(header, 'symbol', 'ticker'), _column(header, 'name', 'company')
+    if not symbol_col:
+        return []
+
+    exchange_col = _column(header, 'exchange') if exchange is None else None
+    currency_col = _column(header, 'currency')
+    type_col = _column(header, 'type', 'quoteType')
+    etf_col = _column(header, 'ETF')
+    test_col = _column(header, 'Test Issue')
+
+    entries = []
+    for row in reader:
+        raw_symbol = (row.get(symbol_col) or '').strip().upper()
+        # nasdaqtrader files end with a "File Creation Time" row
+        if not raw_symbol or raw_symbol.startswith('FILE CREATION TIME'):
+            continue
+        if test_col and (row.get(test_col) or '').strip() == 'Y':
+            continue
+        row_exchange = exchange
+        if row_exchange is None:
+            code = (row.get(exchange_col) or '').strip()
+            row_exchange = US_EXCHANGE_CODES.get(code, code.upper()) or default_exchange
+        name = (row.get(name_col) or '').strip() if name_col else ''
+        suffix = EXCHANGE_SUFFIX.get(row_exchange, '')
+        symbol = raw_symbol if not suffix or raw_symbol.endswith(suffix) else raw_symbol + suffix
+        currency = ((row.get(currency_col) or '').strip().upper() if currency_col else '') \
+            or EXCHANGE_CURRENCY.get(row_exchange, 'USD')
+        if type_col and (row.get(type_col) or '').strip():
+            entry_type = row[type_col].strip().upper()
+        elif etf_col and (row.get(etf_col) or '').strip() == 'Y':
+            entry_type = 'ETF'
+        else:
+            entry_type = 'EQUITY'
+        entries.append(SymbolEntry(symbol, name or raw_symbol, row_exchange, currency, entry_type))
+    return entries
+
+
+class SymbolIndex:
+    """
+    Immutable search structures over a list of entries.
+
+    Prefix lookups run on two sorted key arrays (tickers and company-name
+    words) with bisection, which answers the same questions as a character
+    trie at a fraction of the memory. Typos fall through to a trigram
+    inverted index scored by how much of the query each entry contains.
+    """
+
+    # Score bands; a better band always outranks a worse one
+    EXACT = 100.0
+    TICKER_PREFIX = 90.0
+    NAME_PREFIX = 70.0
+    FUZZY = 50.0
+    MIN_FUZZY_CONTAINMENT = 0.5
+    # Queries this short match thousands of keys; their results are memoised per index
+    SHORT_QUERY_LEN = 2
+
+    def __init__(self, entries: List[SymbolEntry], exchange_priority: List[str]):
+        self.entries = entries
+        self._by_symbol = {e.symbol: i for i, e in enumerate(entries)}
+        priority = {name: i for i, name in enumerate(exchange_priority)}
+        # Static tie-break: preferred exchange first, then shorter tickers
+        self._rank = np.array(
+            [priority.get(e.exchange, len(priority)) * 100 + len(e.symbol) for e in entries],
+            dtype='i8'
+        )
+
+        tickers: List[Tuple[str, int]] = []
+        words: List[Tuple[str, int, int]] = []
+        grams: Dict[str, List[int]] = {}
+        for i, entry in enumerate(entries):
+            ticker = normalize(base_ticker(entry.symbol)).replace(' ', '')
+            tickers.append((ticker, i))
+            name_words = normalize(entry.name).split()
+            for position, word in enumerate(name_words):
+                words.append((word, i, position))
+            for gram in _trigrams([ticker] + name_words):
+                grams.setdefault(gram, []).append(i)
+
+        tickers.sort()
+        self._ticker_keys = [k for k, _ in tickers]
+        self._ticker_ids = np.array([i for _, i in tickers], dtype='i4')
+        self._ticker_lens = np.array([len(k) for k in self._ticker_keys], dtype='i4')
+
+        words.sort()
+        self._word_keys = [k for k, _, _ in words]
+        self._word_ids = np.array([i for _, i, _ in words], dtype='i4')
+        self._word_pos = np.array([p for _, _, p in words], dtype='i4')
+
+        self._grams = {gram: np.array(ids, dtype='i4') for gram, ids in grams.items()}
+        self._short_results: Dict[Tuple[str, int], List[SymbolEntry]] = {}
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def get(self, symbol: str) -> Optional[SymbolEntry]:
+        i = self._by_symbol.get(symbol.upper())
+        return self.entries[i] if i is not None else None
+
+    @staticmethod
+    def _prefix_range(keys: List[str], prefix: str) -> Tuple[int, int]:
+        return bisect_left(keys, prefix), bisect_left(keys, prefix + '\uffff')
+
+    def _ticker_matches(self, ticker: str) -> Tuple[np.ndarray, np.ndarray]:
+        lo, hi = self._prefix_range(self._ticker_keys, ticker)
+        ids = self._ticker_ids[lo:hi]
+        extra = self._ticker_lens[lo:hi] - len(ticker)
+        scores = np.where(extra == 0, self.EXACT, self.TICKER_PREFIX - np.minimum(extra, 19) * 0.5)
+        return ids, scores
+
+    def _name_matches(self, tokens: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """Entries with a name word starting with every query token"""
+        matched = None
+        first_pos = None
+        for n, token in enumerate(tokens):
+            lo, hi = self._prefix_range(self._word_keys, token)
+            ids, positions = self._word_ids[lo:hi], self._word_pos[lo:hi]
+            if n == 0:
+                # Earliest matching word per entry, for "name starts with" ranking
+                order = np.lexsort((positions, ids))
+                ids, positions = ids[order], positions[order]
+                keep = np.ones(len(ids), dtype=bool)
+                keep[1:] = ids[1:] != ids[:-1]
+                matched, first_pos = ids[keep], positions[keep]
+            else:
+                mask = np.isin(matched, ids)
+                matched, first_pos = matched[mask], first_pos[mask]
+            if len(matched) == 0:
+                break
+        if matched is None:
+            return np.zeros(0, dtype='i4'), np.zeros(0)
+        return matched, self.NAME_PREFIX - np.minimum(first_pos, 9) * 1.0
+
+    def _fuzzy_matches(self, tokens: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+        query_grams = _trigrams(tokens)
+        postings = [self._grams[g] for g in query_grams if g in self._grams]
+        if not postings:
+            return np.zeros(0, dtype='i4'), np.zeros(0)
+        counts = np.bincount(np.concatenate(postings), minlength=len(self.entries))
+        containment = counts / len(query_grams)
+        ids = np.nonzero(containment >= self.MIN_FUZZY_CONTAINMENT)[0]
+        return ids, self.FUZZY * containment[ids]
+
+    def search(self, query: str, limit: int) -> List[SymbolEntry]:
+        """Top `limit` entries for a ticker or company-name fragment"""
+        text = normalize(query)
+        if not text or not self.entries:
+            return []
+        if len(text) <= self.SHORT_QUERY_LEN:
+            key = (text, limit)
+            if key not in self._short_results:
+                self._short_results[key] = self._search(text, limit)
+            return self._short_results[key]
+        return self._search(text, limit)
+
+    def _search(self, text: str, limit: int) -> List[SymbolEntry]:
+        tokens = text.split()
+        found = [self._ticker_matches(text.replace(' ', '')), self._name_matches(tokens)]
+        if sum(len(ids) for ids, _ in found) < limit:
+            found.append(self._fuzzy_matches(tokens))
+
+        ids = np.concatenate([ids for ids, _ in found])
+        if len(ids) == 0:
+            return []
+        scores = np.concatenate([scores for _, scores in found])
+        order = np.lexsort((self._rank[ids], -scores))
+        results = []
+        seen = set()
+        for i in ids[order]:
+            if i in seen:
+                continue
+            seen.add(i)
+            results.append(self.entries[i])
+            if len(results) == limit:
+                break
+        return results
+
+
+class SymbolMaster:
+    """
+    Owns the current SymbolIndex and rebuilds it when the listing files change.
+
+    A rebuild happens off the event loop and replaces the index reference in
+    one assignment, so searches never see a half-built index.
+    """
+
+    def __init__(self, directory: str, reload_seconds: float, exchange_priority: List[str]):
+        self.directory = directory
+        self.reload_seconds = reload_seconds
+        self.exchange_priority = exchange_priority
+        self._index = SymbolIndex([], exchange_priority)
+        self._signature: Optional[Tuple] = None
+        self._task: Optional[asyncio.Task] = None
+
+        # Counters
+        self.searches = 0
+        self.reloads = 0
+        self.load_errors = 0
+        self.loaded_at: Optional[float] = None
+        self.last_load_ms = 0.0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def _listing_files(self) -> List[str]:
+        if not os.path.isdir(self.directory):
+            return []
+        return sorted(
+            os.path.join(self.directory, name) for name in os.listdir(self.directory)
+            if name.lower().endswith(LISTING_EXTENSIONS)
+        )
+
+    def _scan(self) -> Tuple:
+        signature = []
+        for path in self._listing_files():
+            stat = os.stat(path)
+            signature.append((path, stat.st_mtime_ns, stat.st_size))
+        return tuple(signature)
+
+    def load(self, force: bool = False) -> bool:
+        """
+        Rebuild the index if any listing file was added, removed or modified
+
+        Returns:
+            True when a new index was installed
+        """
+        signature = self._scan()
+        if signature == self._signature and not force:
+            return False
+
+        start = time.perf_counter()
+        entries: List[SymbolEntry] = []
+        seen = set()
+        for path, _, _ in signature:
+            default_exchange = os.path.splitext(os.path.basename(path))[0].upper()
+            try:
+                with open(path, encoding='utf-8-sig', errors='replace') as f:
+                    parsed = parse_listing(f.read(), default_exchange)
+            except Exception as e:
+                self.load_errors += 1
+                logger.error(f"Failed to read listing file {path}: {e}")
+                continue
+            # First file wins for a symbol listed twice
+            for entry in parsed:
+                if entry.symbol not in seen:
+                    seen.add(entry.symbol)
+                    entries.append(entry)
+
+        self._index = SymbolIndex(entries, self.exchange_priority)
+        self._signature = signature
+        self.reloads += 1
+        self.loaded_at = time.time()
+        self.last_load_ms = (time.perf_counter() - start) * 1000
+        logger.info(f"🔎 Symbol master loaded {len(entries)} symbols from {len(signature)} file(s) "
+                    f"in {self.last_load_ms:.0f}ms")
+        return True
+
+    def search(self, query: str, limit: Optional[int] = None) -> List[Dict[str, str]]:
+        """Ranked search results in the finance_search result shape"""
+        self.searches += 1
+        limit = limit or settings.SYMBOL_SEARCH_MAX_RESULTS
+        return [entry.to_result() for entry in self._index.search(query, limit)]
+
+    def get(self, symbol: str) -> Optional[SymbolEntry]:
+        """Exact symbol lookup (Yahoo-style, e.g. RELIANCE.NS)"""
+        return self._index.get(symbol)
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            try:
+                await loop.run_in_executor(None, self.load)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.load_errors += 1
+                logger.error(f"Symbol master reload failed: {e}")
+            await asyncio.sleep(self.reload_seconds)
+
+    def start(self):
+        """Load the listing files and keep watching them for changes"""
+        if not self.running:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> Dict:
+        return {
+            'directory': self.directory,
+            'symbols': len(self._index),
+            'files': len(self._signature or ()),
+            'searches': self.searches,
+            'reloads': self.reloads,
+            'load_errors': self.load_errors,
+            'last_load_ms': round(self.last_load_ms, 2),
+            'loaded_at': self.loaded_at,
+            'watching': self.running,
+        }
+
+
+# Singleton instance
+symbol_master = SymbolMaster(
+    settings.SYMBOL_MASTER_DIR,
+    settings.SYMBOL_MASTER_RELOAD_SECONDS,
+    settings.SYMBOL_EXCHANGE_PRIORITY,
+)
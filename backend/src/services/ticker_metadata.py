@@ -0,0 +1,357 @@
+"""
+Ticker Metadata - SQLite-backed cache of yfinance `.info` fields (name, exchange, currency, sector)
+"""
+import asyncio
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass, replace
+from typing import Awaitable, Dict, Iterable, Optional
+import yfinance as yf
+from config import settings
+from config.logging_config import logger
+from utils.yf_executor import yf_executor, ExecutorSaturated
+
+# Column -> yfinance .info key(s), first non-empty wins
+INFO_FIELDS = {
+    'name': ('longName', 'shortName'),
+    'exchange': ('exchange',),
+    'currency': ('currency',),
+    'quote_type': ('quoteType',),
+    'sector': ('sector',),
+    'industry': ('industry',),
+    'country': ('country',),
+}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS ticker_metadata (
+    symbol TEXT PRIMARY KEY,
+    name TEXT,
+    exchange TEXT,
+    currency TEXT,
+    quote_type TEXT,
+    sector TEXT,
+    industry TEXT,
+    country TEXT,
+    found INTEGER NOT NULL,
+    fetched_at REAL NOT NULL
+)
+"""
+_COLUMNS = ('symbol',) + tuple(INFO_FIELDS) + ('found', 'fetched_at')
+
+
+def _consume_error(task: asyncio.Future):
+    """Mark a background lookup's exception as retrieved (it was already logged)"""
+    if not task.cancelled():
+        task.exception()
+
+
+@dataclass(frozen=True)
+class TickerMetadata:
+    symbol: str
+    name: Optional[str] = None
+    exchange: Optional[str] = None
+    currency: Optional[str] = None
+    quote_type: Optional[str] = None
+    sector: Optional[str] = None
+    industry: Optional[str] = None
+    country: Optional[str] = None
+    found: bool = True
+    fetched_at: float = 0.0
+
+    def age(self) -> float:
+        return time.time() - self.fetched_at
+
+    @classmethod
+    def from_info(cls, symbol: str, info: Optional[Dict]) -> 'TickerMetadata':
+        info = info or {}
+        values = {}
+        for column, keys in INFO_FIELDS.items():
+            values[column] = next((info[k] for k in keys if info.get(k)), None)
+        # yfinance answers unknown tickers with a near-empty dict rather than an error
+        found = bool(values['name'] or values['quote_type'])
+        return cls(symbol=symbol, found=found, fetched_at=time.time(), **values)
+
+
+class TickerMetadataCache:
+    """
+    Every known symbol lives in memory; SQLite makes the set survive restarts.
+
+    Entries older than the TTL are still served and revalidated in the
+    background (stale-while-revalidate), since names and currencies rarely
+    change. Symbols yfinance answers as unknown are cached as not-found for
+    a shorter TTL; a failed lookup is only remembered in memory, for
+    `retry_seconds`, so an outage never hides a real ticker for long.
+    Concurrent lookups of the same missing symbol share one upstream call.
+    """
+
+    def __init__(self, path: str, ttl_seconds: float, negative_ttl_seconds: float,
+                 warm_concurrency: int, retry_seconds: float = 60.0):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.negative_ttl_seconds = negative_ttl_seconds
+        self.retry_seconds = retry_seconds
+        self.warm_concurrency = warm_concurrency
+        self._memory: Dict[str, TickerMetadata] = {}
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._conn: Optional[sqlite3.Connection] = None
+        self._db_lock = threading.Lock()
+        self._warm_task: Optional[asyncio.Task] = None
+
+        # Counters
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.fetches = 0
+        self.fetch_errors = 0
+        self.warmed = 0
+
+    # -- storage ---------------------------------------------------------
+
+    def open(self):
+        """Open the database and load every row into memory (blocking)"""
+        with self._db_lock:
+            if self._conn is not None:
+                return
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(_SCHEMA)
+            rows = conn.execute(f"SELECT {', '.join(_COLUMNS)} FROM ticker_metadata").fetchall()
+            for row in rows:
+                values = dict(zip(_COLUMNS, row))
+                values['found'] = bool(values['found'])
+                self._memory[values['symbol']] = TickerMetadata(**values)
+            self._conn = conn
+        logger.info(f"🗂️ Ticker metadata cache loaded {len(rows)} symbols from {self.path}")
+
+    def close(self):
+        with self._db_lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def _save(self, meta: TickerMetadata):
+        self.open()
+        row = tuple(getattr(meta, column) for column in _COLUMNS)
+        with self._db_lock:
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO ticker_metadata ({', '.join(_COLUMNS)}) "
+                f"VALUES ({', '.join('?' * len(_COLUMNS))})",
+                row,
+            )
+            self._conn.commit()
+
+    # -- lookups ---------------------------------------------------------
+
+    def _retry_soon(self, meta: TickerMetadata) -> TickerMetadata:
+        """`meta` dated so that it expires `retry_seconds` from now"""
+        ttl = self.ttl_seconds if meta.found else self.negative_ttl_seconds
+        return replace(meta, fetched_at=time.time() - max(0.0, ttl - self.retry_seconds))
+
+    def _expired(self, meta: TickerMetadata) -> bool:
+        ttl = self.ttl_seconds if meta.found else self.negative_ttl_seconds
+        return meta.age() > ttl
+
+    def peek(self, symbol: str) -> Optional[TickerMetadata]:
+        """Cached entry (fresh or stale) without touching the network"""
+        if self._conn is None:
+            self.open()
+        return self._memory.get(symbol.upper())
+
+    async def get(self, symbol: str) -> Optional[TickerMetadata]:
+        """
+        Metadata for one symbol, fetching through yfinance only on a miss
+
+        Returns:
+            TickerMetadata, or None when the symbol is unknown upstream
+
+        Raises:
+            ExecutorSaturated / asyncio.TimeoutError: on a miss the upstream call could not run
+        """
+        symbol = symbol.upper()
+        meta = self.peek(symbol)
+        if meta is not None:
+            if self._expired(meta):
+                self.stale_hits += 1
+                self._revalidate(symbol)
+            else:
+                self.hits += 1
+            return meta if meta.found else None
+
+        self.misses += 1
+        meta = await self._fetch_shared(symbol)
+        return meta if meta.found else None
+
+    async def get_many(self, symbols: Iterable[str],
+                       timeout: Optional[float] = None) -> Dict[str, TickerMetadata]:
+        """
+        Metadata for many symbols; misses are fetched concurrently up to `timeout`
+
+        Lookups that do not finish in time keep running in the background and
+        are simply absent from this result.
+        """
+        symbols = list(dict.fromkeys(s.upper() for s in symbols if s))
+        found: Dict[str, TickerMetadata] = {}
+        pending = {}
+        for symbol in symbols:
+            meta = self.peek(symbol)
+            if meta is not None:
+                if self._expired(meta):
+                    self.stale_hits += 1
+                    self._revalidate(symbol)
+                else:
+                    self.hits += 1
+                if meta.found:
+                    found[symbol] = meta
+            else:
+                self.misses += 1
+                task = asyncio.ensure_future(self._fetch_shared(symbol))
+                task.add_done_callback(_consume_error)
+                pending[symbol] = task
+
+        if pending:
+            done, _ = await asyncio.wait(pending.values(), timeout=timeout)
+            for symbol, task in pending.items():
+                if task in done and not task.cancelled() and task.exception() is None \
+                        and task.result().found:
+                    found[symbol] = task.result()
+        return found
+
+    def _revalidate(self, symbol: str):
+        """Refresh a stale entry without making the caller wait"""
+        if symbol not in self._inflight:
+            task = asyncio.ensure_future(self._fetch_shared(symbol))
+            task.add_done_callback(_consume_error)
+
+    def _fetch_shared(self, symbol: str) -> Awaitable:
+        if symbol in self._inflight:
+            self.coalesced += 1
+        else:
+            self._inflight[symbol] = asyncio.ensure_future(self._fetch(symbol))
+        # Shield so a disconnecting client cannot cancel the shared lookup
+        return asyncio.shield(self._inflight[symbol])
+
+    async def _fetch(self, symbol: str) -> TickerMetadata:
+        try:
+            return await yf_executor.run(self._fetch_blocking, symbol)
+        finally:
+            self._inflight.pop(symbol, None)
+
+    def _fetch_blocking(self, symbol: str) -> TickerMetadata:
+        """yfinance .info -> cache row (runs in a yf_executor worker)"""
+        self.fetches += 1
+        try:
+            info = yf.Ticker(symbol).info
+        except Exception as e:
+            self.fetch_errors += 1
+            previous = self._memory.get(symbol)
+            if previous is not None:
+                # Keep serving what we had and retry shortly
+                logger.warning(f"Metadata revalidation failed for {symbol}: {e}")
+                meta = self._retry_soon(previous)
+            else:
+                # Not an answer about the ticker: memory only, never persisted as not-found
+                logger.warning(f"Metadata lookup failed for {symbol}: {e}")
+                meta = self._retry_soon(TickerMetadata(symbol=symbol, found=False))
+            self._memory[symbol] = meta
+            return meta
+        else:
+            meta = TickerMetadata.from_info(symbol, info)
+            previous = self._memory.get(symbol)
+            if not meta.found and previous is not None and previous.found:
+                # A flaky empty answer must not wipe a known-good entry
+                meta = replace(previous, fetched_at=time.time())
+        self._memory[symbol] = meta
+        self._save(meta)
+        return meta
+
+    # -- bulk warm-up ----------------------------------------------------
+
+    @property
+    def warming(self) -> bool:
+        return self._warm_task is not None and not self._warm_task.done()
+
+    async def warm_up(self, symbols: Iterable[str]) -> int:
+        """
+        Fetch every symbol that is missing or past its TTL
+
+        At most `warm_concurrency` lookups run at once so interactive
+        requests keep most of the yfinance executor.
+
+        Returns:
+            Number of symbols fetched
+        """
+        todo = []
+        for symbol in dict.fromkeys(s.upper() for s in symbols if s):
+            meta = self.peek(symbol)
+            if meta is None or self._expired(meta):
+                todo.append(symbol)
+        if not todo:
+            return 0
+
+        logger.info(f"🗂️ Warming ticker metadata for {len(todo)} symbols")
+        semaphore = asyncio.Semaphore(self.warm_concurrency)
+        fetched = 0
+
+        async def warm(symbol: str):
+            nonlocal fetched
+            async with semaphore:
+                try:
+                    await self._fetch_shared(symbol)
+                    fetched += 1
+                    self.warmed += 1
+                except ExecutorSaturated:
+                    # Interactive traffic has the executor; pick it up next warm-up
+                    pass
+                except Exception as e:
+                    logger.warning(f"Metadata warm-up failed for {symbol}: {e}")
+
+        await asyncio.gather(*(warm(symbol) for symbol in todo))
+        return fetched
+
+    def start_warm_up(self, symbols: Iterable[str]) -> bool:
+        """Run warm_up in the background; False if one is already running"""
+        if self.warming:
+            return False
+        self._warm_task = asyncio.create_task(self.warm_up(list(symbols)))
+        return True
+
+    async def stop(self):
+        if self._warm_task is not None:
+            self._warm_task.cancel()
+            try:
+                await self._warm_task
+            except asyncio.CancelledError:
+                pass
+            self._warm_task = None
+        self.close()
+
+    def stats(self) -> Dict:
+        lookups = self.hits + self.stale_hits + self.misses
+        return {
+            'path': self.path,
+            'symbols': len(self._memory),
+            'ttl_seconds': self.ttl_seconds,
+            'hits': self.hits,
+            'stale_hits': self.stale_hits,
+            'misses': self.misses,
+            'coalesced': self.coalesced,
+            'hit_ratio': round((self.hits + self.stale_hits) / lookups, 4) if lookups else 0.0,
+            'upstream_fetches': self.fetches,
+            'fetch_errors': self.fetch_errors,
+            'warmed': self.warmed,
+            'warming': self.warming,
+        }
+
+
+# Singleton instance
+ticker_metadata = TickerMetadataCache(
+    settings.TICKER_METADATA_DB,
+    ttl_seconds=settings.TICKER_METADATA_TTL_SECONDS,
+    negative_ttl_seconds=settings.TICKER_METADATA_NEGATIVE_TTL_SECONDS,
+    warm_concurrency=settings.TICKER_METADATA_WARM_CONCURRENCY,
+    retry_seconds=settings.TICKER_METADATA_RETRY_SECONDS,
+)
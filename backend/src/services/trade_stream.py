@@ -0,0 +1,267 @@
+"""
+Trade Stream - Finnhub WebSocket trade ingestion into an array-backed tick store
+"""
+import asyncio
+import json
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional
+import numpy as np
+from config import settings
+from config.logging_config import logger
+
+try:
+    import websockets
+except Exception:
+    websockets = None
+
+MS_PER_DAY = 86_400_000
+
+
+class TickStore:
+    """
+    Last trade, day OHLC and volume per symbol in parallel NumPy arrays.
+
+    Each symbol owns one slot; a trade updates a handful of scalars in place,
+    so ingestion allocates nothing per tick beyond the decoded message. Days
+    roll over on the UTC date of the trade timestamp.
+    """
+
+    def __init__(self, capacity: int = 64):
+        self._slots: Dict[str, int] = {}
+        self._names: List[str] = []
+        self._allocate(capacity)
+        self.ticks = 0
+
+    def _allocate(self, capacity: int):
+        self.last = np.zeros(capacity, dtype=np.float64)
+        self.open = np.zeros(capacity, dtype=np.float64)
+        self.high = np.zeros(capacity, dtype=np.float64)
+        self.low = np.zeros(capacity, dtype=np.float64)
+        self.volume = np.zeros(capacity, dtype=np.float64)
+        self.prev_close = np.zeros(capacity, dtype=np.float64)
+        self.last_ts = np.zeros(capacity, dtype=np.int64)
+        self.day = np.full(capacity, -1, dtype=np.int64)
+        self.trade_count = np.zeros(capacity, dtype=np.int64)
+
+    def _grow(self):
+        capacity = len(self.last) * 2
+        for attr in ('last', 'open', 'high', 'low', 'volume', 'prev_close', 'last_ts', 'trade_count'):
+            old = getattr(self, attr)
+            new = np.zeros(capacity, dtype=old.dtype)
+            new[:len(old)] = old
+            setattr(self, attr, new)
+        day = np.full(capacity, -1, dtype=np.int64)
+        day[:len(self.day)] = self.day
+        self.day = day
+
+    def slot(self, symbol: str) -> int:
+        """Slot index for a symbol, allocating one on first use"""
+        idx = self._slots.get(symbol)
+        if idx is None:
+            idx = len(self._names)
+            if idx >= len(self.last):
+                self._grow()
+            self._slots[symbol] = idx
+            self._names.append(symbol)
+        return idx
+
+    def has(self, symbol: str) -> bool:
+        idx = self._slots.get(symbol)
+        return idx is not None and self.last[idx] > 0
+
+    @property
+    def symbols(self) -> List[str]:
+        return list(self._names)
+
+    def seed(self, symbol: str, prev_close: float, open_price: float, high: float,
+             low: float, last: float, ts_ms: int):
+        """Initialise a slot from a REST quote before trades arrive"""
+        idx = self.slot(symbol)
+        self.prev_close[idx] = prev_close
+        self.open[idx] = open_price
+        self.high[idx] = high
+        self.low[idx] = low
+        self.last[idx] = last or prev_close
+        self.last_ts[idx] = ts_ms
+        self.day[idx] = ts_ms // MS_PER_DAY
+
+    def apply_trade(self, symbol: str, price: float, volume: float, ts_ms: int):
+        """Fold one trade into the symbol's day bar"""
+        idx = self.slot(symbol)
+        day = ts_ms // MS_PER_DAY
+        if day != self.day[idx]:
+            # New session: yesterday's last becomes the reference close
+            if self.day[idx] >= 0 and self.last[idx] > 0:
+                self.prev_close[idx] = self.last[idx]
+            self.day[idx] = day
+            self.open[idx] = price
+            self.high[idx] = price
+            self.low[idx] = price
+            self.volume[idx] = 0.0
+        else:
+            if price > self.high[idx]:
+                self.high[idx] = price
+            if price < self.low[idx] or self.low[idx] == 0:
+                self.low[idx] = price
+        self.last[idx] = price
+        self.volume[idx] += volume
+        if ts_ms > self.last_ts[idx]:
+            self.last_ts[idx] = ts_ms
+        self.trade_count[idx] += 1
+        self.ticks += 1
+
+    def apply_trades(self, trades: Iterable[Dict[str, Any]]):
+        """Apply a Finnhub `trade` message's data list"""
+        for trade in trades:
+            self.apply_trade(trade['s'], float(trade['p']), float(trade.get('v') or 0), int(trade['t']))
+
+    def quote(self, symbol: str, name: str, open_within_seconds: float = 300) -> Optional[Dict[str, Any]]:
+        """Quote dict in the same shape as routes.stocks.fetch_quote"""
+        idx = self._slots.get(symbol)
+        if idx is None or self.last[idx] <= 0:
+            return None
+        last = float(self.last[idx])
+        prev_close = float(self.prev_close[idx])
+        change = ((last - prev_close) / prev_close * 100) if prev_close else 0
+        ts = int(self.last_ts[idx]) // 1000
+        return {
+            'symbol': symbol.replace('.NS', ''),
+            'name': name,
+            'price': round(last, 2),
+            'change': round(change, 2),
+            'high': round(float(self.high[idx]), 2),
+            'low': round(float(self.low[idx]), 2),
+            'open': round(float(self.open[idx]), 2),
+            'previousClose': round(prev_close, 2),
+            'volume': float(self.volume[idx]),
+            'isMarketOpen': (time.time() - ts) < open_within_seconds,
+            'timestamp': ts
+        }
+
+
+class FinnhubTradeStream:
+    """
+    Consumes a Finnhub-style WebSocket trade feed into a TickStore.
+
+    Reconnects with exponential backoff and re-sends every subscription on
+    each new connection. Works against any server speaking the same
+    subscribe/trade/ping messages (see scripts/replay_trades_server.py).
+    """
+
+    def __init__(self, url: str, token: str, store: TickStore, reconnect_max_seconds: float = 30):
+        self.url = url
+        self.token = token
+        self.store = store
+        self.reconnect_max_seconds = reconnect_max_seconds
+        self._symbols: List[str] = []
+        self._listeners: List[Callable[[List[Dict[str, Any]]], None]] = []
+        self._ws = None
+        self._task: Optional[asyncio.Task] = None
+
+        # Counters
+        self.connects = 0
+        self.messages = 0
+        self.errors = 0
+        self.connected_since: Optional[float] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    @property
+    def connected(self) -> bool:
+        return self.connected_since is not None
+
+    def add_listener(self, listener: Callable[[List[Dict[str, Any]]], None]):
+        """Call `listener(trades)` with every trade message's data list, after the store"""
+        self._listeners.append(listener)
+
+    def _connect_url(self) -> str:
+        if not self.token:
+            return self.url
+        sep = '&' if '?' in self.url else '?'
+        return f"{self.url}{sep}token={self.token}"
+
+    async def subscribe(self, symbols: Iterable[str]):
+        """Track symbols; sent now if connected and again after every reconnect"""
+        new = [s for s in symbols if s not in self._symbols]
+        self._symbols.extend(new)
+        if self._ws is not None:
+            for symbol in new:
+                await self._ws.send(json.dumps({'type': 'subscribe', 'symbol': symbol}))
+
+    async def _run(self):
+        backoff = 1.0
+        while True:
+            try:
+                async with websockets.connect(self._connect_url(), ping_interval=20, max_queue=1024) as ws:
+                    self._ws = ws
+                    self.connects += 1
+                    self.connected_since = time.time()
+                    backoff = 1.0
+                    logger.info(f"📡 Trade stream connected ({len(self._symbols)} symbols)")
+                    for symbol in self._symbols:
+                        await ws.send(json.dumps({'type': 'subscribe', 'symbol': symbol}))
+
+                    async for raw in ws:
+                        self.messages += 1
+                        message = json.loads(raw)
+                        if message.get('type') == 'trade':
+                            trades = message.get('data') or []
+                            self.store.apply_trades(trades)
+                            for listener in self._listeners:
+                                try:
+                                    listener(trades)
+                                except Exception as e:
+                                    logger.error(f"Trade listener failed: {e}")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.errors += 1
+                logger.warning(f"Trade stream disconnected: {e}; reconnecting in {backoff:.0f}s")
+            finally:
+                self._ws = None
+                self.connected_since = None
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, self.reconnect_max_seconds)
+
+    def start(self, symbols: Iterable[str]):
+        """Start ingestion for `symbols` on the running loop"""
+        if websockets is None:
+            logger.error("websockets not installed. Run: pip install websockets")
+            return
+        self._symbols = list(dict.fromkeys(list(self._symbols) + list(symbols)))
+        if not self.running:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Cancel ingestion and close the socket"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+            logger.info("🧹 Stopped trade stream")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'running': self.running,
+            'connected': self.connected,
+            'connects': self.connects,
+            'messages': self.messages,
+            'errors': self.errors,
+            'ticks': self.store.ticks,
+            'symbols': len(self._symbols),
+        }
+
+
+# Singleton instances
+tick_store = TickStore()
+trade_stream = FinnhubTradeStream(
+    settings.FINNHUB_WS_URL,
+    settings.FINANCEHUB_API_KEY or '',
+    tick_store,
+    reconnect_max_seconds=settings.TRADE_STREAM_RECONNECT_MAX_SECONDS,
+)
@@ -0,0 +1,265 @@
+"""
+Market Universe - Tracked live-quote symbols, sharded refresh and paged snapshot queries
+"""
+import csv
+from typing import AbstractSet, Any, Dict, Iterable, List, Optional, Sequence, Tuple
+from config import settings
+from config.logging_config import logger
+from services.exchange_calendar import exchange_for
+
+# Tracked when no universe file or symbol list is configured
+DEFAULT_UNIVERSE = {
+    'AAPL': 'Apple Inc.',
+    'MSFT': 'Microsoft Corporation',
+    'GOOGL': 'Alphabet Inc.',
+    'AMZN': 'Amazon.com Inc.',
+    'NVDA': 'NVIDIA Corporation',
+    'META': 'Meta Platforms Inc.',
+    'TSLA': 'Tesla Inc.',
+    'JPM': 'JPMorgan Chase & Co.',
+    'V': 'Visa Inc.',
+    'WMT': 'Walmart Inc.'
+}
+
+# Index symbols tracked by /stocks/indices, refreshed every cycle on the same quota as the universe
+INDEX_SYMBOLS = {
+    '^GSPC': 'S&P 500',
+    '^DJI': 'Dow Jones',
+    '^IXIC': 'NASDAQ'
+}
+
+# /stocks/live item fields clients may sort on
+SORT_FIELDS = ('symbol', 'name', 'price', 'change', 'high', 'low', 'open', 'previousClose', 'timestamp')
+
+# Distinct filtered/sorted views remembered per snapshot
+_VIEW_CACHE_SIZE = 64
+
+
+def display_symbol(symbol: str) -> str:
+    """Symbol as it appears in /stocks/live items (NSE suffix dropped)"""
+    return symbol.replace('.NS', '')
+
+
+def parse_universe(text: str) -> Dict[str, str]:
+    """
+    "symbol[,name]" lines -> {symbol: name}
+
+    Blank lines and `#` comments are skipped, as is a leading header row
+    whose first cell is "symbol" or "ticker". Later duplicates are ignored.
+    """
+    symbols: Dict[str, str] = {}
+    lines = (line for line in text.splitlines() if line.strip() and not line.lstrip().startswith('#'))
+    for row in csv.reader(lines):
+        if not row or not row[0].strip():
+            continue
+        symbol = row[0].strip().upper()
+        if not symbols and symbol in ('SYMBOL', 'TICKER'):
+            continue
+        name = row[1].strip() if len(row) > 1 and row[1].strip() else symbol
+        symbols.setdefault(symbol, name)
+    return symbols
+
+
+def load_universe(path: str, symbols: Sequence[str]) -> Dict[str, str]:
+    """Universe from `path` plus `symbols`, falling back to DEFAULT_UNIVERSE"""
+    universe: Dict[str, str] = {}
+    if path:
+        try:
+            with open(path, encoding='utf-8-sig') as f:
+                universe = parse_universe(f.read())
+        except OSError as e:
+            logger.warning(f"Could not read market universe file {path}: {e}")
+    for symbol in symbols:
+        universe.setdefault(symbol.upper(), symbol.upper())
+    if not universe:
+        return dict(DEFAULT_UNIVERSE)
+    logger.info(f"📋 Market universe: {len(universe)} symbols")
+    return universe
+
+
+def quota_shard_size(rate_per_minute: float, interval_seconds: float, reserved_calls: int = 0) -> int:
+    """
+    Symbols one refresh cycle can fetch without outrunning the quota
+
+    `reserved_calls` are made every cycle by other datasets (the indices)
+    and come out of the same budget.
+    """
+    return max(1, int(rate_per_minute * interval_seconds / 60) - reserved_calls)
+
+
+class QuoteTable:
+    """
+    Read-only query view over one snapshot's quote list.
+
+    Built once per snapshot: sort orders are computed lazily per field and
+    filtered views are remembered, so repeated polls for the same page cost
+    a slice rather than a sort over the whole universe.
+    """
+
+    def __init__(self, items: List[Dict[str, Any]]):
+        self.items = items
+        self._positions = {item['symbol']: i for i, item in enumerate(items)}
+        self._search_keys: Optional[List[str]] = None
+        self._orders: Dict[Tuple[str, bool], List[int]] = {}
+        self._views: Dict[tuple, Sequence[int]] = {}
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def select(self, symbols: Iterable[str]) -> List[Dict[str, Any]]:
+        """Items for the given item symbols, in table order"""
+        found = sorted(i for i in (self._positions.get(s) for s in symbols) if i is not None)
+        return [self.items[i] for i in found]
+
+    def order(self, sort: str) -> List[int]:
+        """
+        Item indexes sorted by `sort` ("field" ascending, "-field" descending)
+
+        Missing values sort last in both directions.
+
+        Raises:
+            ValueError: Unknown sort field
+        """
+        descending = sort.startswith('-')
+        field = sort.lstrip('-+')
+        if field not in SORT_FIELDS:
+            raise ValueError(f"Unsupported sort field: {field}. Use one of: {', '.join(SORT_FIELDS)}")
+        key = (field, descending)
+        order = self._orders.get(key)
+        if order is None:
+            present = [i for i, item in enumerate(self.items) if item.get(field) is not None]
+            missing = [i for i, item in enumerate(self.items) if item.get(field) is None]
+            if field in ('symbol', 'name'):
+                sort_key = lambda i: str(self.items[i][field]).lower()  # noqa: E731
+            else:
+                sort_key = lambda i: self.items[i][field]  # noqa: E731
+            order = sorted(present, key=sort_key, reverse=descending) + missing
+            self._orders[key] = order
+        return order
+
+    def _matches(self, q: Optional[str], symbols: Optional[Iterable[str]],
+                 market_open: Optional[bool]) -> bytearray:
+        mask = bytearray(b'\x01') * len(self.items)
+        if symbols is not None:
+            mask = bytearray(len(self.items))
+            for symbol in symbols:
+                i = self._positions.get(display_symbol(symbol.upper()))
+                if i is not None:
+                    mask[i] = 1
+        if q:
+            if self._search_keys is None:
+                self._search_keys = [
+                    f"{item['symbol']}\x00{item.get('name') or ''}".lower() for item in self.items
+                ]
+            needle = q.lower()
+            for i, key in enumerate(self._search_keys):
+                if mask[i] and needle not in key:
+                    mask[i] = 0
+        if market_open is not None:
+            for i, item in enumerate(self.items):
+                if mask[i] and bool(item.get('isMarketOpen')) != market_open:
+                    mask[i] = 0
+        return mask
+
+    def query(self, q: Optional[str] = None, symbols: Optional[Sequence[str]] = None,
+              market_open: Optional[bool] = None, sort: Optional[str] = None,
+              offset: int = 0, limit: Optional[int] = None) -> Tuple[int, List[Dict[str, Any]]]:
+        """
+        (matching total, page of items) for the given filters, sort and window
+
+        Raises:
+            ValueError: Unknown sort field
+        """
+        view_key = (q.lower() if q else None, tuple(symbols) if symbols is not None else None,
+                    market_open, sort)
+        view = self._views.get(view_key)
+        if view is None:
+            view = self.order(sort) if sort else range(len(self.items))
+            if q or symbols is not None or market_open is not None:
+                mask = self._matches(q, symbols, market_open)
+                view = [i for i in view if mask[i]]
+            if len(self._views) >= _VIEW_CACHE_SIZE:
+                self._views.pop(next(iter(self._views)))
+            self._views[view_key] = view
+        end = None if limit is None else offset + limit
+        return len(view), [self.items[i] for i in view[offset:end]]
+
+
+class MarketUniverse:
+    """
+    The tracked symbol list plus the last good quote for each symbol.
+
+    Each refresh cycle fetches only the next `shard_size` symbols in
+    round-robin order and merges them into the quote book, so a universe
+    of thousands is covered over several cycles without exceeding the
+    upstream quota. Symbols whose fetch fails keep their previous quote.
+    """
+
+    def __init__(self, symbols: Dict[str, str], shard_size: int):
+        self.symbols = symbols
+        self.shard_size = max(1, min(shard_size, len(symbols)))
+        self._order = list(symbols)
+        self._positions = {display_symbol(s): i for i, s in enumerate(self._order)}
+        self._cursor = 0
+        self._quotes: Dict[str, Dict[str, Any]] = {}
+
+        # Counters
+        self.shards_fetched = 0
+        self.full_passes = 0
+
+    def __len__(self) -> int:
+        return len(self._order)
+
+    def __contains__(self, symbol: str) -> bool:
+        return display_symbol(symbol.upper()) in self._positions
+
+    def next_shard(self) -> Dict[str, str]:
+        """Next `shard_size` symbols as {symbol: name}, wrapping around the universe"""
+        start = self._cursor
+        shard = [self._order[(start + i) % len(self._order)] for i in range(self.shard_size)]
+        self._cursor = (start + self.shard_size) % len(self._order)
+        if self._cursor <= start:
+            self.full_passes += 1
+        self.shards_fetched += 1
+        return {symbol: self.symbols[symbol] for symbol in shard}
+
+    def exchanges(self) -> Tuple[str, ...]:
+        """Calendar names of every venue the universe trades on"""
+        return tuple(sorted({exchange_for(symbol) for symbol in self._order}))
+
+    def merge(self, quotes: Iterable[Dict[str, Any]],
+              open_exchanges: Optional[AbstractSet[str]] = None) -> List[Dict[str, Any]]:
+        """
+        Fold fetched quotes into the book; every known quote in universe order
+
+        With `open_exchanges`, quotes from earlier shards get their
+        isMarketOpen flag replaced (never mutated: older snapshots share them)
+        so a session change shows up without waiting for every shard.
+        """
+        for quote in quotes:
+            self._quotes[quote['symbol']] = quote
+        if open_exchanges is not None:
+            for symbol, quote in self._quotes.items():
+                is_open = quote.get('exchange') in open_exchanges
+                if quote.get('isMarketOpen') != is_open:
+                    self._quotes[symbol] = {**quote, 'isMarketOpen': is_open}
+        return sorted(self._quotes.values(), key=lambda q: self._positions.get(q['symbol'], len(self._order)))
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'symbols': len(self._order),
+            'quoted': len(self._quotes),
+            'shard_size': self.shard_size,
+            'shards_fetched': self.shards_fetched,
+            'full_passes': self.full_passes,
+        }
+
+
+# Singleton instance
+market_universe = MarketUniverse(
+    load_universe(settings.MARKET_UNIVERSE_FILE, settings.MARKET_UNIVERSE_SYMBOLS),
+    settings.MARKET_UNIVERSE_SHARD_SIZE or quota_shard_size(
+        settings.FINNHUB_RATE_PER_MINUTE, settings.MARKET_REFRESH_INTERVAL_SECONDS,
+        reserved_calls=len(INDEX_SYMBOLS),
+    ),
+)
@@ -0,0 +1,125 @@
+"""
+Candle helpers - Convert OHLCV history frames into API candle payloads
+"""
+from typing import Dict, List
+import numpy as np
+import pandas as pd
+
+CANDLE_SHAPES = ('rows', 'columns')
+
+
+def _iso_timestamps(index: pd.DatetimeIndex) -> List[str]:
+    """
+    Same strings as `ts.isoformat()` per bar, built column-wise
+
+    Wall-clock times are formatted by NumPy in one call and the UTC offset
+    suffix (only a handful of distinct values per frame) is appended per
+    distinct offset rather than per bar.
+    """
+    if len(index) == 0:
+        return []
+    if index.tz is None:
+        wall = index
+        offsets = None
+    else:
+        wall = index.tz_localize(None)
+        utc = index.tz_convert('UTC').tz_localize(None)
+        offsets = (wall.as_unit('s').asi8 - utc.as_unit('s').asi8)
+
+    has_fraction = bool((wall.as_unit('us').asi8 % 1_000_000).any())
+    text = np.datetime_as_string(wall.values, unit='us' if has_fraction else 's')
+    if has_fraction:
+        # isoformat() drops the fraction on whole-second bars
+        text = np.char.replace(text, '.000000', '')
+    if offsets is None:
+        return text.tolist()
+
+    distinct, inverse = np.unique(offsets, return_inverse=True)
+    suffixes = []
+    for offset in distinct:
+        sign = '+' if offset >= 0 else '-'
+        hours, minutes = divmod(abs(int(offset)) // 60, 60)
+        suffixes.append(f"{sign}{hours:02d}:{minutes:02d}")
+    suffix = np.array(suffixes)[inverse]
+    return np.char.add(text, suffix).tolist()
+
+
+def _columns(hist: pd.DataFrame) -> Dict[str, list]:
+    volume = np.nan_to_num(hist["Volume"].to_numpy(dtype='f8'), nan=0.0)
+    return {
+        "ts": _iso_timestamps(hist.index),
+        "open": hist["Open"].to_numpy(dtype='f8').tolist(),
+        "high": hist["High"].to_numpy(dtype='f8').tolist(),
+        "low": hist["Low"].to_numpy(dtype='f8').tolist(),
+        "close": hist["Close"].to_numpy(dtype='f8').tolist(),
+        "volume": volume.astype('i8').tolist(),
+    }
+
+
+def history_to_candles(hist: pd.DataFrame) -> List[Dict]:
+    """Row-per-bar candle dicts: ts/open/high/low/close/volume"""
+    if hist.empty:
+        return []
+    cols = _columns(hist)
+    return [
+        {"ts": ts, "open": o, "high": h, "low": lo, "close": c, "volume": v}
+        for ts, o, h, lo, c, v in zip(
+            cols["ts"], cols["open"], cols["high"], cols["low"], cols["close"], cols["volume"]
+        )
+    ]
+
+
+def history_to_columns(hist: pd.DataFrame) -> Dict[str, list]:
+    """Columnar candles: {"ts": [...], "open": [...], ..., "volume": [...]}"""
+    if hist.empty:
+        return {key: [] for key in ("ts", "open", "high", "low", "close", "volume")}
+    return _columns(hist)
+
+
+def history_to_arrays(hist: pd.DataFrame) -> Dict[str, np.ndarray]:
+    """
+    NumPy columns for binary encoders: ts as naive UTC datetime64, OHLCV as float64
+
+    The OHLC arrays are views of the frame where its dtypes already match, so
+    Arrow export does not copy them.
+    """
+    index = hist.index
+    if index.tz is not None:
+        index = index.tz_convert('UTC').tz_localize(None)
+    return {
+        "ts": index.values,
+        "open": hist["Open"].to_numpy(dtype='f8'),
+        "high": hist["High"].to_numpy(dtype='f8'),
+        "low": hist["Low"].to_numpy(dtype='f8'),
+        "close": hist["Close"].to_numpy(dtype='f8'),
+        "volume": np.nan_to_num(hist["Volume"].to_numpy(dtype='f8'), nan=0.0),
+    }
+
+
+def history_to_payload(hist: pd.DataFrame, shape: str = "rows"):
+    """
+    Candles in the requested shape
+
+    Raises:
+        ValueError: Unknown shape
+    """
+    if shape == "rows":
+        return history_to_candles(hist)
+    if shape == "columns":
+        return history_to_columns(hist)
+    raise ValueError(f"Unsupported shape: {shape}. Use one of: {', '.join(CANDLE_SHAPES)}")
+
+
+def empty_history() -> pd.DataFrame:
+    """OHLCV frame with no bars, for callers that treat "no data" as an empty result"""
+    return pd.DataFrame(
+        {col: pd.Series(dtype='f8') for col in ("Open", "High", "Low", "Close", "Volume")},
+        index=pd.DatetimeIndex([], tz='UTC', name='Date'),
+    )
+
+
+def last_close(hist: pd.DataFrame):
+    """Close of the most recent bar, or None for an empty frame"""
+    if hist.empty:
+        return None
+    return float(hist["Close"].iloc[-1])
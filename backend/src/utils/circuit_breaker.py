@@ -0,0 +1,108 @@
+"""
+Circuit Breaker - Stop calling an upstream after repeated failures, probe it again later
+"""
+import time
+from collections import deque
+from typing import Dict, Optional
+import numpy as np
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class CircuitBreaker:
+    """
+    Classic three-state breaker.
+
+    `failure_threshold` consecutive failures open the circuit; calls are
+    refused until `reset_seconds` pass, then a single probe is let through
+    (half-open). A successful probe closes the circuit, a failed one opens
+    it again for another full period.
+    """
+
+    def __init__(self, name: str, failure_threshold: int, reset_seconds: float):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+
+        # Counters
+        self.opened = 0
+        self.rejected = 0
+
+    @property
+    def state(self) -> str:
+        if self._state == OPEN and time.monotonic() - self._opened_at >= self.reset_seconds:
+            return HALF_OPEN
+        return self._state
+
+    def allow(self) -> bool:
+        """True if a call may go out now (claims the probe slot when half-open)"""
+        state = self.state
+        if state == CLOSED:
+            return True
+        if state == HALF_OPEN and not self._probe_in_flight:
+            self._state = HALF_OPEN
+            self._probe_in_flight = True
+            return True
+        self.rejected += 1
+        return False
+
+    def record_success(self):
+        self._failures = 0
+        self._probe_in_flight = False
+        self._state = CLOSED
+
+    def record_failure(self):
+        self._failures += 1
+        if self._state == HALF_OPEN or self._failures >= self.failure_threshold:
+            if self._state != OPEN:
+                self.opened += 1
+            self._state = OPEN
+            self._opened_at = time.monotonic()
+        self._probe_in_flight = False
+
+    def release(self):
+        """Give back a probe slot whose call ended without a verdict (e.g. cancelled)"""
+        self._probe_in_flight = False
+
+    def stats(self) -> Dict:
+        return {
+            'state': self.state,
+            'consecutive_failures': self._failures,
+            'opened': self.opened,
+            'rejected': self.rejected,
+        }
+
+
+class LatencyTracker:
+    """Sliding window of recent call latencies (ms) with percentile lookups"""
+
+    def __init__(self, window: int = 256):
+        self._samples: deque = deque(maxlen=window)
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def add(self, ms: float):
+        self._samples.append(ms)
+
+    def percentile(self, q: float) -> Optional[float]:
+        if not self._samples:
+            return None
+        return float(np.percentile(np.fromiter(self._samples, dtype='f8'), q))
+
+    def stats(self) -> Dict:
+        if not self._samples:
+            return {'samples': 0, 'p50_ms': None, 'p95_ms': None, 'p99_ms': None}
+        p50, p95, p99 = np.percentile(np.fromiter(self._samples, dtype='f8'), [50, 95, 99])
+        return {
+            'samples': len(self._samples),
+            'p50_ms': round(float(p50), 2),
+            'p95_ms': round(float(p95), 2),
+            'p99_ms': round(float(p99), 2),
+        }
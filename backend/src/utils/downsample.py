@@ -0,0 +1,106 @@
+"""
+Chart Downsampling - LTTB for line charts and OHLC bucket aggregation for candles
+"""
+from typing import Optional
+import numpy as np
+import pandas as pd
+
+# ?downsample= values: lttb keeps representative bars, ohlc merges bars into wider candles
+DOWNSAMPLE_METHODS = ('ohlc', 'lttb')
+
+# LTTB always keeps the first and last bar plus at least one bucket between them
+MIN_POINTS = {'ohlc': 1, 'lttb': 3}
+
+
+def _bucket_edges(n: int, buckets: int) -> np.ndarray:
+    """Start offsets of `buckets` contiguous, near-equal slices of range(n)"""
+    return np.arange(buckets, dtype='i8') * n // buckets
+
+
+def lttb_indices(y: np.ndarray, max_points: int, x: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets: positions of `max_points` samples of `y`
+
+    The first and last samples are always kept. The rest are split into
+    max_points - 2 buckets and from each the sample forming the largest
+    triangle with the previously kept sample and the next bucket's average
+    is chosen, which keeps peaks and troughs that plain striding drops.
+    `x` defaults to the sample position (bars evenly spaced on the chart).
+
+    Bucket averages are computed for all buckets at once; only the choice
+    per bucket, which depends on the previous one, runs bucket by bucket.
+    """
+    n = len(y)
+    if max_points >= n or max_points < 3:
+        return np.arange(n)
+    y = np.asarray(y, dtype='f8')
+    x = np.arange(n, dtype='f8') if x is None else np.asarray(x, dtype='f8')
+
+    starts = _bucket_edges(n - 2, max_points - 2) + 1
+    ends = np.append(starts[1:], n - 1)
+    # Gaps (NaN closes) are left out of the averages and never win a bucket
+    finite = np.isfinite(y)
+    inner = slice(0, n - 1)
+    sums_y = np.add.reduceat(np.where(finite, y, 0.0)[inner], starts)
+    sums_x = np.add.reduceat(np.where(finite, x, 0.0)[inner], starts)
+    counts = np.maximum(np.add.reduceat(finite[inner].astype('i8'), starts), 1)
+    # Next-bucket averages; the last bucket looks ahead to the final sample
+    avg_x = np.append((sums_x / counts)[1:], x[-1])
+    avg_y = np.append((sums_y / counts)[1:], y[-1] if finite[-1] else 0.0)
+
+    out = np.empty(max_points, dtype='i8')
+    out[0], out[-1] = 0, n - 1
+    a = 0
+    for i, (start, end) in enumerate(zip(starts.tolist(), ends.tolist())):
+        bx, by = x[start:end], y[start:end]
+        # Twice the triangle area, up to sign: |(ax - cx)(by - ay) - (ax - bx)(cy - ay)|
+        area = np.abs((x[a] - avg_x[i]) * (by - y[a]) - (x[a] - bx) * (avg_y[i] - y[a]))
+        a = start + int(np.argmax(np.nan_to_num(area, nan=-1.0)))
+        out[i + 1] = a
+    return out
+
+
+def ohlc_bucket_starts(n: int, max_points: int) -> np.ndarray:
+    """Start offsets of the bar groups merged into each output candle"""
+    return _bucket_edges(n, min(max_points, n))
+
+
+def downsample_history(hist: pd.DataFrame, max_points: Optional[int],
+                       method: str = 'ohlc') -> pd.DataFrame:
+    """
+    OHLCV frame reduced to at most `max_points` bars
+
+    ohlc: consecutive bars are merged into one candle each (first open,
+    highest high, lowest low, last close, summed volume, first timestamp),
+    so every wick and gap in the range is still drawn.
+    lttb: the bars chosen by LTTB on the close are kept unchanged.
+
+    Frames already within the limit are returned as is.
+
+    Raises:
+        ValueError: Unknown method or max_points below its minimum
+    """
+    if method not in DOWNSAMPLE_METHODS:
+        raise ValueError(f"Unsupported downsample method: {method}. Use one of: {', '.join(DOWNSAMPLE_METHODS)}")
+    if max_points is None:
+        return hist
+    if max_points < MIN_POINTS[method]:
+        raise ValueError(f"max_points must be at least {MIN_POINTS[method]} for {method}")
+    if len(hist) <= max_points:
+        return hist
+
+    if method == 'lttb':
+        out = hist.iloc[lttb_indices(hist['Close'].to_numpy(dtype='f8'), max_points)]
+    else:
+        starts = ohlc_bucket_starts(len(hist), max_points)
+        ends = np.append(starts[1:], len(hist)) - 1
+        out = pd.DataFrame({
+            'Open': hist['Open'].to_numpy(dtype='f8')[starts],
+            # fmax/fmin skip NaN bars instead of blanking the whole bucket
+            'High': np.fmax.reduceat(hist['High'].to_numpy(dtype='f8'), starts),
+            'Low': np.fmin.reduceat(hist['Low'].to_numpy(dtype='f8'), starts),
+            'Close': hist['Close'].to_numpy(dtype='f8')[ends],
+            'Volume': np.add.reduceat(np.nan_to_num(hist['Volume'].to_numpy(dtype='f8'), nan=0.0), starts),
+        }, index=hist.index[starts])
+    out.attrs = dict(hist.attrs)
+    return out
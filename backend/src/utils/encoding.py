@@ -0,0 +1,262 @@
+"""
+Response Encoding - Accept-header negotiation between JSON, MessagePack and Arrow IPC
+"""
+import gzip
+import json
+import math
+from datetime import date, datetime
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from fastapi import HTTPException, Request
+from fastapi.responses import Response
+from config import settings
+from utils.http_cache import VARY, body_etag, etag_matches, not_modified
+
+# Optional encoders; JSON always works through the stdlib fallback
+try:
+    import orjson
+except Exception:
+    orjson = None
+
+try:
+    import msgpack
+except Exception:
+    msgpack = None
+
+try:
+    import pyarrow as pa
+except Exception:
+    pa = None
+
+try:
+    import brotli
+except Exception:
+    brotli = None
+
+JSON = 'application/json'
+MSGPACK = 'application/msgpack'
+ARROW_STREAM = 'application/vnd.apache.arrow.stream'
+
+# Other spellings clients send for the same formats
+MEDIA_ALIASES = {
+    'application/x-msgpack': MSGPACK,
+    'application/vnd.msgpack': MSGPACK,
+    'application/vnd.apache.arrow.file': ARROW_STREAM,
+}
+
+# Arrow schema metadata key holding the non-tabular part of the payload as JSON
+ARROW_PAYLOAD_KEY = b'payload'
+
+
+class EncodingError(RuntimeError):
+    """
+    A payload the server built could not be encoded
+
+    Deliberately not a ValueError: routes map ValueError to 400, and this
+    is a server fault (500), not bad client input.
+    """
+
+
+def available_media_types() -> List[str]:
+    """Media types this process can encode, in server preference order"""
+    media = [JSON]
+    if msgpack is not None:
+        media.append(MSGPACK)
+    if pa is not None:
+        media.append(ARROW_STREAM)
+    return media
+
+
+def _parse_header(value: Optional[str]) -> List[Tuple[str, float]]:
+    """`a/b;q=0.5, c/d` -> [(token, q)] sorted by q, keeping client order on ties"""
+    items = []
+    for part in (value or '').split(','):
+        token, _, params = part.strip().partition(';')
+        token = token.strip().lower()
+        if not token:
+            continue
+        q = 1.0
+        for param in params.split(';'):
+            key, _, val = param.strip().partition('=')
+            if key == 'q':
+                try:
+                    q = float(val)
+                except ValueError:
+                    q = 0.0
+        items.append((token, q))
+    return sorted(items, key=lambda item: -item[1])
+
+
+def negotiate(request: Request) -> str:
+    """
+    Pick the response media type from the Accept header
+
+    Missing, wildcard or unrecognised Accept values get JSON, as before.
+
+    Raises:
+        HTTPException: 406 when the client only accepts a known format this
+            process cannot produce (e.g. Arrow without pyarrow installed)
+    """
+    offered = available_media_types()
+    unavailable = False
+    for media, q in _parse_header(request.headers.get('accept')):
+        if q <= 0:
+            continue
+        media = MEDIA_ALIASES.get(media, media)
+        if media in ('*/*', 'application/*') or media in offered:
+            return JSON if media.endswith('*') else media
+        if media in (MSGPACK, ARROW_STREAM):
+            unavailable = True
+    if unavailable:
+        raise HTTPException(status_code=406, detail=f"Supported media types: {', '.join(offered)}")
+    return JSON
+
+
+def _default(obj):
+    """Fallback for values the encoders do not handle natively"""
+    if isinstance(obj, (np.generic, np.ndarray)):
+        return obj.tolist()
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    raise TypeError(f"Object of type {type(obj).__name__} is not serializable")
+
+
+def _finite(obj):
+    """Copy of `obj` with NaN/inf floats as None (what orjson writes for them)"""
+    if isinstance(obj, float):
+        return obj if math.isfinite(obj) else None
+    if isinstance(obj, dict):
+        return {key: _finite(value) for key, value in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_finite(value) for value in obj]
+    if isinstance(obj, (np.generic, np.ndarray)):
+        return _finite(obj.tolist())
+    return obj
+
+
+def dumps_json(payload) -> bytes:
+    """Compact JSON; orjson when installed, else the stdlib with Starlette's settings"""
+    if orjson is not None:
+        return orjson.dumps(payload, default=_default, option=orjson.OPT_SERIALIZE_NUMPY)
+    try:
+        text = json.dumps(payload, default=_default, ensure_ascii=False, allow_nan=False, separators=(',', ':'))
+    except ValueError:
+        # NaN/inf somewhere in the payload: write them as null, as orjson does
+        text = json.dumps(_finite(payload), default=_default, ensure_ascii=False, allow_nan=False,
+                          separators=(',', ':'))
+    return text.encode('utf-8')
+
+
+def dumps_msgpack(payload) -> bytes:
+    return msgpack.packb(payload, default=_default, use_bin_type=True)
+
+
+def _arrow_column(values):
+    if isinstance(values, np.ndarray) and values.dtype.kind == 'M':
+        # Naive datetime64 columns are UTC by convention (see utils.candles)
+        unit = np.datetime_data(values.dtype)[0]
+        return pa.array(values, type=pa.timestamp(unit, tz='UTC'))
+    # Contiguous numeric NumPy columns without nulls are wrapped, not copied
+    return pa.array(values)
+
+
+def dumps_arrow(payload: Dict, table_key: Optional[str] = None,
+                columns: Optional[Dict[str, object]] = None) -> bytes:
+    """
+    Arrow IPC stream of the tabular part of `payload`
+
+    The table comes from `columns` (NumPy arrays, exported without copying)
+    when given, otherwise from payload[table_key] - a list of row dicts or a
+    dict of columns. Every other key is stored as JSON in the schema metadata.
+    """
+    rows = payload.get(table_key) if table_key else None
+    if columns is None and isinstance(rows, dict):
+        columns = rows
+    if columns is not None:
+        table = pa.table({name: _arrow_column(values) for name, values in columns.items()})
+    else:
+        table = pa.Table.from_pylist(rows or [])
+
+    rest = {key: value for key, value in payload.items() if key != table_key}
+    table = table.replace_schema_metadata({ARROW_PAYLOAD_KEY: dumps_json(rest)})
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def encode(payload, media: str, table_key: Optional[str] = None,
+           columns: Optional[Dict[str, object]] = None) -> bytes:
+    """
+    Raises:
+        EncodingError: The payload cannot be written in `media`
+    """
+    try:
+        if media == MSGPACK:
+            return dumps_msgpack(payload)
+        if media == ARROW_STREAM:
+            return dumps_arrow(payload, table_key, columns)
+        return dumps_json(payload)
+    except Exception as e:
+        raise EncodingError(f"Could not encode response as {media}: {e}") from e
+
+
+def pick_content_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """Highest-q coding we support; brotli wins ties with gzip"""
+    supported = ['br', 'gzip'] if brotli is not None else ['gzip']
+    accepted = {}
+    for coding, q in _parse_header(accept_encoding):
+        if coding == '*':
+            for name in supported:
+                accepted.setdefault(name, q)
+        elif coding in supported:
+            accepted[coding] = q
+    best = None
+    for name in supported:
+        q = accepted.get(name, 0.0)
+        if q > 0 and (best is None or q > accepted[best]):
+            best = name
+    return best
+
+
+def compress(body: bytes, coding: str) -> bytes:
+    if coding == 'br':
+        return brotli.compress(body, quality=settings.RESPONSE_BROTLI_QUALITY)
+    # Fixed mtime keeps equal bodies byte-identical, so their ETags match
+    return gzip.compress(body, compresslevel=settings.RESPONSE_GZIP_LEVEL, mtime=0)
+
+
+def encode_response(request: Request, payload, media: Optional[str] = None,
+                    table_key: Optional[str] = None,
+                    columns: Optional[Dict[str, object]] = None,
+                    status_code: int = 200,
+                    etag: Optional[str] = None,
+                    cache_control: Optional[str] = None) -> Response:
+    """
+    Encode `payload` in the negotiated format, compressed above the size threshold
+
+    Args:
+        media: Result of negotiate(); negotiated here when omitted
+        table_key: Payload key holding the rows/columns exported as the Arrow table
+        columns: NumPy columns to export to Arrow instead of payload[table_key]
+        etag: Validator for this representation; with `cache_control` set and
+            no etag, one is derived from the encoded bytes
+        cache_control: Cache-Control header value; makes the response cacheable
+            and answers a matching If-None-Match with 304
+    """
+    media = media or negotiate(request)
+    body = encode(payload, media, table_key, columns)
+    headers = {'Vary': VARY}
+    if len(body) >= settings.RESPONSE_COMPRESS_MIN_BYTES:
+        coding = pick_content_encoding(request.headers.get('accept-encoding'))
+        if coding:
+            body = compress(body, coding)
+            headers['Content-Encoding'] = coding
+    if cache_control is not None:
+        etag = etag or body_etag(body)
+        if status_code == 200 and etag_matches(request, etag):
+            return not_modified(etag, cache_control)
+        headers['Cache-Control'] = cache_control
+    if etag is not None:
+        headers['ETag'] = etag
+    return Response(content=body, status_code=status_code, media_type=media, headers=headers)
@@ -0,0 +1,66 @@
+"""
+Excel Reader - Single-pass .xlsx reader that finds the header row of a broker export
+"""
+from typing import Any, Callable, Iterable, List, Optional, Sequence
+import pandas as pd
+from openpyxl import load_workbook
+
+# Broker exports put the table header within the first few rows (title, client and summary rows above it)
+HEADER_SCAN_ROWS = 50
+
+
+def _header_names(cells: Sequence[Any], width: int) -> List[Any]:
+    """pandas-style header: blank cells become 'Unnamed: i', repeats get '.1', '.2', ..."""
+    names, seen = [], {}
+    for i in range(width):
+        cell = cells[i] if i < len(cells) else None
+        name = f"Unnamed: {i}" if cell is None or (isinstance(cell, str) and not cell.strip()) else cell
+        if name in seen:
+            seen[name] += 1
+            name = f"{name}.{seen[name]}"
+        else:
+            seen[name] = 0
+        names.append(name)
+    return names
+
+
+def _frame(header: Sequence[Any], rows: Iterable[Sequence[Any]]) -> pd.DataFrame:
+    """Rows after the header as a frame with per-column dtypes inferred once"""
+    rows = list(rows)
+    width = len(header)
+    while width and header[width - 1] is None:
+        width -= 1
+    # Cells past the last header cell only become (Unnamed) columns when they hold data
+    width = max([width] + [len(row) for row in rows if any(v is not None for v in row[width:])])
+    data = [row[:width] if len(row) >= width else tuple(row) + (None,) * (width - len(row)) for row in rows]
+    frame = pd.DataFrame.from_records(data, columns=_header_names(header, width), coerce_float=True)
+    return frame.infer_objects()
+
+
+def read_excel_auto_header(source, is_header: Callable[[Sequence[Any]], bool],
+                           scan_rows: int = HEADER_SCAN_ROWS) -> Optional[pd.DataFrame]:
+    """
+    First worksheet as a frame whose columns come from the detected header row
+
+    The workbook is streamed once with openpyxl in read-only mode: rows are
+    offered to `is_header` (their non-empty cell values) until it accepts
+    one within the first `scan_rows` rows, and every row after it is
+    collected straight into the frame. Rows above the header are dropped.
+
+    Returns:
+        The frame, or None when no header row was found (the caller picks
+        a fallback)
+    """
+    workbook = load_workbook(source, read_only=True, data_only=True)
+    try:
+        sheet = workbook.worksheets[0]
+        # Without this, a sheet lacking a <dimension> tag is parsed once just to size it
+        sheet.reset_dimensions()
+        rows = sheet.iter_rows(values_only=True)
+        for _, row in zip(range(scan_rows), rows):
+            if is_header([v for v in row if v is not None]):
+                return _frame(row, rows)
+        return None
+    finally:
+        workbook.close()
+
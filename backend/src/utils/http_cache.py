@@ -0,0 +1,62 @@
+"""
+HTTP Cache - ETags, conditional GETs and Cache-Control for polled endpoints
+"""
+import hashlib
+from typing import Optional
+from fastapi import Request
+from fastapi.responses import Response
+
+# Representation headers every cached response varies on
+VARY = 'Accept, Accept-Encoding'
+
+
+def cache_control(max_age: float, stale_while_revalidate: float, private: bool = False) -> str:
+    """Cache-Control value letting caches serve a stale copy while they revalidate"""
+    scope = 'private' if private else 'public'
+    return f"{scope}, max-age={int(max_age)}, stale-while-revalidate={int(stale_while_revalidate)}"
+
+
+def _digest(data: bytes) -> str:
+    return hashlib.blake2b(data, digest_size=12).hexdigest()
+
+
+def body_etag(body: bytes) -> str:
+    """Strong ETag over the exact bytes sent"""
+    return f'"{_digest(body)}"'
+
+
+def version_etag(name: str, version: int, *variant) -> str:
+    """
+    Weak ETag for one snapshot version without encoding the body
+
+    `variant` must hold everything else that shapes the content: query
+    parameters, media type, content coding and freshness flags. The tag is
+    weak because the body also carries the snapshot age, which changes
+    while the version does not: equivalent content, not identical bytes.
+    """
+    return f'W/"{name}.{version}.{_digest(repr(variant).encode())}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """If-None-Match check (weak comparison, as RFC 9110 requires for GET)"""
+    header = request.headers.get('if-none-match')
+    if not header:
+        return False
+    if header.strip() == '*':
+        return True
+    tag = etag[2:] if etag.startswith('W/') else etag
+    for candidate in header.split(','):
+        candidate = candidate.strip()
+        if candidate.startswith('W/'):
+            candidate = candidate[2:]
+        if candidate == tag:
+            return True
+    return False
+
+
+def not_modified(etag: str, cache_control_value: Optional[str] = None) -> Response:
+    """Empty 304 carrying the validators a cache needs to refresh its copy"""
+    headers = {'ETag': etag, 'Vary': VARY}
+    if cache_control_value:
+        headers['Cache-Control'] = cache_control_value
+    return Response(status_code=304, headers=headers)
@@ -0,0 +1,76 @@
+"""
+HTTP Client - One long-lived, connection-pooled httpx client for upstream market data
+"""
+from typing import Optional
+import httpx
+from config import settings
+from config.logging_config import logger
+
+_client: Optional[httpx.AsyncClient] = None
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+        return True
+    except Exception:
+        return False
+
+
+def create_http_client() -> httpx.AsyncClient:
+    """
+    Build the shared AsyncClient from settings
+
+    Keep-alive connections are reused across requests so finnhub.io and the
+    FinanceHub host only pay the TCP+TLS handshake once per pooled connection.
+    """
+    http2 = settings.HTTP2_ENABLED
+    if http2 and not _http2_available():
+        logger.warning("HTTP2_ENABLED is set but 'h2' is not installed (pip install httpx[http2]); using HTTP/1.1")
+        http2 = False
+
+    limits = httpx.Limits(
+        max_connections=settings.HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections=settings.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY,
+    )
+    timeout = httpx.Timeout(
+        settings.HTTP_READ_TIMEOUT,
+        connect=settings.HTTP_CONNECT_TIMEOUT,
+        pool=settings.HTTP_POOL_TIMEOUT,
+    )
+    return httpx.AsyncClient(limits=limits, timeout=timeout, http2=http2)
+
+
+async def init_http_client() -> httpx.AsyncClient:
+    """Create the shared client (called from the app lifespan)"""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = create_http_client()
+        logger.info(
+            f"🌐 Shared HTTP client ready (max_connections={settings.HTTP_MAX_CONNECTIONS}, "
+            f"keepalive={settings.HTTP_MAX_KEEPALIVE_CONNECTIONS})"
+        )
+    return _client
+
+
+async def close_http_client():
+    """Close the shared client and release pooled connections"""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+        logger.info("🧹 Closed shared HTTP client")
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """
+    Return the shared client
+
+    Falls back to creating it lazily so scripts and tests that bypass the
+    lifespan still get a pooled client.
+    """
+    global _client
+    if _client is None or _client.is_closed:
+        _client = create_http_client()
+    return _client
@@ -0,0 +1,189 @@
+"""
+Technical Indicators - SMA/EMA/RSI/MACD/Bollinger Bands over NumPy close arrays
+"""
+from typing import Callable, Dict, List, Tuple
+import numpy as np
+import pandas as pd
+
+# Indicator name -> default parameters
+INDICATORS = {
+    'sma': (20,),
+    'ema': (20,),
+    'rsi': (14,),
+    'macd': (12, 26, 9),
+    'bbands': (20, 2),
+}
+ALIASES = {'bb': 'bbands', 'bollinger': 'bbands'}
+DEFAULT_SET = 'sma:20,ema:50,rsi:14,macd:12:26:9,bbands:20:2'
+
+Spec = Tuple[str, Tuple[float, ...]]
+
+
+def _param(value: str) -> float:
+    number = float(value)
+    return int(number) if number.is_integer() else number
+
+
+def parse_set(text: str) -> List[Spec]:
+    """
+    "sma:20,ema:50,rsi,macd:12:26:9,bb:20:2" -> [(name, params), ...]
+
+    Missing parameters take the defaults in INDICATORS; duplicates are dropped.
+
+    Raises:
+        ValueError: Unknown indicator, wrong parameter count or bad period
+    """
+    specs: List[Spec] = []
+    for part in (text or DEFAULT_SET).split(','):
+        part = part.strip().lower()
+        if not part:
+            continue
+        name, *raw = part.split(':')
+        name = ALIASES.get(name, name)
+        if name not in INDICATORS:
+            raise ValueError(f"Unknown indicator: {name}. Use one of: {', '.join(INDICATORS)}")
+        defaults = INDICATORS[name]
+        if len(raw) > len(defaults):
+            raise ValueError(f"{name} takes at most {len(defaults)} parameter(s)")
+        try:
+            params = tuple(_param(v) for v in raw) + defaults[len(raw):]
+        except ValueError:
+            raise ValueError(f"Invalid parameters for {name}: {':'.join(raw)}")
+        # Periods are whole bar counts; only the Bollinger width may be fractional
+        periods = params[:1] if name == 'bbands' else params
+        if any(not isinstance(p, int) or p < 1 for p in periods) or params[-1] <= 0:
+            raise ValueError(f"Invalid parameters for {name}: {':'.join(str(p) for p in params)}")
+        if (name, params) not in specs:
+            specs.append((name, params))
+    if not specs:
+        raise ValueError("Indicator set is empty")
+    return specs
+
+
+def spec_label(spec: Spec) -> str:
+    """Column suffix for a spec, e.g. ("macd", (12, 26, 9)) -> "12_26_9" """
+    return '_'.join(f"{p:g}" for p in spec[1])
+
+
+def lookback(specs: List[Spec]) -> int:
+    """Bars of history needed before every indicator in `specs` has settled"""
+    bars = 0
+    for name, params in specs:
+        if name in ('sma', 'bbands'):
+            bars = max(bars, params[0])
+        elif name == 'macd':
+            # Exponential averages need a few periods to forget their seed
+            bars = max(bars, params[1] * 3 + params[2])
+        else:
+            bars = max(bars, params[0] * 3)
+    return bars
+
+
+def sma(x: np.ndarray, n: int) -> np.ndarray:
+    """Simple moving average; NaN until `n` values are available"""
+    out = np.full(len(x), np.nan)
+    if len(x) >= n:
+        c = np.cumsum(np.insert(x, 0, 0.0))
+        out[n - 1:] = (c[n:] - c[:-n]) / n
+    return out
+
+
+def _smoothed(x: np.ndarray, n: int, alpha: float) -> np.ndarray:
+    """
+    Exponential smoothing seeded with the mean of the first `n` valid values
+
+    Leading NaNs (e.g. from another indicator's warm-up) are skipped. The
+    recursion itself runs in pandas' compiled ewm kernel.
+    """
+    out = np.full(len(x), np.nan)
+    valid = np.flatnonzero(~np.isnan(x))
+    if len(valid) == 0 or len(x) - valid[0] < n:
+        return out
+    start = valid[0] + n - 1
+    values = x[start:].copy()
+    values[0] = x[valid[0]:start + 1].mean()
+    out[start:] = pd.Series(values).ewm(alpha=alpha, adjust=False).mean().to_numpy()
+    return out
+
+
+def ema(x: np.ndarray, n: int) -> np.ndarray:
+    """Exponential moving average (alpha = 2 / (n + 1)), SMA-seeded"""
+    return _smoothed(x, n, 2.0 / (n + 1))
+
+
+def rsi(x: np.ndarray, n: int) -> np.ndarray:
+    """Wilder's relative strength index (0-100)"""
+    out = np.full(len(x), np.nan)
+    if len(x) <= n:
+        return out
+    delta = np.diff(x)
+    avg_gain = _smoothed(np.clip(delta, 0, None), n, 1.0 / n)
+    avg_loss = _smoothed(np.clip(-delta, 0, None), n, 1.0 / n)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        value = 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+    # No losses in the window: fully overbought (flat windows read 50)
+    value = np.where(avg_loss == 0, np.where(avg_gain == 0, 50.0, 100.0), value)
+    value[np.isnan(avg_gain)] = np.nan
+    out[1:] = value
+    return out
+
+
+def bbands(x: np.ndarray, n: int, k: float, middle: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """(upper, lower) bands `k` population standard deviations around `middle`"""
+    upper = np.full(len(x), np.nan)
+    lower = np.full(len(x), np.nan)
+    if len(x) >= n:
+        std = np.lib.stride_tricks.sliding_window_view(x, n).std(axis=1)
+        upper[n - 1:] = middle[n - 1:] + k * std
+        lower[n - 1:] = middle[n - 1:] - k * std
+    return upper, lower
+
+
+def nullable(values: np.ndarray) -> list:
+    """Float column -> list with None where NaN (warm-up), for JSON/MessagePack"""
+    return np.where(np.isnan(values), None, values).tolist()
+
+
+def compute(close: np.ndarray, specs: List[Spec]) -> Dict[str, np.ndarray]:
+    """
+    Every indicator in `specs` over one close array, sharing intermediates
+
+    Moving averages are computed once per period however many indicators
+    use them (e.g. ema:12 alongside macd:12:26:9, sma:20 with bbands:20).
+    Output columns are float64 arrays aligned with `close`, NaN where the
+    indicator has not warmed up yet.
+    """
+    close = np.ascontiguousarray(close, dtype='f8')
+    memo: Dict[tuple, np.ndarray] = {}
+
+    def cached(key: tuple, fn: Callable[[], np.ndarray]) -> np.ndarray:
+        if key not in memo:
+            memo[key] = fn()
+        return memo[key]
+
+    columns: Dict[str, np.ndarray] = {}
+    for spec in specs:
+        name, params = spec
+        label = spec_label(spec)
+        if name == 'sma':
+            columns[f"sma_{label}"] = cached(('sma', params[0]), lambda: sma(close, params[0]))
+        elif name == 'ema':
+            columns[f"ema_{label}"] = cached(('ema', params[0]), lambda: ema(close, params[0]))
+        elif name == 'rsi':
+            columns[f"rsi_{label}"] = rsi(close, params[0])
+        elif name == 'macd':
+            fast, slow, signal = params
+            line = (cached(('ema', fast), lambda: ema(close, fast))
+                    - cached(('ema', slow), lambda: ema(close, slow)))
+            signal_line = ema(line, signal)
+            columns[f"macd_{label}"] = line
+            columns[f"macd_signal_{label}"] = signal_line
+            columns[f"macd_hist_{label}"] = line - signal_line
+        elif name == 'bbands':
+            n, k = params
+            middle = cached(('sma', n), lambda: sma(close, n))
+            upper, lower = bbands(close, n, k, middle)
+            columns[f"bbands_upper_{label}"] = upper
+            columns[f"bbands_middle_{label}"] = middle
+            columns[f"bbands_lower_{label}"] = lower
+    return columns
@@ -0,0 +1,211 @@
+"""
+Rate Limiter - Quota-aware token bucket with priority lanes for upstream APIs
+"""
+import asyncio
+import contextvars
+import heapq
+import itertools
+import time
+from collections import deque
+from email.utils import parsedate_to_datetime
+from enum import IntEnum
+from typing import Any, Dict, List, Optional, Tuple
+import httpx
+from config import settings
+from config.logging_config import logger
+
+
+class Priority(IntEnum):
+    """Lower value is served first"""
+    INTERACTIVE = 0
+    BACKGROUND = 1
+
+
+# Priority for upstream calls made in the current task; background jobs set BACKGROUND
+current_priority: contextvars.ContextVar = contextvars.ContextVar(
+    'upstream_priority', default=Priority.INTERACTIVE
+)
+
+
+class RateLimitExceeded(Exception):
+    """The call could not get a token before its deadline"""
+
+
+class UpstreamThrottled(Exception):
+    """Upstream answered 429; `retry_after` is in seconds"""
+
+    def __init__(self, name: str, retry_after: float):
+        super().__init__(f"{name} rate limited upstream, retry after {retry_after:.0f}s")
+        self.retry_after = retry_after
+
+
+def parse_retry_after(value: Optional[str], default: float) -> float:
+    """Seconds from a Retry-After header (delta-seconds or HTTP date)"""
+    if not value:
+        return default
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except Exception:
+        return default
+
+
+class TokenBucketScheduler:
+    """
+    Token bucket shared by every call to one upstream.
+
+    Callers queue in priority lanes (INTERACTIVE before BACKGROUND, FIFO
+    within a lane) and give up with RateLimitExceeded once their deadline
+    passes. A 429 pauses the whole bucket for the Retry-After period so we
+    stop burning quota while throttled.
+    """
+
+    def __init__(self, name: str, rate_per_minute: float, burst: int):
+        self.name = name
+        self.rate_per_second = rate_per_minute / 60.0
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._waiters: List[Tuple[int, int, asyncio.Future]] = []
+        self._seq = itertools.count()
+        self._pump_task: Optional[asyncio.Task] = None
+        self._recent_calls: deque = deque()
+
+        # Counters
+        self.granted = {p.name.lower(): 0 for p in Priority}
+        self.expired = {p.name.lower(): 0 for p in Priority}
+        self.wait_ms_total = {p.name.lower(): 0.0 for p in Priority}
+        self.wait_ms_max = {p.name.lower(): 0.0 for p in Priority}
+        self.throttled = 0
+        self.last_retry_after = 0.0
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate_per_second)
+        self._updated = now
+
+    def _take(self) -> bool:
+        self._refill()
+        if time.monotonic() < self._paused_until or self._tokens < 1:
+            return False
+        self._tokens -= 1
+        self._recent_calls.append(time.monotonic())
+        return True
+
+    async def _pump(self):
+        """Grant tokens to queued waiters in priority order as they refill"""
+        try:
+            while self._waiters:
+                _, _, future = self._waiters[0]
+                if future.done():
+                    heapq.heappop(self._waiters)
+                    continue
+                if self._take():
+                    heapq.heappop(self._waiters)
+                    future.set_result(None)
+                    continue
+                now = time.monotonic()
+                if now < self._paused_until:
+                    await asyncio.sleep(self._paused_until - now)
+                else:
+                    await asyncio.sleep((1 - self._tokens) / self.rate_per_second)
+        finally:
+            self._pump_task = None
+
+    async def acquire(self, priority: Optional[Priority] = None, deadline: Optional[float] = None):
+        """
+        Wait for a token
+
+        Args:
+            priority: Lane to queue in (defaults to the task's current_priority)
+            deadline: Max seconds to wait before raising RateLimitExceeded
+        """
+        priority = current_priority.get() if priority is None else priority
+        if deadline is None:
+            deadline = (settings.FINNHUB_INTERACTIVE_DEADLINE_SECONDS if priority == Priority.INTERACTIVE
+                        else settings.FINNHUB_BACKGROUND_DEADLINE_SECONDS)
+        lane = priority.name.lower()
+        start = time.perf_counter()
+
+        if not self._waiters and self._take():
+            self.granted[lane] += 1
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (int(priority), next(self._seq), future))
+        if self._pump_task is None:
+            self._pump_task = asyncio.create_task(self._pump())
+        try:
+            await asyncio.wait_for(future, timeout=deadline)
+        except asyncio.TimeoutError:
+            self.expired[lane] += 1
+            raise RateLimitExceeded(f"{self.name} quota wait exceeded {deadline:.1f}s ({lane})")
+        waited_ms = (time.perf_counter() - start) * 1000
+        self.granted[lane] += 1
+        self.wait_ms_total[lane] += waited_ms
+        self.wait_ms_max[lane] = max(self.wait_ms_max[lane], waited_ms)
+
+    def penalize(self, retry_after: float):
+        """Pause the bucket after an upstream 429"""
+        self.throttled += 1
+        self.last_retry_after = retry_after
+        self._paused_until = max(self._paused_until, time.monotonic() + retry_after)
+        self._tokens = 0.0
+        logger.warning(f"{self.name} returned 429, pausing upstream calls for {retry_after:.0f}s")
+
+    async def get(self, client: httpx.AsyncClient, url: str, priority: Optional[Priority] = None,
+                  deadline: Optional[float] = None, **kwargs) -> httpx.Response:
+        """Rate-limited GET; raises UpstreamThrottled on 429"""
+        await self.acquire(priority, deadline)
+        return await self.send(client, url, **kwargs)
+
+    async def send(self, client: httpx.AsyncClient, url: str, **kwargs) -> httpx.Response:
+        """GET for a caller that already holds a token from acquire(); raises UpstreamThrottled on 429"""
+        response = await client.get(url, **kwargs)
+        if response.status_code == 429:
+            retry_after = parse_retry_after(response.headers.get('Retry-After'), default=60.0)
+            self.penalize(retry_after)
+            raise UpstreamThrottled(self.name, retry_after)
+        return response
+
+    def stats(self) -> Dict[str, Any]:
+        """Quota usage and queue wait metrics"""
+        now = time.monotonic()
+        while self._recent_calls and now - self._recent_calls[0] > 60:
+            self._recent_calls.popleft()
+        self._refill()
+        queued = {p.name.lower(): 0 for p in Priority}
+        for priority, _, future in self._waiters:
+            if not future.done():
+                queued[Priority(priority).name.lower()] += 1
+        return {
+            'name': self.name,
+            'rate_per_minute': round(self.rate_per_second * 60, 2),
+            'burst': self.burst,
+            'tokens_available': round(self._tokens, 2),
+            'calls_last_minute': len(self._recent_calls),
+            'quota_used_pct': round(len(self._recent_calls) / (self.rate_per_second * 60) * 100, 1),
+            'paused_for_seconds': round(max(0.0, self._paused_until - now), 1),
+            'throttled_429': self.throttled,
+            'last_retry_after': self.last_retry_after,
+            'queued': queued,
+            'granted': dict(self.granted),
+            'expired': dict(self.expired),
+            'avg_wait_ms': {
+                lane: round(self.wait_ms_total[lane] / self.granted[lane], 2) if self.granted[lane] else 0.0
+                for lane in self.granted
+            },
+            'max_wait_ms': {lane: round(v, 2) for lane, v in self.wait_ms_max.items()},
+        }
+
+
+# Singleton instance shared by every Finnhub call
+finnhub_limiter = TokenBucketScheduler(
+    'finnhub',
+    rate_per_minute=settings.FINNHUB_RATE_PER_MINUTE,
+    burst=settings.FINNHUB_BURST,
+)
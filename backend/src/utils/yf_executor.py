@@ -0,0 +1,127 @@
+"""
+yfinance Executor - Runs blocking yfinance calls off the event loop with bounded concurrency
+"""
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict
+from config import settings
+from config.logging_config import logger
+
+
+class ExecutorSaturated(Exception):
+    """Too many yfinance calls are already queued"""
+
+
+class BoundedExecutor:
+    """
+    Dedicated thread pool for blocking calls with admission control.
+
+    At most `max_workers` calls run at once and at most `max_queue` more wait
+    for a thread; anything beyond that is rejected with ExecutorSaturated
+    instead of piling up. A call that exceeds its timeout is cancelled if it
+    has not started yet; a running thread cannot be interrupted, so it keeps
+    counting against the limit until it returns.
+    """
+
+    def __init__(self, name: str, max_workers: int, max_queue: int, default_timeout: float):
+        self.name = name
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.default_timeout = default_timeout
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name)
+        self._lock = threading.Lock()
+        self._outstanding = 0
+        self._running = 0
+
+        # Counters
+        self.completed = 0
+        self.failed = 0
+        self.timeouts = 0
+        self.rejected = 0
+        self.max_queue_depth = 0
+        self.total_run_ms = 0.0
+
+    def _call(self, fn: Callable, args: tuple, kwargs: dict) -> Any:
+        with self._lock:
+            self._running += 1
+        start = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            elapsed = (time.perf_counter() - start) * 1000
+            with self._lock:
+                self._running -= 1
+                self.total_run_ms += elapsed
+
+    def _release(self, _future):
+        with self._lock:
+            self._outstanding -= 1
+
+    @property
+    def queue_depth(self) -> int:
+        """Calls submitted but not yet running"""
+        return max(0, self._outstanding - self._running)
+
+    async def run(self, fn: Callable, *args, timeout: float = None, **kwargs) -> Any:
+        """
+        Run `fn(*args, **kwargs)` on the pool
+
+        Raises:
+            ExecutorSaturated: Queue is full
+            asyncio.TimeoutError: Call did not finish within `timeout`
+        """
+        with self._lock:
+            if self._outstanding >= self.max_workers + self.max_queue:
+                self.rejected += 1
+                raise ExecutorSaturated(f"{self.name} executor saturated ({self._outstanding} calls outstanding)")
+            self._outstanding += 1
+
+        future = self._pool.submit(self._call, fn, args, kwargs)
+        future.add_done_callback(self._release)
+        self.max_queue_depth = max(self.max_queue_depth, self.queue_depth)
+
+        try:
+            result = await asyncio.wait_for(asyncio.wrap_future(future), timeout or self.default_timeout)
+        except asyncio.TimeoutError:
+            # wrap_future propagates the cancel; it only succeeds if not started
+            self.timeouts += 1
+            logger.warning(f"{self.name} call timed out after {timeout or self.default_timeout}s")
+            raise
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception:
+            self.failed += 1
+            raise
+        self.completed += 1
+        return result
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self) -> Dict[str, Any]:
+        finished = self.completed + self.failed
+        return {
+            'name': self.name,
+            'max_workers': self.max_workers,
+            'max_queue': self.max_queue,
+            'running': self._running,
+            'queue_depth': self.queue_depth,
+            'max_queue_depth': self.max_queue_depth,
+            'completed': self.completed,
+            'failed': self.failed,
+            'timeouts': self.timeouts,
+            'rejected': self.rejected,
+            'avg_run_ms': round(self.total_run_ms / finished, 2) if finished else 0.0,
+        }
+
+
+# Singleton instance for every yfinance call
+yf_executor = BoundedExecutor(
+    'yfinance',
+    max_workers=settings.YF_MAX_WORKERS,
+    max_queue=settings.YF_MAX_QUEUE,
+    default_timeout=settings.YF_TIMEOUT_SECONDS,
+)
@@ -28,3 +28,35 @@ resource "aws_dynamodb_table" "users" {
     Name = "${var.project_name}-users-table"
   }
 }
+
+# DynamoDB Table for price alerts (one item per alert)
+resource "aws_dynamodb_table" "price_alerts" {
+  name         = var.alerts_table_name
+  billing_mode = "PAY_PER_REQUEST"
+  hash_key     = "user_id"
+  range_key    = "alert_id"
+
+  attribute {
+    name = "user_id"
+    type = "S"
+  }
+
+  attribute {
+    name = "alert_id"
+    type = "S"
+  }
+
+  # Triggered alerts are deleted once their expires_at (epoch seconds) has passed
+  ttl {
+    attribute_name = "expires_at"
+    enabled        = true
+  }
+
+  point_in_time_recovery {
+    enabled = true
+  }
+
+  tags = {
+    Name = "${var.project_name}-price-alerts-table"
+  }
+}
@@ -10,6 +10,11 @@ output "dynamodb_table_arn" {
   value       = aws_dynamodb_table.users.arn
 }
 
+output "alerts_table_name" {
+  description = "Name of the DynamoDB price alerts table"
+  value       = aws_dynamodb_table.price_alerts.name
+}
+
 output "s3_bucket_name" {
   description = "Name of the S3 uploads bucket"
   value       = aws_s3_bucket.uploads.id
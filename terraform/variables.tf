@@ -21,3 +21,9 @@ variable "dynamodb_table_name" {
   type        = string
   default     = "Vittcott_Users"
 }
+
+variable "alerts_table_name" {
+  description = "DynamoDB table name for price alerts (ALERTS_TABLE)"
+  type        = string
+  default     = "Vittcott_PriceAlerts"
+}